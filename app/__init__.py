@@ -1,6 +1,7 @@
 from flask import Flask
 from flask_pymongo import PyMongo
 from flask_login import LoginManager
+from pymongo.errors import PyMongoError
 from config import Config
 
 # Ініціалізуємо розширення глобально, але без прив'язки до конкретного app
@@ -11,32 +12,105 @@ def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
 
+    # Слухач команд MongoDB потрібно передати під час створення клієнта
+    event_listeners = []
+    if app.config.get('METRICS_ENABLED'):
+        from app.services.metrics import command_timer
+        event_listeners.append(command_timer)
+    # Час записів для read-your-own-writes при читанні з secondary
+    if app.config.get('MONGO_READ_ROUTES') and app.config.get('MONGO_CAUSAL_READS'):
+        from app.services.reads import write_time_listener
+        event_listeners.append(write_time_listener)
+
     # Ініціалізація розширень з конкретним app
-    mongo.init_app(app)
+    mongo.init_app(
+        app,
+        maxPoolSize=app.config.get('MONGO_MAX_POOL_SIZE', 100),
+        minPoolSize=app.config.get('MONGO_MIN_POOL_SIZE', 0),
+        event_listeners=event_listeners
+    )
     login_manager.init_app(app)
     
     login_manager.login_view = 'auth.login'
     login_manager.login_message_category = 'info'
     login_manager.login_message = "Будь ласка, увійдіть, щоб отримати доступ."
 
+    # Прогрів: встановлюємо з'єднання пулу з БД до першого запиту користувача
+    if app.config.get('MONGO_WARMUP'):
+        from app.services.warmup import warm_up_mongo
+        warm_up_mongo(app, app.config.get('MONGO_WARMUP_CONNECTIONS', 1))
+
+    # Скомпільовані шаблони з кешу (заповнюється `flask precompile-templates` під час збирання образу)
+    if app.config.get('JINJA_BYTECODE_CACHE_DIR'):
+        from app.services.warmup import enable_bytecode_cache
+        enable_bytecode_cache(app, app.config['JINJA_BYTECODE_CACHE_DIR'])
+
+    # Індекси для "гарячих" запитів (операція ідемпотентна)
+    if app.config.get('ENSURE_INDEXES_ON_STARTUP'):
+        from app.services.indexes import ensure_indexes
+        try:
+            _, failed = ensure_indexes(mongo.db)
+            for collection, error in failed.items():
+                app.logger.warning("Не вдалося створити індекси колекції %s: %s", collection, error)
+        except PyMongoError as e:
+            app.logger.warning("Не вдалося створити індекси: %s", e)
+
+    # Вимірювання часу запитів, команд БД і рендерингу шаблонів
+    if app.config.get('METRICS_ENABLED'):
+        from app.services import metrics
+        metrics.init_app(app)
+
     # Імпорт та реєстрація Blueprints (маршрутів)
     from app.routes.auth import auth_bp
     from app.routes.main import main_bp
     from app.routes.inventory import inventory_bp
+    from app.routes.api import api_bp
+    from app.routes.live import live_bp
 
     app.register_blueprint(auth_bp)
     app.register_blueprint(main_bp)
     app.register_blueprint(inventory_bp)
+    app.register_blueprint(api_bp)
+    app.register_blueprint(live_bp)
 
     # Імпорт моделі User для завантажувача сесій
     from app.models import User
+    from app.services.user_cache import user_cache
+    from app.services.credentials import credentials
+    from app.services.page_cache import page_cache
+    from app.services.live import live_feed
+    from app.services.stats import stats
+    from app.services.audit import audit
+    from app.services.placement import placement
+    from app.services.jobs import jobs
+    from app.services.reads import reads
     from bson.objectid import ObjectId
 
+    user_cache.init_app(app)
+    credentials.init_app(app)
+    page_cache.init_app(app)
+    live_feed.init_app(app)
+    stats.init_app(app)
+    audit.init_app(app)
+    placement.init_app(app)
+    jobs.init_app(app)
+    reads.init_app(app)
+
     @login_manager.user_loader
     def load_user(user_id):
+        # Спочатку кеш, і лише при промаху - запит до БД
+        user_doc = user_cache.get(user_id)
+        if user_doc:
+            return User(user_doc)
         user_doc = mongo.db.users.find_one({"_id": ObjectId(user_id)})
         if user_doc:
+            user_cache.set(user_id, user_doc)
             return User(user_doc)
         return None
 
+    # Шаблони завантажуються під час запуску воркера, а не першим запитом користувача
+    if app.config.get('TEMPLATES_WARMUP'):
+        from app.services.warmup import compile_templates
+        compile_templates(app)
+
     return app
\ No newline at end of file
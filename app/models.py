@@ -1,5 +1,6 @@
 from flask_login import UserMixin
 from bson.objectid import ObjectId
+from flask import current_app, has_request_context, request
 
 # --- User Model ---
 class User(UserMixin):
@@ -12,20 +13,133 @@ class User(UserMixin):
     def is_admin(self):
         return self.role == 'admin'
 
+# --- Field schema helpers ---
+def _id_str(value):
+    return str(value) if value else None
+
+class Field:
+    """Опис поля моделі: значення за замовчуванням та перетворення типу"""
+    __slots__ = ('default', 'cast')
+
+    def __init__(self, default=None, cast=None):
+        self.default = default
+        self.cast = cast
+
+    def load(self, data, name):
+        value = data.get(name, self.default() if callable(self.default) else self.default)
+        return self.cast(value) if self.cast and value is not None else value
+
+class UnloadedFieldError(AttributeError):
+    """Звернення до поля, не вибраного проєкцією (MODELS_STRICT_PROJECTIONS=1)"""
+
+class Document:
+    """
+    Базова модель на __slots__ зі схемою полів FIELDS.
+    Схема визначає проєкції для MongoDB. Поля, які не було вибрано проєкцією, довантажує
+    load_missing() одним запитом; неявне довантаження при зверненні до такого поля в запиті
+    HTTP записується в журнал (а з MODELS_STRICT_PROJECTIONS=1 - помилка), бо це прихований N+1.
+    """
+    __slots__ = ('_id',)
+    collection = None
+    FIELDS = {}
+    # Слоти поза схемою, які заповнюють сервіси (на старті - None)
+    EXTRA_SLOTS = ()
+
+    def __init__(self, data, fields=None):
+        self._id = _id_str(data.get('_id'))
+        # fields=None - документ повний; інакше встановлюються лише вибрані проєкцією поля
+        for name in (self.FIELDS if fields is None else fields):
+            setattr(self, name, self.FIELDS[name].load(data, name))
+        for name in self.EXTRA_SLOTS:
+            setattr(self, name, None)
+
+    @classmethod
+    def projection(cls, fields):
+        """Проєкція MongoDB для набору полів схеми"""
+        return {name: 1 for name in fields}
+
+    @classmethod
+    def from_batch(cls, docs, fields=None):
+        """Створення моделей з пакета сирих документів BSON: схема розбирається один раз на пакет"""
+        names = cls.FIELDS if fields is None else fields
+        # Поля без перетворення та з незмінним значенням за замовчуванням - найкоротшим шляхом
+        plain = [(name, cls.FIELDS[name].default) for name in names
+                 if cls.FIELDS[name].cast is None and not callable(cls.FIELDS[name].default)]
+        other = [(name, cls.FIELDS[name]) for name in names
+                 if cls.FIELDS[name].cast is not None or callable(cls.FIELDS[name].default)]
+        models = []
+        for doc in docs:
+            obj = object.__new__(cls)
+            obj._id = _id_str(doc.get('_id'))
+            get = doc.get
+            for name, default in plain:
+                setattr(obj, name, get(name, default))
+            for name, spec in other:
+                setattr(obj, name, spec.load(doc, name))
+            for name in cls.EXTRA_SLOTS:
+                setattr(obj, name, None)
+            models.append(obj)
+        return models
+
+    def _unset_fields(self):
+        cls = type(self)
+        missing = []
+        for name in cls.FIELDS:
+            try:
+                # Дескриптор слоту напряму: не викликає __getattr__ для невстановленого поля
+                getattr(cls, name).__get__(self, cls)
+            except AttributeError:
+                missing.append(name)
+        return missing
+
+    def load_missing(self):
+        """Явно довантажує одним запитом усі поля, не вибрані проєкцією"""
+        from app import mongo
+
+        missing = self._unset_fields()
+        if not missing:
+            return
+        doc = {}
+        if self._id:
+            doc = mongo.db[self.collection].find_one({"_id": ObjectId(self._id)}, self.projection(missing)) or {}
+        for field in missing:
+            setattr(self, field, self.FIELDS[field].load(doc, field))
+
+    def __getattr__(self, name):
+        # Викликається лише для невстановлених слотів
+        if name not in type(self).FIELDS:
+            raise AttributeError(name)
+        if has_request_context():
+            message = f"{type(self).__name__}.{name} не вибрано проєкцією ({request.endpoint})"
+            if current_app.config.get('MODELS_STRICT_PROJECTIONS'):
+                raise UnloadedFieldError(message)
+            current_app.logger.warning("%s: додатковий запит до %s", message, self.collection)
+        self.load_missing()
+        return getattr(self, name)
+
 # --- Anomaly Object Model ---
-class AnomalyObject:
-    def __init__(self, data):
-        self._id = str(data.get('_id')) if data.get('_id') else None
-        self.object_number = data.get('object_number')
-        self.object_name = data.get('object_name')
-        self.object_class = data.get('object_class')
-        self.description = data.get('description')
-        self.special_contaiment_procedures = data.get('special_contaiment_procedures')
-        self.status = data.get('status', 'Under Study')
-        self.discovery_date = data.get('discovery_date')
-        self.assigned_researchers = data.get('assigned_researchers', [])
+class AnomalyObject(Document):
+    collection = 'objects'
+    FIELDS = {
+        'object_number': Field(),
+        'object_name': Field(),
+        'object_class': Field(),
+        'description': Field(),
+        'special_contaiment_procedures': Field(),
+        'status': Field('Under Study'),
+        'discovery_date': Field(),
+        'assigned_researchers': Field(list),
         # Зв'язок з камерою
-        self.chamber_id = str(data.get('chamber_id')) if data.get('chamber_id') else None
+        'chamber_id': Field(cast=_id_str),
+    }
+    # Поля, які відображає реєстр об'єктів (картка об'єкта)
+    LIST_FIELDS = (
+        'object_number', 'object_name', 'object_class', 'description',
+        'special_contaiment_procedures', 'status', 'chamber_id'
+    )
+    # chamber_info та score заповнюються сервісами (приєднана камера, релевантність пошуку)
+    EXTRA_SLOTS = ('chamber_info', 'score')
+    __slots__ = tuple(FIELDS) + EXTRA_SLOTS
 
     def to_bson(self):
         """Підготовка даних для запису в MongoDB"""
@@ -41,20 +155,36 @@ class AnomalyObject:
             "chamber_id": ObjectId(self.chamber_id) if self.chamber_id else None
         }
 
+    def to_dict(self):
+        """Представлення для JSON API (ідентифікатори - рядками)"""
+        data = self.to_bson()
+        data["_id"] = self._id
+        data["chamber_id"] = self.chamber_id
+        return data
+
 # --- Containment Chamber Model ---
-class ContainmentChamber:
-    def __init__(self, data):
-        self._id = str(data.get('_id')) if data.get('_id') else None
-        self.chamber_type = data.get('chamber_type')
-        self.size_dimensions = data.get('size_dimensions')
-        self.security_level = data.get('security_level')
-        self.environmental_controls = data.get('environmental_controls')
-        self.monitoring_equipment = data.get('monitoring_equipment')
-        self.construction_materials = data.get('construction_materials')
-        self.location = data.get('location')
-        self.capacity = int(data.get('capacity', 1))
-        self.current_occupancy = int(data.get('current_occupancy', 0))
-        self.status = data.get('status', 'Active')
+class ContainmentChamber(Document):
+    collection = 'chambers'
+    FIELDS = {
+        'chamber_type': Field(),
+        'size_dimensions': Field(),
+        'security_level': Field(),
+        'environmental_controls': Field(),
+        'monitoring_equipment': Field(),
+        'construction_materials': Field(),
+        'location': Field(),
+        'capacity': Field(1, int),
+        'current_occupancy': Field(0, int),
+        'status': Field('Active'),
+    }
+    # Поля, які відображає реєстр камер
+    LIST_FIELDS = (
+        'location', 'chamber_type', 'security_level', 'size_dimensions',
+        'capacity', 'current_occupancy', 'status'
+    )
+    # Поля камери, які потрібні картці об'єкта
+    SUMMARY_FIELDS = ('location', 'chamber_type')
+    __slots__ = tuple(FIELDS)
 
     def to_bson(self):
         """Підготовка даних для запису в MongoDB"""
@@ -69,4 +199,10 @@ class ContainmentChamber:
             "capacity": self.capacity,
             "current_occupancy": self.current_occupancy,
             "status": self.status
-        }
\ No newline at end of file
+        }
+
+    def to_dict(self):
+        """Представлення для JSON API (ідентифікатори - рядками)"""
+        data = self.to_bson()
+        data["_id"] = self._id
+        return data
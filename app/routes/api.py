@@ -0,0 +1,135 @@
+import asyncio
+from flask import Blueprint, request, jsonify, current_app
+from flask_login import login_required, current_user
+from app.models import AnomalyObject, ContainmentChamber
+from app.services.joins import NOT_DELETED, to_object_id, load_chambers
+from app.services.pagination import keyset_page, page_size_from
+from app.services.placement import INDEX_FIELDS, placement
+from app.services.reads import reads
+
+api_bp = Blueprint('api', __name__, url_prefix='/api/v1')
+
+# Асинхронні view виконують незалежні запити до БД паралельно: кожен запит PyMongo
+# виконується в окремому потоці (asyncio.to_thread) над спільним пулом з'єднань процесу.
+# Під WSGI (gunicorn gthread) запит і далі займає потік воркера до кінця: паралельність
+# скорочує час відповіді, але не кількість одночасно зайнятих воркерів.
+
+
+def _run(func, *args, **kwargs):
+    return asyncio.to_thread(func, *args, **kwargs)
+
+
+def _forbidden():
+    return jsonify({'error': 'forbidden'}), 403
+
+
+def _not_found():
+    return jsonify({'error': 'not found'}), 404
+
+
+def _bad_request(message):
+    return jsonify({'error': message}), 400
+
+
+def _page_args():
+    return {
+        'after': request.args.get('after'),
+        'before': request.args.get('before'),
+        'page_size': page_size_from(request.args, current_app.config['PAGE_SIZE'], current_app.config['MAX_PAGE_SIZE'])
+    }
+
+
+def _page_json(page, items, total):
+    return jsonify({
+        'items': items,
+        'total': total,
+        'next': page.next_cursor,
+        'prev': page.prev_cursor
+    })
+
+
+@api_bp.route('/objects')
+@login_required
+async def objects():
+    query = {k: request.args[k] for k in ('object_class', 'status') if request.args.get(k)}
+    query.update(NOT_DELETED)
+    if request.args.get('chamber_id'):
+        query['chamber_id'] = to_object_id(request.args['chamber_id'])
+        if not query['chamber_id']:
+            return _bad_request('invalid chamber_id')
+
+    # Сторінка результатів і загальна кількість - паралельно
+    page, total = await asyncio.gather(
+        _run(keyset_page, reads.collection('objects'), query, **_page_args()),
+        _run(reads.collection('objects').count_documents, query)
+    )
+    objects = AnomalyObject.from_batch(page.items)
+    chambers = await _run(load_chambers, [obj.chamber_id for obj in objects if obj.chamber_id])
+
+    items = []
+    for obj in objects:
+        data = obj.to_dict()
+        chamber = chambers.get(obj.chamber_id)
+        data['chamber'] = {'_id': chamber._id, 'location': chamber.location, 'chamber_type': chamber.chamber_type} if chamber else None
+        items.append(data)
+    return _page_json(page, items, total)
+
+
+@api_bp.route('/objects/<object_id>')
+@login_required
+async def object_detail(object_id):
+    oid = to_object_id(object_id)
+    if not oid:
+        return _not_found()
+
+    obj_doc = await _run(reads.collection('objects').find_one, {"_id": oid, **NOT_DELETED})
+    if not obj_doc:
+        return _not_found()
+
+    obj = AnomalyObject(obj_doc)
+    data = obj.to_dict()
+    if current_user.is_admin():
+        # Камери для форми редагування (лише адміністраторам) - з індексу розміщення, без запиту до БД
+        chambers = await _run(placement.available, include_id=obj.chamber_id)
+        # Лише поля індексу: to_dict() довантажував би решту полів окремим запитом на кожну камеру
+        data['available_chambers'] = [
+            {'_id': chamber._id, **{name: getattr(chamber, name) for name in INDEX_FIELDS}} for chamber in chambers
+        ]
+    return jsonify(data)
+
+
+@api_bp.route('/chambers')
+@login_required
+async def chambers():
+    if not current_user.is_admin():
+        return _forbidden()
+    query = {'status': request.args['status']} if request.args.get('status') else {}
+    query.update(NOT_DELETED)
+
+    page, total = await asyncio.gather(
+        _run(keyset_page, reads.collection('chambers'), query, **_page_args()),
+        _run(reads.collection('chambers').count_documents, query)
+    )
+    return _page_json(page, [chamber.to_dict() for chamber in ContainmentChamber.from_batch(page.items)], total)
+
+
+@api_bp.route('/chambers/<chamber_id>')
+@login_required
+async def chamber_detail(chamber_id):
+    if not current_user.is_admin():
+        return _forbidden()
+    oid = to_object_id(chamber_id)
+    if not oid:
+        return _not_found()
+
+    # Камера та її об'єкти - паралельно
+    chamber_doc, object_docs = await asyncio.gather(
+        _run(reads.collection('chambers').find_one, {"_id": oid, **NOT_DELETED}),
+        _run(lambda: list(reads.collection('objects').find({"chamber_id": oid, **NOT_DELETED})))
+    )
+    if not chamber_doc:
+        return _not_found()
+
+    data = ContainmentChamber(chamber_doc).to_dict()
+    data['objects'] = [obj.to_dict() for obj in AnomalyObject.from_batch(object_docs)]
+    return jsonify(data)
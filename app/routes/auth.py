@@ -1,8 +1,10 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_user, logout_user, current_user, login_required
-from werkzeug.security import generate_password_hash, check_password_hash
+from pymongo.errors import DuplicateKeyError
 from app import mongo
 from app.models import User
+from app.services.user_cache import user_cache
+from app.services.credentials import credentials, CredentialsBusyError
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -20,14 +22,23 @@ def register():
             flash('Користувач з таким іменем вже існує.', 'danger')
             return redirect(url_for('auth.register'))
 
-        hashed_password = generate_password_hash(password)
+        try:
+            hashed_password = credentials.hash_password(password)
+        except CredentialsBusyError:
+            flash('Сервіс перевантажено, спробуйте ще раз за кілька секунд.', 'warning')
+            return redirect(url_for('auth.register'))
         
         user_data = {
             'username': username,
             'password_hash': hashed_password,
             'role': 'researcher' 
         }
-        mongo.db.users.insert_one(user_data)
+        try:
+            mongo.db.users.insert_one(user_data)
+        except DuplicateKeyError:
+            # Паралельна реєстрація з тим самим іменем (унікальний індекс username)
+            flash('Користувач з таким іменем вже існує.', 'danger')
+            return redirect(url_for('auth.register'))
         
         flash('Реєстрація успішна! Тепер ви можете увійти.', 'success')
         return redirect(url_for('auth.login'))
@@ -48,7 +59,19 @@ def login():
         
         user_doc = mongo.db.users.find_one({"username": username})
 
-        if user_doc and check_password_hash(user_doc['password_hash'], password):
+        try:
+            valid = user_doc is not None and credentials.verify_password(user_doc.get('password_hash'), password)
+            # Прозоре оновлення хешу, створеного зі старими параметрами
+            if valid and credentials.needs_rehash(user_doc['password_hash']):
+                mongo.db.users.update_one(
+                    {"_id": user_doc['_id']},
+                    {"$set": {"password_hash": credentials.hash_password(password)}}
+                )
+        except CredentialsBusyError:
+            flash('Сервіс перевантажено, спробуйте ще раз за кілька секунд.', 'warning')
+            return redirect(url_for('auth.login'))
+
+        if valid:
             user = User(user_doc)
             login_user(user)
             
@@ -65,6 +88,7 @@ def login():
 @auth_bp.route('/logout')
 @login_required
 def logout():
+    user_cache.invalidate(current_user.id)
     logout_user()
     flash('Ви успішно вийшли із системи.', 'success')
     return redirect(url_for('main.index'))
\ No newline at end of file
@@ -1,25 +1,58 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+import io
+from flask import Blueprint, render_template, request, redirect, url_for, flash, current_app, Response, stream_with_context, jsonify, abort
 from flask_login import login_required, current_user
 from bson.objectid import ObjectId
+from pymongo.errors import DuplicateKeyError
 from datetime import datetime
 from app import mongo
 from app.models import AnomalyObject, ContainmentChamber # Імпортуємо нові моделі
+from app.services.joins import NOT_DELETED, attach_chambers, objects_in_chamber, to_object_id
+from app.services.pagination import keyset_page, page_size_from
+from app.services.reads import reads
+from app.services.occupancy import (
+    ChamberFullError, ObjectChangedError, reserve_slot, release_slot, move_object,
+    update_chamber, mark_deleted, reconcile_occupancy, last_reconciliation
+)
+from app.services.search import search_objects
+from app.services.page_cache import page_cache
+from app.services.stats import stats
+from app.services.audit import audit, changes
+from app.services.placement import placement
+from app.services.jobs import jobs
+from app.services.bulk import FORMATS, MODELS, BulkImportError, read_records, import_records, export_records
 
 inventory_bp = Blueprint('inventory', __name__)
 
+def _list_filters(names):
+    """Непорожні фільтри з рядка запиту (щоб зберігати їх у посиланнях пагінації)"""
+    return {name: request.args.get(name) for name in names if request.args.get(name)}
+
+
+def _page_args():
+    return {
+        'after': request.args.get('after'),
+        'before': request.args.get('before'),
+        'page_size': page_size_from(request.args, current_app.config['PAGE_SIZE'], current_app.config['MAX_PAGE_SIZE'])
+    }
+
 # --- Chambers Routes ---
 
 @inventory_bp.route('/chambers')
 @login_required
+@page_cache.cached('chambers')
 def chambers_list():
     if not current_user.is_admin():
         flash('У вас немає права доступу до цього ресурсу.', 'danger')
         return redirect(url_for('main.index'))
     
-    # Отримуємо дані з БД і перетворюємо їх на об'єкти класу ContainmentChamber
-    chambers_data = mongo.db.chambers.find()
-    chambers = [ContainmentChamber(doc) for doc in chambers_data]
-    return render_template('chambers_list.html', chambers=chambers)
+    filters = _list_filters(('status',))
+
+    # Отримуємо одну сторінку з БД і перетворюємо її на об'єкти класу ContainmentChamber
+    fields = ContainmentChamber.LIST_FIELDS
+    query = {**filters, **NOT_DELETED}
+    page = keyset_page(reads.collection('chambers'), query, projection=ContainmentChamber.projection(fields), **_page_args())
+    page.items = ContainmentChamber.from_batch(page.items, fields)
+    return render_template('chambers_list.html', chambers=page, page=page, filters=filters)
 
 @inventory_bp.route('/chambers/new', methods=['GET', 'POST'])
 @login_required
@@ -42,7 +75,12 @@ def create_chamber():
             'status': 'Active'
         })
         
-        mongo.db.chambers.insert_one(new_chamber.to_bson())
+        chamber_doc = new_chamber.to_bson()
+        mongo.db.chambers.insert_one(chamber_doc)
+        stats.chamber_changed(after=chamber_doc)
+        placement.chamber_changed(chamber_doc)
+        audit.record('chamber.create', chamber_ids=[chamber_doc['_id']], location=chamber_doc['location'])
+        page_cache.bump('chambers')
         flash('Камера успішно створена!', 'success')
         return redirect(url_for('inventory.chambers_list'))
         
@@ -55,38 +93,33 @@ def delete_chamber(chamber_id):
         flash('У вас немає права доступу до цього ресурсу.', 'danger')
         return redirect(url_for('main.index'))
     
-    chamber_doc = mongo.db.chambers.find_one({"_id": ObjectId(chamber_id)})
-    
+    # Камера лише позначається видаленою; її об'єкти отримують chamber_id = null та статус
+    # "Awaiting Containment" у фоновому завданні (порціями), після чого камера видаляється
+    chamber_doc = mark_deleted('chambers', chamber_id)
     if not chamber_doc:
         flash('Камеру не знайдено.', 'danger')
         return redirect(url_for('inventory.chambers_list'))
-    
-    # міняємо chamber_id у об'єктів на null
-    mongo.db.objects.update_many(
-        {"chamber_id": ObjectId(chamber_id)},
-        {"$set": {"chamber_id": None}}
-    )
-    
-    # міняємо статус у об'єктів на "Awaiting Containment"
-    mongo.db.objects.update_many(
-        {"chamber_id": ObjectId(chamber_id)},
-        {"$set": {"status": "Awaiting Containment"}}
-    )
-    
-    mongo.db.chambers.delete_one({"_id": ObjectId(chamber_id)})
-    
-    flash('Камера успішно видалена!', 'success')
+
+    job_id = jobs.enqueue('chamber.delete', chamber_doc['_id'], total=chamber_doc.get('current_occupancy'))
+    placement.chamber_removed(chamber_id)
+    stats.chamber_changed(before=chamber_doc)
+    audit.record('chamber.delete', chamber_ids=[chamber_id], location=chamber_doc.get('location'),
+                 job_id=str(job_id))
+
+    page_cache.bump('objects', 'chambers')
+    flash(f"Камеру видалено. Об'єкти камери переводяться в \"Awaiting Containment\" у фоновому режимі (завдання {job_id}).", 'success')
     return redirect(url_for('inventory.chambers_list'))
 
 @inventory_bp.route('/chambers/<chamber_id>')
 @login_required
+@page_cache.cached('objects', 'chambers')
 def view_chamber(chamber_id):
     if not current_user.is_admin():
         flash('У вас немає права доступу до цього ресурсу.', 'danger')
         return redirect(url_for('main.index'))
 
     # 1. Знаходимо камеру
-    chamber_doc = mongo.db.chambers.find_one({"_id": ObjectId(chamber_id)})
+    chamber_doc = reads.collection('chambers').find_one({"_id": ObjectId(chamber_id), **NOT_DELETED})
     if not chamber_doc:
         flash('Камеру не знайдено.', 'danger')
         return redirect(url_for('inventory.chambers_list'))
@@ -94,8 +127,7 @@ def view_chamber(chamber_id):
     chamber = ContainmentChamber(chamber_doc)
 
     # 2. Знаходимо всі об'єкти, які знаходяться в цій камері
-    objects_cursor = mongo.db.objects.find({"chamber_id": chamber_doc['_id']})
-    contained_objects = [AnomalyObject(doc) for doc in objects_cursor]
+    contained_objects = objects_in_chamber(chamber)
 
     return render_template('chamber_details.html', chamber=chamber, objects=contained_objects)
 
@@ -108,7 +140,7 @@ def edit_chamber(chamber_id):
         return redirect(url_for('main.index'))
 
     # Отримуємо камеру
-    chamber_doc = mongo.db.chambers.find_one({"_id": ObjectId(chamber_id)})
+    chamber_doc = mongo.db.chambers.find_one({"_id": ObjectId(chamber_id), **NOT_DELETED})
     if not chamber_doc:
         flash('Камеру не знайдено.', 'danger')
         return redirect(url_for('inventory.chambers_list'))
@@ -139,34 +171,132 @@ def edit_chamber(chamber_id):
             'status': request.form.get('status') 
         }
 
-        mongo.db.chambers.update_one(
-            {"_id": ObjectId(chamber_id)},
-            {"$set": updated_data}
-        )
+        # Повторна перевірка місткості атомарно, в самому запиті оновлення
+        if not update_chamber(chamber_id, updated_data):
+            flash(f"Помилка: Нова місткість ({new_capacity}) менша за поточну кількість об'єктів. Спочатку перемістіть зайві об'єкти.", 'danger')
+            return redirect(url_for('inventory.edit_chamber', chamber_id=chamber_id))
 
+        stats.chamber_changed(chamber_doc, {**chamber_doc, **updated_data})
+        placement.chamber_changed({**chamber_doc, **updated_data})
+        audit.record('chamber.update', chamber_ids=[chamber_id], changes=changes(chamber_doc, updated_data))
+        page_cache.bump('objects', 'chambers')
         flash('Дані камери успішно оновлено!', 'success')
         return redirect(url_for('inventory.chambers_list'))
 
     return render_template('edit_chamber.html', chamber=chamber)
 
+@inventory_bp.route('/chambers/occupancy/drift')
+@login_required
+def occupancy_drift():
+    if not current_user.is_admin():
+        return jsonify({'error': 'forbidden'}), 403
+    # ?check=1 - виконати звірку без виправлень; інакше - звіт останньої повної звірки
+    if request.args.get('check'):
+        report = reconcile_occupancy(dry_run=True)
+    else:
+        report = last_reconciliation()
+    return jsonify(report or {})
+
+@inventory_bp.route('/inventory/jobs/<job_id>')
+@login_required
+def job_status(job_id):
+    if not current_user.is_admin():
+        return jsonify({'error': 'forbidden'}), 403
+    # Стан і прогрес фонового завдання (processed / total)
+    job = jobs.get(job_id)
+    if not job:
+        return jsonify({'error': 'not found'}), 404
+    return jsonify({**job, '_id': str(job['_id']), 'target': str(job['target'])})
+
+@inventory_bp.route('/chambers/suggest')
+@login_required
+def suggest_chamber():
+    if not current_user.is_admin():
+        return jsonify({'error': 'forbidden'}), 403
+    # Найкраща камера для ?object_class= (необов'язково ?location= та ?chamber_type=)
+    chamber = placement.suggest(
+        request.args.get('object_class'),
+        location=request.args.get('location'),
+        chamber_type=request.args.get('chamber_type')
+    )
+    return jsonify({'chamber': chamber})
+
+@inventory_bp.route('/inventory/audit')
+@login_required
+def audit_log():
+    if not current_user.is_admin():
+        return jsonify({'error': 'forbidden'}), 403
+    # Історія змін за ?object_id=, ?chamber_id= та/або ?user=; ?before=<id> - наступна сторінка
+    limit = page_size_from(request.args, current_app.config['PAGE_SIZE'], current_app.config['MAX_PAGE_SIZE'])
+    events = audit.query(
+        object_id=request.args.get('object_id'),
+        chamber_id=request.args.get('chamber_id'),
+        user=request.args.get('user'),
+        before=request.args.get('before'),
+        limit=limit
+    )
+    for event in events:
+        event['_id'] = str(event['_id'])
+        event['object_id'] = str(event['object_id']) if event.get('object_id') else None
+        event['chamber_ids'] = [str(oid) for oid in event.get('chamber_ids', [])]
+        for change in event.get('changes', {}).values():
+            for key in ('from', 'to'):
+                if isinstance(change[key], ObjectId):
+                    change[key] = str(change[key])
+    return jsonify({
+        'items': events,
+        'next': events[-1]['_id'] if len(events) == limit else None
+    })
+
 # --- Objects Routes ---
 
 @inventory_bp.route('/objects')
 @login_required
+@page_cache.cached('objects', 'chambers')
 def objects_list():
-    objects_data = mongo.db.objects.find()
-    objects_list = []
-    
-    for doc in objects_data:
-        obj = AnomalyObject(doc)
-        # Якщо об'єкт приписаний до камери, знаходимо її
-        if obj.chamber_id:
-            chamber_doc = mongo.db.chambers.find_one({"_id": ObjectId(obj.chamber_id)})
-            if chamber_doc:
-                obj.chamber_info = ContainmentChamber(chamber_doc)
-        objects_list.append(obj)
-        
-    return render_template('objects_list.html', objects=objects_list)
+    filters = _list_filters(('object_class', 'status', 'chamber_id'))
+    query = {k: v for k, v in filters.items() if k != 'chamber_id'}
+    query.update(NOT_DELETED)
+    if 'chamber_id' in filters:
+        # Некоректний ідентифікатор - 400: інакше None відібрав би всі об'єкти без камери
+        query['chamber_id'] = to_object_id(filters['chamber_id'])
+        if not query['chamber_id']:
+            abort(400)
+
+    # Вибираються лише поля, які відображає картка об'єкта (схема LIST_FIELDS моделі)
+    fields = AnomalyObject.LIST_FIELDS
+    page = keyset_page(reads.collection('objects'), query, projection=AnomalyObject.projection(fields), **_page_args())
+    # Камери приєднуються одним запитом ($in) для всієї сторінки
+    page.items = attach_chambers(AnomalyObject.from_batch(page.items, fields), ContainmentChamber.SUMMARY_FIELDS)
+
+    # Картки об'єктів кешуються окремо (для кожної ролі), щоб не рендерити їх щоразу
+    cards = [
+        page_cache.fragment(
+            ('objects', 'chambers'), f'object-card:{obj._id}',
+            lambda obj=obj: render_template('_object_card.html', obj=obj)
+        )
+        for obj in page.items
+    ]
+    return render_template('objects_list.html', cards=cards, page=page, filters=filters)
+
+@inventory_bp.route('/objects/search')
+@login_required
+def search():
+    text = request.args.get('q', '').strip()
+    filters = _list_filters(('object_class', 'status', 'location'))
+    try:
+        page = max(1, int(request.args.get('page', 1)))
+    except ValueError:
+        page = 1
+    max_pages = current_app.config['SEARCH_MAX_PAGES']
+    page = min(page, max_pages)
+    page_size = page_size_from(request.args, current_app.config['PAGE_SIZE'], current_app.config['MAX_PAGE_SIZE'])
+
+    # Результати, загальна кількість і фасети - однією агрегацією (без запиту й фільтрів фасети - з кешу)
+    results, total, facets = search_objects(text, filters, page, page_size)
+    pages = min(max(1, -(-total // page_size)), max_pages)
+    return render_template('search_objects.html', q=text, results=results, total=total,
+                           facets=facets, filters=filters, page=page, pages=pages)
 
 @inventory_bp.route('/objects/new', methods=['GET', 'POST'])
 @login_required
@@ -191,57 +321,51 @@ def create_object():
             'status': 'Contained' if chamber_id else 'Discovered'
         })
 
-        # Логіка оновлення заповненості камери
-        if chamber_id:
-            chamber_doc = mongo.db.chambers.find_one({"_id": ObjectId(chamber_id)})
-            if chamber_doc:
-                chamber = ContainmentChamber(chamber_doc)
-                if chamber.current_occupancy < chamber.capacity:
-                    mongo.db.chambers.update_one(
-                        {"_id": ObjectId(chamber_id)},
-                        {"$inc": {"current_occupancy": 1}}
-                    )
-                else:
-                    flash('Помилка: Обрана камера переповнена!', 'danger')
-                    available_chambers = [ContainmentChamber(doc) for doc in mongo.db.chambers.find({"$expr": {"$lt": ["$current_occupancy", "$capacity"]}})]
-                    return render_template('create_object.html', chambers=available_chambers)
-
-        mongo.db.objects.insert_one(new_object.to_bson())
+        # Атомарно займаємо місце в камері (перевірка місткості на боці сервера)
+        chamber = reserve_slot(chamber_id) if chamber_id else None
+        if chamber_id and not chamber:
+            flash('Помилка: Обрана камера переповнена!', 'danger')
+            return render_template('create_object.html', chambers=placement.available())
+
+        object_doc = new_object.to_bson()
+        try:
+            mongo.db.objects.insert_one(object_doc)
+        except DuplicateKeyError:
+            # Номер об'єкта унікальний (індекс object_number_unique) - повертаємо місце в камері
+            if chamber_id:
+                placement.chamber_changed(release_slot(chamber_id))
+            flash(f"Помилка: Об'єкт з номером {new_object.object_number} вже існує.", 'danger')
+            return render_template('create_object.html', chambers=placement.available())
+
+        stats.object_changed(after=object_doc)
+        stats.occupancy_changed(chamber, 1)
+        placement.chamber_changed(chamber)
+        audit.record('object.create', object_doc, chamber_ids=[chamber_id] if chamber_id else ())
+        page_cache.bump('objects', 'chambers')
         flash("Об'єкт зареєстровано успішно!", 'success')
         return redirect(url_for('inventory.objects_list'))
 
-    # Завантажуємо доступні камери як об'єкти
-    chambers_cursor = mongo.db.chambers.find({
-        "$expr": {"$lt": ["$current_occupancy", "$capacity"]}
-    })
-    available_chambers = [ContainmentChamber(doc) for doc in chambers_cursor]
-    
-    return render_template('create_object.html', chambers=available_chambers)
+    # Камери з вільним місцем - з індексу розміщення в пам'яті, без запиту до БД
+    return render_template('create_object.html', chambers=placement.available())
 
 @inventory_bp.route('/objects/delete/<object_id>')
 @login_required
 def delete_object(object_id):
-    if not current_user.is_admin:
+    if not current_user.is_admin():
         flash('У вас немає права доступу до цього ресурсу.', 'danger')
         return redirect(url_for('main.index'))
     
-    # 1. Знаходимо об'єкт перед видаленням, щоб перевірити камеру
-    obj_doc = mongo.db.objects.find_one({"_id": ObjectId(object_id)})
-    
+    # Об'єкт лише позначається видаленим; місце в камері звільняє і документ видаляє фонове завдання
+    obj_doc = mark_deleted('objects', object_id)
     if not obj_doc:
         flash('Об\'єкт не знайдено.', 'danger')
         return redirect(url_for('inventory.objects_list'))
 
-    # 2. Якщо об'єкт був у камері, звільняємо місце
-    if obj_doc.get('chamber_id'):
-        mongo.db.chambers.update_one(
-            {"_id": ObjectId(obj_doc['chamber_id'])},
-            {"$inc": {"current_occupancy": -1}} # Зменшуємо лічильник на 1
-        )
-
-    # 3. Видаляємо сам об'єкт
-    mongo.db.objects.delete_one({"_id": ObjectId(object_id)})
+    jobs.enqueue('object.delete', obj_doc['_id'])
+    stats.object_changed(before=obj_doc)
+    audit.record('object.delete', obj_doc, chamber_ids=[obj_doc.get('chamber_id')])
     
+    page_cache.bump('objects', 'chambers')
     flash('Об\'єкт успішно видалено (декомісовано).', 'success')
     return redirect(url_for('inventory.objects_list'))
 
@@ -254,7 +378,7 @@ def edit_object(object_id):
         return redirect(url_for('main.index'))
 
     # Отримуємо поточний об'єкт
-    obj_doc = mongo.db.objects.find_one({"_id": ObjectId(object_id)})
+    obj_doc = mongo.db.objects.find_one({"_id": ObjectId(object_id), **NOT_DELETED})
     if not obj_doc:
         flash("Об'єкт не знайдено.", 'danger')
         return redirect(url_for('inventory.objects_list'))
@@ -266,38 +390,6 @@ def edit_object(object_id):
         new_chamber_id = request.form.get('chamber_id')
         old_chamber_id = str(obj.chamber_id) if obj.chamber_id else None
 
-        # --- Логіка зміни камери ---
-        # Якщо камера змінилася (або була додана/видалена)
-        if new_chamber_id != old_chamber_id:
-            
-            # 1. Якщо була стара камера, звільняємо місце в ній
-            if old_chamber_id:
-                mongo.db.chambers.update_one(
-                    {"_id": ObjectId(old_chamber_id)},
-                    {"$inc": {"current_occupancy": -1}}
-                )
-
-            # 2. Якщо обрана нова камера, займаємо місце (з перевіркою)
-            if new_chamber_id:
-                target_chamber = mongo.db.chambers.find_one({"_id": ObjectId(new_chamber_id)})
-                
-                # Перевіряємо, чи не переповнена нова камера
-                if target_chamber and target_chamber['current_occupancy'] >= target_chamber['capacity']:
-                    # Відкочуємо зміни: повертаємо об'єкт у стару камеру (візуально для користувача)
-                    if old_chamber_id:
-                         mongo.db.chambers.update_one(
-                            {"_id": ObjectId(old_chamber_id)},
-                            {"$inc": {"current_occupancy": 1}}
-                        )
-                    flash(f"Помилка: Камера {target_chamber.get('location')} переповнена!", 'danger')
-                    return redirect(url_for('inventory.edit_object', object_id=object_id))
-                
-                # Якщо є місце, збільшуємо лічильник
-                mongo.db.chambers.update_one(
-                    {"_id": ObjectId(new_chamber_id)},
-                    {"$inc": {"current_occupancy": 1}}
-                )
-
         # --- Оновлення даних об'єкта ---
         updated_data = {
             'object_number': request.form.get('object_number'),
@@ -307,27 +399,113 @@ def edit_object(object_id):
             'special_properties': request.form.get('special_properties'),
             'special_contaiment_procedures': request.form.get('special_contaiment_procedures'),
             'discovery_date': request.form.get('discovery_date'),
-            'chamber_id': new_chamber_id if new_chamber_id else None,
+            'chamber_id': to_object_id(new_chamber_id),
             # Оновлюємо статус залежно від наявності камери
             'status': 'Contained' if new_chamber_id else 'Under Study' 
         }
 
-        mongo.db.objects.update_one(
-            {"_id": ObjectId(object_id)},
-            {"$set": updated_data}
-        )
-
+        # --- Зміна камери та оновлення об'єкта однією транзакцією ---
+        try:
+            new_chamber, old_chamber = move_object(object_id, old_chamber_id, new_chamber_id or None, updated_data)
+        except ChamberFullError:
+            flash('Помилка: Обрана камера переповнена!', 'danger')
+            return redirect(url_for('inventory.edit_object', object_id=object_id))
+        except ObjectChangedError:
+            flash("Об'єкт щойно змінив інший користувач. Перевірте дані та повторіть зміну.", 'warning')
+            return redirect(url_for('inventory.edit_object', object_id=object_id))
+        except DuplicateKeyError:
+            flash(f"Помилка: Об'єкт з номером {updated_data['object_number']} вже існує.", 'danger')
+            return redirect(url_for('inventory.edit_object', object_id=object_id))
+
+        stats.object_changed(obj_doc, {**obj_doc, **updated_data})
+        stats.occupancy_changed(new_chamber, 1)
+        stats.occupancy_changed(old_chamber, -1)
+        placement.chamber_changed(new_chamber)
+        placement.chamber_changed(old_chamber)
+        moved = (old_chamber_id or None) != (new_chamber_id or None)
+        audit.record('object.move' if moved else 'object.update', obj_doc,
+                     chamber_ids=[old_chamber_id, new_chamber_id], changes=changes(obj_doc, updated_data))
+        page_cache.bump('objects', 'chambers')
         flash("Дані об'єкта успішно оновлено!", 'success')
         return redirect(url_for('inventory.objects_list'))
 
     # GET-запит: Завантажуємо дані для форми
     # Завантажуємо камери, де є місце, АБО ту камеру, в якій об'єкт зараз (щоб вона була в списку)
-    chambers_cursor = mongo.db.chambers.find({
-        "$or": [
-            {"$expr": {"$lt": ["$current_occupancy", "$capacity"]}},
-            {"_id": ObjectId(obj.chamber_id) if obj.chamber_id else None}
-        ]
-    })
-    available_chambers = [ContainmentChamber(doc) for doc in chambers_cursor]
+    return render_template('edit_object.html', obj=obj, chambers=placement.available(include_id=obj.chamber_id))
+
+@inventory_bp.route('/objects/assign', methods=['POST'])
+@login_required
+def assign_objects():
+    if not current_user.is_admin():
+        flash('У вас немає права доступу до цього ресурсу.', 'danger')
+        return redirect(url_for('main.index'))
+
+    # Усі об'єкти "Awaiting Containment" без камери розміщуються за один прохід
+    result = placement.assign_awaiting(limit=request.form.get('limit', type=int))
+    if result['placed']:
+        stats.refresh_safely()
+        page_cache.bump('objects', 'chambers')
+    flash(f"Розміщено об'єктів: {result['placed']} з {result['awaiting']} (камер: {result['chambers']}).",
+          'success' if result['placed'] == result['awaiting'] else 'warning')
+    return redirect(url_for('main.admin_dashboard'))
+
+# --- Bulk Import / Export ---
+
+@inventory_bp.route('/inventory/import/<collection>', methods=['GET', 'POST'])
+@login_required
+def import_inventory(collection):
+    if not current_user.is_admin():
+        flash('У вас немає права доступу до цього ресурсу.', 'danger')
+        return redirect(url_for('main.index'))
+    if collection not in MODELS:
+        flash('Невідома колекція.', 'danger')
+        return redirect(url_for('main.admin_dashboard'))
+
+    if request.method == 'POST':
+        upload = request.files.get('file')
+        if not upload or not upload.filename:
+            flash('Оберіть файл для імпорту.', 'danger')
+            return redirect(url_for('inventory.import_inventory', collection=collection))
+
+        fmt = request.form.get('format') or upload.filename.rsplit('.', 1)[-1].lower()
+        # Файл читається потоково, рядок за рядком, без завантаження в пам'ять повністю
+        stream = io.TextIOWrapper(upload.stream, encoding='utf-8-sig')
+        try:
+            result = import_records(collection, read_records(stream, fmt))
+        except BulkImportError as e:
+            flash(f'Помилка імпорту: {e}', 'danger')
+            return redirect(url_for('inventory.import_inventory', collection=collection))
+        finally:
+            stats.refresh_safely()
+            placement.invalidate()
+            page_cache.bump('objects', 'chambers')
+        audit.record('inventory.import', collection=collection, inserted=result['inserted'],
+                     errors=len(result['errors']))
+
+        flash(f"Імпортовано записів: {result['inserted']}. Помилок: {len(result['errors'])}.",
+              'success' if not result['errors'] else 'warning')
+        for number, message in result['errors'][:10]:
+            flash(f'Запис {number}: {message}', 'danger')
+        return redirect(url_for(f'inventory.{collection}_list'))
+
+    return render_template('import_inventory.html', collection=collection, formats=FORMATS)
+
+@inventory_bp.route('/inventory/export/<collection>')
+@login_required
+def export_inventory(collection):
+    if not current_user.is_admin():
+        flash('У вас немає права доступу до цього ресурсу.', 'danger')
+        return redirect(url_for('main.index'))
 
-    return render_template('edit_object.html', obj=obj, chambers=available_chambers)
\ No newline at end of file
+    fmt = request.args.get('format', 'jsonl')
+    if collection not in MODELS or fmt not in FORMATS:
+        flash('Невідома колекція або формат.', 'danger')
+        return redirect(url_for('main.admin_dashboard'))
+
+    # Відповідь віддається частинами (chunked) у міру читання курсора
+    mimetype = 'application/x-ndjson' if fmt == 'jsonl' else 'text/csv'
+    return Response(
+        stream_with_context(export_records(collection, fmt)),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={collection}.{fmt}'}
+    )
\ No newline at end of file
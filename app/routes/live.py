@@ -0,0 +1,65 @@
+import json
+import queue
+from flask import Blueprint, Response, request, jsonify, current_app
+from flask_login import login_required, current_user
+from app.services.live import live_feed
+
+live_bp = Blueprint('live', __name__, url_prefix='/live')
+
+
+def _format(event):
+    return f"event: {event['kind']}\ndata: {json.dumps(event)}\n\n"
+
+
+@live_bp.route('/events')
+@login_required
+def events():
+    """Потік Server-Sent Events зі змінами камер та об'єктів (для дашбордів)"""
+    if not current_user.is_admin():
+        return jsonify({'error': 'forbidden'}), 403
+    if not live_feed.enabled:
+        return jsonify({'error': 'live updates disabled'}), 404
+
+    topics = [t for t in request.args.get('topics', 'chambers').split(',') if t]
+    if live_feed.full():
+        return jsonify({'error': 'too many subscribers'}), 503
+    heartbeat = current_app.config.get('LIVE_HEARTBEAT_SECONDS', 15)
+
+    def stream():
+        # Підписка - лише після початку відповіді: якщо клієнт відключився раніше, генератор
+        # не запускається і finally не виконується, тож лічильник підписників не "витікає"
+        sub = live_feed.subscribe(topics)
+        if sub is None:
+            # Ліміт вичерпано між перевіркою і початком потоку - повтор не раніше ніж за хвилину
+            yield 'retry: 60000\n\n'
+            return
+        try:
+            # Інтервал перепідключення EventSource після розриву, мс
+            yield 'retry: 5000\n\n'
+            while not sub.overflowed:
+                try:
+                    event = sub.get(timeout=heartbeat)
+                except queue.Empty:
+                    # Коментар-пульс: тримає з'єднання через проксі та виявляє відключених клієнтів
+                    yield ': ping\n\n'
+                    continue
+                yield _format(event)
+                if event['kind'] == 'resync':
+                    return
+            yield _format({'kind': 'resync'})
+        finally:
+            live_feed.unsubscribe(sub)
+
+    return Response(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+
+@live_bp.route('/stats')
+@login_required
+def stats():
+    if not current_user.is_admin():
+        return jsonify({'error': 'forbidden'}), 403
+    # Кількість підписників і стан потоку змін (для поточного процесу)
+    return jsonify(live_feed.stats())
@@ -1,5 +1,7 @@
-from flask import Blueprint, render_template, redirect, url_for, flash
+from flask import Blueprint, render_template, redirect, url_for, flash, jsonify
 from flask_login import current_user, login_required
+from app.services.user_cache import user_cache
+from app.services.stats import stats
 
 main_bp = Blueprint('main', __name__)
 
@@ -13,7 +15,22 @@ def admin_dashboard():
     if not current_user.is_admin():
         flash('Доступ заборонено: потрібні права Адміністратора.', 'warning')
         return redirect(url_for('main.user_dashboard'))
-    return render_template('admin_dashboard.html', username=current_user.username)
+    return render_template('admin_dashboard.html', username=current_user.username, stats=stats.snapshot())
+
+@main_bp.route('/dashboard/admin/stats')
+@login_required
+def admin_stats():
+    if not current_user.is_admin():
+        return jsonify({'error': 'forbidden'}), 403
+    return jsonify(stats.snapshot())
+
+@main_bp.route('/dashboard/admin/user-cache')
+@login_required
+def user_cache_stats():
+    if not current_user.is_admin():
+        return jsonify({'error': 'forbidden'}), 403
+    # Лічильники влучань/промахів кешу користувачів (для поточного процесу)
+    return jsonify(user_cache.stats())
 
 @main_bp.route('/dashboard/user')
 @login_required
@@ -0,0 +1,235 @@
+import atexit
+import os
+import queue
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from bson.objectid import ObjectId
+from flask import has_request_context, request
+from flask_login import current_user
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import BulkWriteError, PyMongoError
+from app import mongo
+from app.services.joins import to_object_id
+
+# Журнал розбито на місячні колекції audit_YYYY_MM: запис лише в поточну, а старі місяці
+# видаляються цілими колекціями (`flask prune-audit`), без масових delete_many
+PARTITION_PREFIX = 'audit_'
+PARTITION_PATTERN = re.compile(r'^audit_\d{4}_\d{2}$')
+
+# Код помилки MongoDB DuplicateKey (повторний запис події з тим самим _id)
+DUPLICATE_KEY = 11000
+
+# Індекси кожного розділу - під запити за об'єктом, камерою та користувачем
+PARTITION_INDEXES = (
+    [('object_id', ASCENDING), ('_id', DESCENDING)],
+    [('chamber_ids', ASCENDING), ('_id', DESCENDING)],
+    [('user', ASCENDING), ('_id', DESCENDING)],
+)
+
+
+def partition_name(moment):
+    return f'{PARTITION_PREFIX}{moment.year:04d}_{moment.month:02d}'
+
+
+def changes(before, updated):
+    """Змінені поля документа: {поле: {'from': старе, 'to': нове}}"""
+    return {
+        field: {'from': before.get(field), 'to': value}
+        for field, value in updated.items() if before.get(field) != value
+    }
+
+
+class AuditLog:
+    """
+    Журнал змін утримання. Події ставляться в обмежену чергу в пам'яті процесу, а фоновий
+    потік записує їх пакетами (insert_many). Якщо черга заповнена довше за AUDIT_ENQUEUE_TIMEOUT,
+    подія записується синхронно в потоці запиту - записи не губляться, а запит сповільнюється.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.asynchronous = True
+        self.batch_size = 500
+        self.flush_interval = 1.0
+        self.enqueue_timeout = 0.05
+        self.logger = None
+        self._queue = queue.Queue(10000)
+        self._lock = threading.Lock()
+        self._writer = None
+        self._pid = None
+        self._indexed = set()
+        self.counters = {'enqueued': 0, 'written': 0, 'sync_writes': 0, 'failed': 0}
+
+    def init_app(self, app):
+        self.enabled = app.config.get('AUDIT_ENABLED', True)
+        self.asynchronous = app.config.get('AUDIT_ASYNC', True)
+        self.batch_size = app.config.get('AUDIT_BATCH_SIZE', 500)
+        self.flush_interval = app.config.get('AUDIT_FLUSH_INTERVAL', 1.0)
+        self.enqueue_timeout = app.config.get('AUDIT_ENQUEUE_TIMEOUT', 0.05)
+        self._queue = queue.Queue(app.config.get('AUDIT_QUEUE_SIZE', 10000))
+        self.logger = app.logger
+        # Під час зупинки воркера записуємо все, що лишилось у черзі
+        atexit.register(self.flush)
+
+    # --- Запис ---
+
+    def record(self, action, object_doc=None, chamber_ids=(), **details):
+        """
+        Реєструє подію. object_doc - документ об'єкта (зберігаються _id та номер),
+        chamber_ids - камери, яких стосується подія (напр. стара та нова при переміщенні).
+        """
+        if not self.enabled:
+            return
+        event = {
+            # _id генерується на клієнті: містить час події та слугує курсором пагінації
+            '_id': ObjectId(),
+            'at': datetime.now(timezone.utc),
+            'action': action,
+            'chamber_ids': [oid for oid in map(to_object_id, chamber_ids) if oid],
+            **details,
+        }
+        if object_doc:
+            event['object_id'] = object_doc.get('_id')
+            event['object_number'] = object_doc.get('object_number')
+        if has_request_context():
+            event['user'] = current_user.username if current_user.is_authenticated else None
+            event['ip'] = request.remote_addr
+
+        if not self.asynchronous:
+            self._write_now(event)
+            return
+        self._ensure_writer()
+        try:
+            self._queue.put(event, timeout=self.enqueue_timeout)
+            self.counters['enqueued'] += 1
+        except queue.Full:
+            # Зворотний тиск: фоновий потік не встигає, записуємо подію самі
+            self._write_now(event)
+
+    def _write_now(self, event):
+        try:
+            self._partition(event['at']).insert_one(event)
+            self.counters['sync_writes'] += 1
+        except PyMongoError as e:
+            self.counters['failed'] += 1
+            self.logger.error("Не вдалося записати подію аудиту %s: %s", event['action'], e)
+
+    def _partition(self, moment):
+        name = partition_name(moment)
+        collection = mongo.db[name]
+        if name not in self._indexed:
+            for keys in PARTITION_INDEXES:
+                collection.create_index(keys)
+            self._indexed.add(name)
+        return collection
+
+    def _ensure_writer(self):
+        # Потік запускається за першої події і заново - у кожному воркері після fork
+        with self._lock:
+            if self._pid == os.getpid() and self._writer and self._writer.is_alive():
+                return
+            self._pid = os.getpid()
+            self._writer = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+            self._writer.start()
+
+    def _take_batch(self, timeout):
+        try:
+            batch = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_batch(self, batch, attempts=3):
+        partitions = {}
+        for event in batch:
+            partitions.setdefault(partition_name(event['at']), []).append(event)
+        for events in partitions.values():
+            for attempt in range(attempts):
+                try:
+                    self._partition(events[0]['at']).insert_many(events, ordered=False)
+                    self.counters['written'] += len(events)
+                    break
+                except BulkWriteError as e:
+                    # Частину пакета вже записано попередньою спробою - дублікати ключа не є помилкою
+                    errors = [error for error in e.details['writeErrors'] if error['code'] != DUPLICATE_KEY]
+                    if not errors:
+                        self.counters['written'] += len(events)
+                        break
+                    self.counters['written'] += e.details['nInserted']
+                    self.counters['failed'] += len(errors)
+                    self.logger.error("Втрачено подій аудиту: %d (%s)", len(errors), errors[0]['errmsg'])
+                    break
+                except PyMongoError as e:
+                    # Повтор безпечний: _id подій вже задано, дублікати відхиляються сервером
+                    if attempt == attempts - 1:
+                        self.counters['failed'] += len(events)
+                        self.logger.error("Втрачено подій аудиту: %d (%s)", len(events), e)
+                    else:
+                        time.sleep(0.5 * 2 ** attempt)
+
+    def _run(self):
+        while True:
+            batch = self._take_batch(self.flush_interval)
+            if batch:
+                self._write_batch(batch)
+
+    def flush(self):
+        """Синхронно записує всі події з черги (зупинка процесу, CLI)"""
+        while batch := self._take_batch(0):
+            self._write_batch(batch)
+
+    def stats(self):
+        return {**self.counters, 'queued': self._queue.qsize()}
+
+    # --- Читання ---
+
+    def partitions(self):
+        """Місячні розділи журналу, від найновішого"""
+        names = mongo.db.list_collection_names(filter={'name': {'$regex': PARTITION_PATTERN.pattern}})
+        return sorted(names, reverse=True)
+
+    def query(self, object_id=None, chamber_id=None, user=None, before=None, limit=50):
+        """
+        Події за об'єктом, камерою та/або користувачем, від найновіших.
+        before - _id останньої отриманої події (курсор наступної сторінки).
+        """
+        query = {}
+        if object_id:
+            query['object_id'] = to_object_id(object_id)
+        if chamber_id:
+            query['chamber_ids'] = to_object_id(chamber_id)
+        if user:
+            query['user'] = user
+        cursor = to_object_id(before)
+        if cursor:
+            query['_id'] = {'$lt': cursor}
+
+        events = []
+        for name in self.partitions():
+            # Розділи, новіші за курсор, пропускаються без запиту
+            if cursor and name > partition_name(cursor.generation_time):
+                continue
+            events += mongo.db[name].find(query).sort('_id', DESCENDING).limit(limit - len(events))
+            if len(events) >= limit:
+                break
+        return events
+
+    def prune(self, keep_months):
+        """Видаляє розділи, старші за keep_months останніх місяців"""
+        now = datetime.now(timezone.utc)
+        month = now.year * 12 + now.month - 1 - (keep_months - 1)
+        oldest = f'{PARTITION_PREFIX}{month // 12:04d}_{month % 12 + 1:02d}'
+        dropped = [name for name in self.partitions() if name < oldest]
+        for name in dropped:
+            mongo.db.drop_collection(name)
+        return dropped
+
+
+audit = AuditLog()
@@ -0,0 +1,227 @@
+import csv
+import io
+import json
+from itertools import islice
+from pymongo.errors import BulkWriteError
+from app import mongo
+from app.models import AnomalyObject, ContainmentChamber
+from app.services.joins import NOT_DELETED, to_object_id
+from app.services.occupancy import reconcile_occupancy
+
+FORMATS = ('jsonl', 'csv')
+
+# Модель та обов'язкові поля для кожної колекції, що підтримує імпорт/експорт
+MODELS = {
+    'objects': (AnomalyObject, ('object_number', 'object_name')),
+    'chambers': (ContainmentChamber, ('location',)),
+}
+
+
+class BulkImportError(Exception):
+    """Некоректні параметри імпорту (колекція, формат)"""
+
+
+class InvalidRecord:
+    """Рядок файлу, який не вдалося розібрати (потрапляє в помилки імпорту, не перериваючи його)"""
+
+    def __init__(self, message):
+        self.message = message
+
+
+def fields_of(collection):
+    """Поля експорту - _id та поля, які записує модель"""
+    model, _ = MODELS[collection]
+    return ['_id'] + list(model({}).to_bson().keys())
+
+
+def read_records(stream, fmt):
+    """
+    Потоково читає записи з текстового потоку JSONL або CSV (по одному рядку).
+    Некоректний рядок JSONL повертається як InvalidRecord, щоб імпорт продовжився.
+    """
+    if fmt == 'jsonl':
+        for number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                yield InvalidRecord(f"рядок {number}: некоректний JSON ({e})")
+    elif fmt == 'csv':
+        yield from csv.DictReader(stream)
+    else:
+        raise BulkImportError(f"Невідомий формат: {fmt}")
+
+
+def batches(iterable, size):
+    """Розбиває ітерабельний об'єкт на списки довжиною до size (ліниво)"""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _prepare_object(record):
+    chamber_id = record.get('chamber_id') or None
+    if chamber_id and not to_object_id(chamber_id):
+        raise ValueError(f"некоректний chamber_id: {chamber_id}")
+    researchers = record.get('assigned_researchers') or []
+    if isinstance(researchers, str):
+        # У CSV список дослідників записується через ";"
+        researchers = [name.strip() for name in researchers.split(';') if name.strip()]
+    record = dict(record, chamber_id=chamber_id, assigned_researchers=researchers)
+    record.setdefault('status', 'Contained' if chamber_id else 'Discovered')
+    return AnomalyObject(record).to_bson()
+
+
+def _prepare_chamber(record):
+    # Заповненість не імпортується - її перераховує reconcile_occupancy після імпорту об'єктів
+    return ContainmentChamber(dict(record, current_occupancy=0)).to_bson()
+
+
+class _ChamberSpace:
+    """
+    Вільні місця камер під час імпорту об'єктів: камери завантажуються одним запитом ($in)
+    на пакет, а зайняті імпортом місця враховуються локально до фінальної звірки.
+    """
+
+    def __init__(self):
+        self.free = {}
+
+    def load(self, docs):
+        ids = {doc['chamber_id'] for doc in docs if doc.get('chamber_id')} - set(self.free)
+        if not ids:
+            return
+        for chamber in mongo.db.chambers.find({"_id": {"$in": list(ids)}, **NOT_DELETED},
+                                              {"capacity": 1, "current_occupancy": 1}):
+            self.free[chamber['_id']] = (chamber.get('capacity') or 0) - (chamber.get('current_occupancy') or 0)
+
+    def take(self, chamber_id):
+        if chamber_id not in self.free:
+            raise ValueError(f"камеру {chamber_id} не знайдено")
+        if self.free[chamber_id] <= 0:
+            raise ValueError(f"камера {chamber_id} переповнена")
+        self.free[chamber_id] -= 1
+
+    def give_back(self, chamber_id):
+        self.free[chamber_id] += 1
+
+
+def import_records(collection, records, batch_size=1000):
+    """
+    Валідує записи через моделі та вставляє їх пакетами insert_many(ordered=False).
+    Об'єкти з неіснуючою або заповненою камерою відхиляються. Заповненість камер
+    перераховується після імпорту навіть якщо його перервано помилкою.
+    Повертає словник зі статистикою: inserted, errors (список (номер запису, повідомлення)).
+    """
+    if collection not in MODELS:
+        raise BulkImportError(f"Невідома колекція: {collection}")
+    _, required = MODELS[collection]
+    prepare = _prepare_object if collection == 'objects' else _prepare_chamber
+
+    inserted, errors = 0, []
+    chamber_ids = set()
+    space = _ChamberSpace()
+
+    def validated():
+        for number, record in enumerate(records, start=1):
+            if isinstance(record, InvalidRecord):
+                errors.append((number, record.message))
+                continue
+            if not isinstance(record, dict):
+                errors.append((number, "запис має бути об'єктом (JSON-словником)"))
+                continue
+            # Порожні клітинки CSV трактуємо як відсутні поля (щоб спрацювали значення за замовчуванням)
+            record = {key: value for key, value in record.items() if value not in ('', None)}
+            missing = [field for field in required if not record.get(field)]
+            try:
+                if missing:
+                    raise ValueError(f"відсутні поля: {', '.join(missing)}")
+                doc = prepare(record)
+                # Збережений _id (наприклад, з експорту) дозволяє перенести зв'язки об'єкт -> камера
+                if record.get('_id'):
+                    doc['_id'] = to_object_id(record['_id'])
+                    if doc['_id'] is None:
+                        raise ValueError(f"некоректний _id: {record['_id']}")
+                yield number, doc
+            except (ValueError, TypeError, AttributeError) as e:
+                errors.append((number, str(e)))
+
+    def with_space(batch):
+        """Лишає в пакеті об'єкти, для яких камера існує і має вільне місце"""
+        space.load([doc for _, doc in batch])
+        accepted = []
+        for number, doc in batch:
+            try:
+                if doc.get('chamber_id'):
+                    space.take(doc['chamber_id'])
+                accepted.append((number, doc))
+            except ValueError as e:
+                errors.append((number, str(e)))
+        return accepted
+
+    try:
+        for batch in batches(validated(), batch_size):
+            if collection == 'objects':
+                batch = with_space(batch)
+                if not batch:
+                    continue
+            docs = [doc for _, doc in batch]
+            if collection == 'objects':
+                chamber_ids.update(doc['chamber_id'] for doc in docs if doc.get('chamber_id'))
+            else:
+                chamber_ids.update(doc['_id'] for doc in docs if doc.get('_id'))
+            try:
+                inserted += len(mongo.db[collection].insert_many(docs, ordered=False).inserted_ids)
+            except BulkWriteError as e:
+                inserted += e.details.get('nInserted', 0)
+                for write_error in e.details.get('writeErrors', []):
+                    number, doc = batch[write_error['index']]
+                    errors.append((number, write_error.get('errmsg', 'write error')))
+                    if collection == 'objects' and doc.get('chamber_id'):
+                        space.give_back(doc['chamber_id'])
+    finally:
+        # Одна агрегація замість $inc на кожен імпортований об'єкт
+        # (для камер - на випадок, якщо їхні об'єкти було імпортовано раніше)
+        if chamber_ids:
+            reconcile_occupancy(chamber_ids)
+
+    return {'inserted': inserted, 'errors': errors}
+
+
+def _plain(value):
+    """Значення BSON -> значення, придатне для JSON/CSV"""
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def export_records(collection, fmt, batch_size=1000):
+    """Генератор рядків експорту; документи читаються курсором пакетами, а не цілою колекцією"""
+    if collection not in MODELS:
+        raise BulkImportError(f"Невідома колекція: {collection}")
+    if fmt not in FORMATS:
+        raise BulkImportError(f"Невідомий формат: {fmt}")
+
+    fields = fields_of(collection)
+    projection = {field: 1 for field in fields}
+    cursor = mongo.db[collection].find(NOT_DELETED, projection).sort('_id', 1).batch_size(batch_size)
+
+    if fmt == 'jsonl':
+        for doc in cursor:
+            yield json.dumps({field: _plain(doc.get(field)) for field in fields}, ensure_ascii=False) + '\n'
+        return
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for doc in cursor:
+        row = [_plain(doc.get(field)) for field in fields]
+        writer.writerow([';'.join(value) if isinstance(value, list) else value for value in row])
+        if buffer.tell() >= 64 * 1024:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
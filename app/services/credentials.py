@@ -0,0 +1,96 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class CredentialsBusyError(Exception):
+    """Черга перевірки паролів переповнена (захист від вичерпання воркерів під час піків входу)"""
+
+
+class CredentialService:
+    """
+    Хешування та перевірка паролів в окремому пулі процесів.
+    Обчислення scrypt/pbkdf2 не утримує GIL і не займає потоки воркерів довше, ніж потрібно,
+    а кількість задач у черзі обмежена.
+    """
+
+    def __init__(self):
+        self.method = 'scrypt'
+        self.salt_length = 16
+        self.workers = 0
+        self.timeout = 10
+        self._canonical_method = None
+        self._executor = None
+        self._executor_pid = None
+        self._slots = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.method = app.config.get('PASSWORD_HASH_METHOD', 'scrypt')
+        self.salt_length = app.config.get('PASSWORD_SALT_LENGTH', 16)
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS', 2)
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT', 10)
+        self._canonical_method = None
+        # Не більше ніж (процеси * 4) задач одночасно в черзі пулу
+        self._slots = threading.BoundedSemaphore(max(1, self.workers) * 4)
+
+    def _pool(self):
+        # Пул створюється ліниво і заново після fork (кожен воркер gunicorn має власний)
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                # forkserver: fork воркера gunicorn з потоками (монітори MongoClient, аудит, завдання),
+                # що тримають блокування, міг би заблокувати дочірній процес назавжди
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context('forkserver'))
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def _run(self, func, *args):
+        if not self.workers:
+            return func(*args)
+        # Один термін на очікування місця в черзі і результату: запит блокується не довше за timeout
+        deadline = time.monotonic() + self.timeout
+        if not self._slots.acquire(timeout=self.timeout):
+            raise CredentialsBusyError()
+        try:
+            executor = self._pool()
+            future = executor.submit(func, *args)
+            return future.result(timeout=max(0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            # Задача ще в черзі або виконується - скасовуємо, якщо встигаємо, і відповідаємо як на перевантаження
+            future.cancel()
+            raise CredentialsBusyError()
+        except BrokenProcessPool:
+            # Процес пулу аварійно завершився (OOM тощо) - наступний виклик створить новий пул
+            self._reset(executor)
+            raise CredentialsBusyError()
+        finally:
+            self._slots.release()
+
+    def _reset(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def hash_password(self, password):
+        return self._run(generate_password_hash, password, self.method, self.salt_length)
+
+    def verify_password(self, password_hash, password):
+        if not password_hash:
+            return False
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """True, якщо хеш створено іншим алгоритмом або з іншими параметрами вартості"""
+        if self._canonical_method is None:
+            # Werkzeug доповнює метод параметрами за замовчуванням (напр. scrypt -> scrypt:32768:8:1)
+            self._canonical_method = self.hash_password('').split('$', 1)[0]
+        return password_hash.split('$', 1)[0] != self._canonical_method
+
+
+credentials = CredentialService()
@@ -0,0 +1,100 @@
+from datetime import datetime, timezone
+from bson.objectid import ObjectId
+from pymongo import ASCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+from app.services.joins import NOT_DELETED
+
+# Індекси, необхідні для "гарячих" запитів, згруповані за колекціями
+INDEXES = {
+    'users': [
+        # find_one({"username"}) при кожному вході та реєстрації
+        IndexModel([('username', ASCENDING)], name='username_unique', unique=True),
+    ],
+    'objects': [
+        # Частковий: старі документи без номера (чи з null) не заважають створенню індексу
+        IndexModel(
+            [('object_number', ASCENDING)], name='object_number_unique', unique=True,
+            partialFilterExpression={'object_number': {'$type': 'string'}}
+        ),
+        # view_chamber та фільтр реєстру за камерою (з _id для keyset-пагінації)
+        IndexModel([('chamber_id', ASCENDING), ('_id', ASCENDING)], name='chamber_id'),
+        IndexModel([('object_class', ASCENDING), ('_id', ASCENDING)], name='object_class'),
+        IndexModel([('status', ASCENDING), ('_id', ASCENDING)], name='status'),
+        # Повнотекстовий пошук по реєстру (в колекції може бути лише один text-індекс)
+        IndexModel(
+            [('object_name', TEXT), ('description', TEXT), ('special_contaiment_procedures', TEXT)],
+            name='objects_text',
+            weights={'object_name': 10, 'special_contaiment_procedures': 2, 'description': 1},
+            default_language='none'
+        ),
+    ],
+    'chambers': [
+        IndexModel([('status', ASCENDING), ('_id', ASCENDING)], name='status'),
+    ],
+    'jobs': [
+        # Вибір наступного фонового завдання (очікує або з простроченою орендою)
+        IndexModel([('status', ASCENDING), ('created_at', ASCENDING)], name='status_created'),
+    ],
+}
+
+# Запити, план яких перевіряється командою check-indexes: (колекція, фільтр, сортування).
+# Фільтри - такі самі, як у маршрутах і сервісах (з умовою NOT_DELETED, run_after тощо).
+# Примітка: умова $expr (current_occupancy < capacity) порівнює два поля документа
+# і не може використати індекс, тому вона сюди не входить.
+_NOW = datetime.now(timezone.utc)
+QUERY_PLANS = [
+    ('users', {'username': 'admin'}, None),
+    ('objects', {'object_number': 'SCP-000'}, None),
+    ('objects', {'chamber_id': ObjectId(), **NOT_DELETED}, [('_id', ASCENDING)]),
+    ('objects', {'object_class': 'Keter', **NOT_DELETED}, [('_id', ASCENDING)]),
+    ('objects', {'status': 'Contained', **NOT_DELETED}, [('_id', ASCENDING)]),
+    ('objects', NOT_DELETED, [('_id', ASCENDING)]),
+    ('chambers', {'status': 'Active', **NOT_DELETED}, [('_id', ASCENDING)]),
+    ('chambers', NOT_DELETED, [('_id', ASCENDING)]),
+    # JobRunner.claim
+    ('jobs', {'$or': [
+        {'status': 'pending', 'run_after': {'$not': {'$gt': _NOW}}},
+        {'status': 'running', 'lease_until': {'$lt': _NOW}, 'attempts': {'$lt': 5}},
+    ]}, [('created_at', ASCENDING)]),
+    ('objects', {'$text': {'$search': 'anomaly'}, **NOT_DELETED}, None),
+]
+
+
+def ensure_indexes(db):
+    """
+    Створює всі оголошені індекси (операція ідемпотентна).
+    Помилка однієї колекції (напр. дублікати під унікальним індексом) не зупиняє решту.
+    Повертає ({колекція: [імена індексів]}, {колекція: текст помилки}).
+    """
+    created, failed = {}, {}
+    for name, models in INDEXES.items():
+        try:
+            created[name] = db[name].create_indexes(models)
+        except OperationFailure as e:
+            failed[name] = str(e)
+    return created, failed
+
+
+def _stages(plan):
+    """Рекурсивно обходить дерево плану запиту і повертає назви всіх стадій"""
+    if isinstance(plan, dict):
+        if 'stage' in plan:
+            yield plan['stage']
+        for value in plan.values():
+            yield from _stages(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            yield from _stages(value)
+
+
+def verify_query_plans(db):
+    """Повертає список запитів, які все ще виконуються повним скануванням колекції (COLLSCAN)"""
+    failures = []
+    for collection, query, sort in QUERY_PLANS:
+        cursor = db[collection].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        winning_plan = cursor.explain().get('queryPlanner', {}).get('winningPlan', {})
+        if 'COLLSCAN' in set(_stages(winning_plan)):
+            failures.append((collection, query))
+    return failures
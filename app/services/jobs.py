@@ -0,0 +1,212 @@
+import os
+import socket
+import threading
+from datetime import datetime, timedelta, timezone
+from bson.objectid import ObjectId
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import PyMongoError
+from app import mongo
+from app.services.joins import to_object_id
+from app.services.occupancy import release_objects, purge_chamber, purge_object
+from app.services.page_cache import page_cache
+from app.services.placement import placement
+from app.services.stats import stats
+
+PENDING, RUNNING, DONE, FAILED = 'pending', 'running', 'done', 'failed'
+
+
+class JobRunner:
+    """
+    Фонові завдання (колекція jobs). Обробник завдання - генератор, що виконує роботу порціями
+    і повертає кількість оброблених записів; після кожної порції прогрес зберігається, а оренда
+    (lease_until) продовжується. Якщо процес упав, оренда спливає і завдання підхоплює інший
+    воркер: кроки обробників ідемпотентні, тому робота продовжується з місця зупинки.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.batch_size = 500
+        self.lease_seconds = 60
+        self.poll_interval = 5
+        self.max_attempts = 5
+        self.retry_delay = 5
+        self.retry_max_delay = 300
+        self.logger = None
+        self.handlers = {}
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._runner = None
+        self._pid = None
+
+    def init_app(self, app):
+        self.enabled = app.config.get('JOBS_ENABLED', True)
+        self.batch_size = app.config.get('JOBS_BATCH_SIZE', 500)
+        self.lease_seconds = app.config.get('JOBS_LEASE_SECONDS', 60)
+        self.poll_interval = app.config.get('JOBS_POLL_INTERVAL', 5)
+        self.max_attempts = app.config.get('JOBS_MAX_ATTEMPTS', 5)
+        self.retry_delay = app.config.get('JOBS_RETRY_DELAY', 5)
+        self.retry_max_delay = app.config.get('JOBS_RETRY_MAX_DELAY', 300)
+        self.logger = app.logger
+        if self.enabled:
+            # Потік запускається з першим запитом у кожному воркері (після fork)
+            app.before_request(self._ensure_runner)
+
+    def handler(self, job_type):
+        """Реєструє обробник: func(target, batch_size) -> ітератор кількостей оброблених записів"""
+        def register(func):
+            self.handlers[job_type] = func
+            return func
+        return register
+
+    # --- Черга ---
+
+    def enqueue(self, job_type, target, total=None):
+        """Ставить завдання в чергу; total - очікувана кількість записів (для відображення прогресу)"""
+        now = datetime.now(timezone.utc)
+        job = {
+            '_id': ObjectId(),
+            'type': job_type,
+            'target': target,
+            'status': PENDING,
+            'processed': 0,
+            'total': total,
+            'attempts': 0,
+            'owner': None,
+            'lease_until': None,
+            # Не раніше цього часу (відкладений повтор після помилки БД)
+            'run_after': None,
+            'error': None,
+            'created_at': now,
+            'updated_at': now,
+        }
+        mongo.db.jobs.insert_one(job)
+        self._wake.set()
+        return job['_id']
+
+    def get(self, job_id):
+        return mongo.db.jobs.find_one({'_id': to_object_id(job_id)})
+
+    def claim(self):
+        """
+        Бере найстаріше завдання, що очікує (і чий відкладений повтор уже настав),
+        або завдання з простроченою орендою (упалий воркер)
+        """
+        now = datetime.now(timezone.utc)
+        return mongo.db.jobs.find_one_and_update(
+            {'$or': [
+                # $not/$gt: run_after порожній, відсутній (завдання старих версій) або вже минув
+                {'status': PENDING, 'run_after': {'$not': {'$gt': now}}},
+                {'status': RUNNING, 'lease_until': {'$lt': now}, 'attempts': {'$lt': self.max_attempts}},
+            ]},
+            {
+                '$set': {
+                    'status': RUNNING,
+                    # Власник - конкретна спроба: прострочена спроба не зможе записати прогрес
+                    'owner': f'{socket.gethostname()}:{os.getpid()}:{ObjectId()}',
+                    'lease_until': now + timedelta(seconds=self.lease_seconds),
+                    'updated_at': now,
+                },
+                '$inc': {'attempts': 1},
+            },
+            sort=[('created_at', ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    def fail_abandoned(self):
+        """
+        Завдання, що вичерпали спроби з простроченою орендою (процес падав на кожній, напр. OOM),
+        позначаються невдалими, інакше їх підхоплювали б знову без кінця. Повертає їх кількість.
+        """
+        now = datetime.now(timezone.utc)
+        return mongo.db.jobs.update_many(
+            {'status': RUNNING, 'lease_until': {'$lt': now}, 'attempts': {'$gte': self.max_attempts}},
+            {'$set': {'status': FAILED, 'lease_until': None, 'updated_at': now,
+                      'error': f'оренду втрачено в кожній із {self.max_attempts} спроб (воркер завершився аварійно?)'}}
+        ).modified_count
+
+    def _update(self, job, changes, inc=None):
+        now = datetime.now(timezone.utc)
+        update = {'$set': {**changes, 'updated_at': now}}
+        if inc:
+            update['$inc'] = inc
+        result = mongo.db.jobs.update_one({'_id': job['_id'], 'owner': job['owner']}, update)
+        return result.matched_count == 1
+
+    # --- Виконання ---
+
+    def run(self, job):
+        """Виконує завдання; повертає False, якщо оренду перехопив інший процес"""
+        handler = self.handlers.get(job['type'])
+        if not handler:
+            return self._update(job, {'status': FAILED, 'error': f"невідомий тип завдання: {job['type']}"})
+        try:
+            for processed in handler(job['target'], self.batch_size):
+                lease_until = datetime.now(timezone.utc) + timedelta(seconds=self.lease_seconds)
+                if not self._update(job, {'lease_until': lease_until}, inc={'processed': processed}):
+                    self.logger.warning("Оренду завдання %s втрачено, виконання перервано", job['_id'])
+                    return False
+        except PyMongoError as e:
+            # Повторна спроба - з місця зупинки і з експоненційною затримкою (БД може бути недоступна
+            # ще якийсь час); після max_attempts завдання позначається невдалим
+            status = FAILED if job['attempts'] >= self.max_attempts else PENDING
+            delay = min(self.retry_delay * 2 ** (job['attempts'] - 1), self.retry_max_delay)
+            self.logger.warning("Завдання %s (%s) перервано, повтор через %s с: %s", job['_id'], job['type'], delay, e)
+            return self._update(job, {'status': status, 'error': str(e), 'lease_until': None,
+                                      'run_after': datetime.now(timezone.utc) + timedelta(seconds=delay)})
+        except Exception as e:
+            # Помилка в самому обробнику: повтор не допоможе
+            self.logger.exception("Завдання %s (%s) завершилось помилкою", job['_id'], job['type'])
+            return self._update(job, {'status': FAILED, 'error': str(e), 'lease_until': None})
+        return self._update(job, {'status': DONE, 'error': None, 'lease_until': None})
+
+    def run_pending(self):
+        """Виконує всі доступні завдання по черзі; повертає їх кількість"""
+        count = 0
+        self.fail_abandoned()
+        while job := self.claim():
+            self.run(job)
+            count += 1
+        return count
+
+    def _ensure_runner(self):
+        with self._lock:
+            if self._pid == os.getpid() and self._runner and self._runner.is_alive():
+                return
+            self._pid = os.getpid()
+            self._runner = threading.Thread(target=self._run_loop, name='jobs-runner', daemon=True)
+            self._runner.start()
+
+    def _run_loop(self):
+        while True:
+            self._wake.clear()
+            try:
+                self.run_pending()
+            except PyMongoError as e:
+                self.logger.warning("Не вдалося отримати фонові завдання: %s", e)
+            # Нове завдання цього процесу будить потік одразу, завдання інших - за опитуванням
+            self._wake.wait(self.poll_interval)
+
+
+jobs = JobRunner()
+
+
+@jobs.handler('chamber.delete')
+def delete_chamber(chamber_id, batch_size):
+    """Каскад видалення камери: порціями звільняє її об'єкти, потім видаляє саму камеру"""
+    while released := release_objects(chamber_id, batch_size):
+        page_cache.bump('objects', 'chambers')
+        yield released
+    purge_chamber(chamber_id)
+    # Статуси об'єктів змінено масово - підсумки перераховуються повністю
+    stats.refresh_safely()
+    page_cache.bump('objects', 'chambers')
+
+
+@jobs.handler('object.delete')
+def delete_object(object_id, batch_size):
+    """Звільняє місце видаленого об'єкта в камері та видаляє документ"""
+    chamber = purge_object(object_id)
+    stats.occupancy_changed(chamber, -1)
+    placement.chamber_changed(chamber)
+    page_cache.bump('chambers')
+    yield 1
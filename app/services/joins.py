@@ -0,0 +1,51 @@
+from bson.objectid import ObjectId
+from bson.errors import InvalidId
+from app.services.reads import reads
+from app.models import AnomalyObject, ContainmentChamber
+
+# Умова "в камері є вільне місце" (резервування місця та дані форми в API)
+HAS_FREE_SPACE = {"$expr": {"$lt": ["$current_occupancy", "$capacity"]}}
+
+# Умова "документ не видалено": видалення позначає документ (deleted_at), а фактичне
+# видалення та каскадні зміни виконує фонове завдання (див. jobs.py)
+NOT_DELETED = {"deleted_at": None}
+
+
+def to_object_id(value):
+    """Безпечне перетворення рядка на ObjectId (None, якщо значення некоректне)"""
+    if isinstance(value, ObjectId):
+        return value
+    try:
+        return ObjectId(value) if value else None
+    except (InvalidId, TypeError):
+        return None
+
+
+def load_chambers(chamber_ids, fields=None):
+    """Завантажує всі камери зі списку одним запитом ($in) -> {str(_id): ContainmentChamber}"""
+    ids = {oid for oid in (to_object_id(cid) for cid in chamber_ids) if oid}
+    if not ids:
+        return {}
+    projection = ContainmentChamber.projection(fields) if fields else None
+    docs = reads.collection('chambers').find({"_id": {"$in": list(ids)}, **NOT_DELETED}, projection)
+    return {chamber._id: chamber for chamber in ContainmentChamber.from_batch(docs, fields)}
+
+
+def attach_chambers(objects, fields=None):
+    """Приєднує chamber_info до кожного AnomalyObject за один запит до БД (замість N+1)"""
+    objects = list(objects)
+    chambers = load_chambers((obj.chamber_id for obj in objects if obj.chamber_id), fields)
+    for obj in objects:
+        obj.chamber_info = chambers.get(obj.chamber_id) if obj.chamber_id else None
+    return objects
+
+
+def objects_in_chamber(chamber):
+    """Об'єкти, що містяться в камері; камера вже відома, тому приєднуємо її без запитів"""
+    fields = ('object_number', 'object_name', 'object_class', 'chamber_id')
+    cursor = reads.collection('objects').find({"chamber_id": ObjectId(chamber._id), **NOT_DELETED}, AnomalyObject.projection(fields))
+    objects = AnomalyObject.from_batch(cursor, fields)
+    for obj in objects:
+        obj.chamber_info = chamber
+    return objects
+
@@ -0,0 +1,193 @@
+import os
+import queue
+import threading
+import time
+from pymongo.errors import OperationFailure, PyMongoError
+from app import mongo
+
+# Колекції, зміни яких транслюються на дашборди
+WATCHED = ('chambers', 'objects')
+
+# Код помилки MongoDB ChangeStreamHistoryLost
+CHANGE_STREAM_HISTORY_LOST = 286
+
+# Лише поля, потрібні дашбордам: великі текстові поля об'єктів не передаються через потік
+CHANGE_PIPELINE = [
+    {'$match': {'ns.coll': {'$in': list(WATCHED)}}},
+    {'$project': {
+        'operationType': 1,
+        'ns': 1,
+        'documentKey': 1,
+        'fullDocument.current_occupancy': 1,
+        'fullDocument.capacity': 1,
+        'fullDocument.status': 1,
+        'fullDocument.location': 1,
+        'fullDocument.chamber_id': 1,
+        'fullDocument.object_number': 1,
+        # М'яке видалення: такі зміни транслюються як delete
+        'fullDocument.deleted_at': 1,
+    }},
+]
+
+
+class Subscription:
+    """Черга подій одного підключеного клієнта"""
+
+    def __init__(self, topics, maxsize):
+        self.topics = topics
+        self.events = queue.Queue(maxsize)
+        # Клієнт не встиг забрати події - його дані вже неповні, потрібне перезавантаження
+        self.overflowed = False
+
+    def get(self, timeout):
+        return self.events.get(timeout=timeout)
+
+
+class LiveFeed:
+    """
+    Трансляція змін реєстру на дашборди (Server-Sent Events).
+    Один потік на процес читає change stream бази даних і розсилає події в черги
+    підписників за темами: "chambers", "objects" та "chamber:<id>".
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.queue_size = 100
+        self.max_subscribers = 5000
+        self.logger = None
+        self._topics = {}
+        self._count = 0
+        self._lock = threading.Lock()
+        self._watcher = None
+        self._pid = None
+        self._resume_token = None
+        self.events_published = 0
+        self.subscribers_dropped = 0
+
+    def init_app(self, app):
+        self.enabled = app.config.get('LIVE_UPDATES_ENABLED', False)
+        self.queue_size = app.config.get('LIVE_QUEUE_SIZE', 100)
+        self.max_subscribers = app.config.get('LIVE_MAX_SUBSCRIBERS', 5000)
+        self.logger = app.logger
+
+    def full(self):
+        with self._lock:
+            return self._count >= self.max_subscribers
+
+    def subscribe(self, topics):
+        """
+        Повертає підписку або None, якщо досягнуто ліміту підписників процесу.
+        Викликається з генератора відповіді: до unsubscribe гарантовано дійде лише почата відповідь.
+        """
+        sub = Subscription(tuple(topics), self.queue_size)
+        with self._lock:
+            if self._count >= self.max_subscribers:
+                return None
+            for topic in sub.topics:
+                self._topics.setdefault(topic, set()).add(sub)
+            self._count += 1
+        self._ensure_watcher()
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            for topic in sub.topics:
+                subs = self._topics.get(topic)
+                if subs and sub in subs:
+                    subs.discard(sub)
+                    if not subs:
+                        del self._topics[topic]
+            self._count -= 1
+
+    def publish(self, topics, event):
+        """Розсилає подію всім підписникам тем (кожному - не більше одного разу)"""
+        with self._lock:
+            targets = set()
+            for topic in topics:
+                targets.update(self._topics.get(topic, ()))
+        for sub in targets:
+            if sub.overflowed:
+                continue
+            try:
+                sub.events.put_nowait(event)
+            except queue.Full:
+                sub.overflowed = True
+                self.subscribers_dropped += 1
+        self.events_published += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'subscribers': self._count,
+                'topics': len(self._topics),
+                'watcher_alive': bool(self._watcher and self._watcher.is_alive()),
+                'events_published': self.events_published,
+                'subscribers_dropped': self.subscribers_dropped,
+            }
+
+    def _ensure_watcher(self):
+        # Потік запускається лише за першої підписки і заново - у кожному воркері після fork
+        with self._lock:
+            if self._pid == os.getpid() and self._watcher and self._watcher.is_alive():
+                return
+            self._pid = os.getpid()
+            self._watcher = threading.Thread(target=self._watch, name='live-feed', daemon=True)
+            self._watcher.start()
+
+    def _watch(self):
+        delay = 1
+        while True:
+            try:
+                with mongo.db.watch(CHANGE_PIPELINE, full_document='updateLookup',
+                                    resume_after=self._resume_token) as stream:
+                    delay = 1
+                    for change in stream:
+                        self._resume_token = stream.resume_token
+                        self.dispatch(change)
+            except PyMongoError as e:
+                # Токен відновлення вже витіснено з oplog: події пропущено, клієнтам потрібне оновлення
+                if isinstance(e, OperationFailure) and e.code == CHANGE_STREAM_HISTORY_LOST:
+                    self._resume_token = None
+                    self.publish(self._all_topics(), {'kind': 'resync'})
+                # Також напр. standalone-сервер без replica set, де change streams недоступні
+                if self.logger:
+                    self.logger.warning("Потік змін недоступний, повтор через %s с: %s", delay, e)
+                time.sleep(delay)
+                delay = min(delay * 2, 60)
+
+    def _all_topics(self):
+        with self._lock:
+            return list(self._topics)
+
+    def dispatch(self, change):
+        """Перетворює подію change stream на подію дашборда"""
+        collection = change['ns']['coll']
+        doc_id = str(change['documentKey']['_id'])
+        doc = change.get('fullDocument') or {}
+        # Позначений видаленим документ (м'яке видалення) для дашборда вже видалений
+        op = 'delete' if doc.get('deleted_at') else change['operationType']
+
+        if collection == 'chambers':
+            event = {
+                'kind': 'chamber', 'op': op, 'id': doc_id,
+                'current_occupancy': doc.get('current_occupancy'),
+                'capacity': doc.get('capacity'),
+                'status': doc.get('status'),
+                'location': doc.get('location'),
+            }
+            self.publish(('chambers', f'chamber:{doc_id}'), event)
+        else:
+            chamber_id = str(doc['chamber_id']) if doc.get('chamber_id') else None
+            event = {
+                'kind': 'object', 'op': op, 'id': doc_id,
+                'object_number': doc.get('object_number'),
+                'status': doc.get('status'),
+                'chamber_id': chamber_id,
+            }
+            topics = ['objects']
+            if chamber_id:
+                topics.append(f'chamber:{chamber_id}')
+            self.publish(topics, event)
+
+
+live_feed = LiveFeed()
@@ -0,0 +1,241 @@
+import calendar
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from flask import Response, g, request, before_render_template, template_rendered
+from pymongo import monitoring
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+class Histogram:
+    """Гістограма у форматі Prometheus (кумулятивні бакети, сума та кількість спостережень)"""
+
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            index = bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for label_values, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    labels = _format_labels(self.labels, label_values, ('le', bound))
+                    lines.append(f'{self.name}_bucket{labels} {cumulative}')
+                labels = _format_labels(self.labels, label_values, ('le', '+Inf'))
+                lines.append(f'{self.name}_bucket{labels} {count}')
+                labels = _format_labels(self.labels, label_values)
+                lines.append(f'{self.name}_sum{labels} {total}')
+                lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Тривалість обробки HTTP-запиту',
+    ('endpoint', 'blueprint', 'method', 'status')
+)
+REQUEST_DB_COMMANDS = Histogram(
+    'http_request_db_commands', 'Кількість команд MongoDB на один HTTP-запит',
+    ('endpoint', 'blueprint'), COUNT_BUCKETS
+)
+REQUEST_DB_TIME = Histogram(
+    'http_request_db_seconds', 'Сумарний час команд MongoDB на один HTTP-запит',
+    ('endpoint', 'blueprint')
+)
+TEMPLATE_RENDER = Histogram(
+    'template_render_seconds', 'Тривалість рендерингу шаблону Jinja', ('template',)
+)
+MONGO_COMMAND = Histogram(
+    'mongo_command_duration_seconds', 'Тривалість команди MongoDB', ('command', 'collection', 'outcome')
+)
+
+HISTOGRAMS = (REQUEST_LATENCY, REQUEST_DB_COMMANDS, REQUEST_DB_TIME, TEMPLATE_RENDER, MONGO_COMMAND)
+
+# Стан поточного запиту. Драйвер PyMongo викликає слухача в потоці, що виконує команду;
+# контекстна змінна (на відміну від thread-local) копіюється і в потоки asyncio.to_thread
+# асинхронних view, тож їхні команди теж зараховуються запиту (лічильники - під _state_lock).
+_request_state = ContextVar('metrics_request', default=None)
+_state_lock = threading.Lock()
+
+
+class CommandTimer(monitoring.CommandListener):
+    """Слухач команд PyMongo: час кожної команди та перелік команд поточного HTTP-запиту"""
+
+    def __init__(self):
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (
+                collection if isinstance(collection, str) else ''
+            )
+
+    def _finish(self, event, outcome):
+        with self._lock:
+            collection = self._pending.pop((event.connection_id, event.request_id), '')
+        seconds = event.duration_micros / 1e6
+        MONGO_COMMAND.observe(seconds, event.command_name, collection, outcome)
+
+        state = _request_state.get()
+        if state is not None:
+            with _state_lock:
+                state['db_commands'] += 1
+                state['db_time'] += seconds
+                state['queries'].append((event.command_name, collection, round(seconds * 1000, 2)))
+
+    def succeeded(self, event):
+        self._finish(event, 'success')
+
+    def failed(self, event):
+        self._finish(event, 'failure')
+
+
+command_timer = CommandTimer()
+
+
+def _before_render(sender, template, context, **extra):
+    g._render_started = time.perf_counter()
+
+
+def _rendered(sender, template, context, **extra):
+    started = g.pop('_render_started', None)
+    if started is not None:
+        TEMPLATE_RENDER.observe(time.perf_counter() - started, template.name or '')
+
+
+def render_metrics(extra_lines=()):
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    lines.extend(extra_lines)
+    return '\n'.join(lines) + '\n'
+
+
+def _drift_lines():
+    """Підсумки останньої повної звірки заповненості (звіт у БД, спільний для всіх процесів)"""
+    from pymongo.errors import PyMongoError
+    from app.services.occupancy import last_reconciliation
+    try:
+        report = last_reconciliation()
+    except PyMongoError:
+        return []
+    if not report:
+        return []
+    gauges = (
+        ('occupancy_chambers_drifted', 'Камери, заповненість яких розходилась з фактичною', report.get('chambers_drifted', 0)),
+        ('occupancy_total_drift', 'Сумарна розбіжність заповненості камер', report.get('total_drift', 0)),
+        ('occupancy_max_drift', 'Найбільша розбіжність заповненості однієї камери', report.get('max_drift', 0)),
+        ('occupancy_orphaned_objects', "Об'єкти, що посилаються на неіснуючі камери", report.get('orphaned_objects', 0)),
+        ('occupancy_reconciliation_timestamp_seconds', 'Час останньої повної звірки (Unix)',
+         calendar.timegm(report['checked_at'].utctimetuple()) if report.get('checked_at') else 0),
+    )
+    lines = []
+    for name, documentation, value in gauges:
+        lines += [f'# HELP {name} {documentation}', f'# TYPE {name} gauge', f'{name} {value}']
+    return lines
+
+
+def init_app(app):
+    """Підключає хуки запиту, таймер шаблонів та ендпоінт /metrics"""
+    slow_ms = app.config.get('SLOW_REQUEST_MS', 0)
+
+    @app.before_request
+    def _start_request():
+        _request_state.set({'started': time.perf_counter(), 'db_commands': 0, 'db_time': 0.0, 'queries': []})
+
+    @app.after_request
+    def _finish_request(response):
+        state = _request_state.get()
+        _request_state.set(None)
+        if state is None or request.endpoint == 'metrics':
+            return response
+
+        elapsed = time.perf_counter() - state['started']
+        endpoint = request.endpoint or 'unknown'
+        blueprint = request.blueprint or ''
+        REQUEST_LATENCY.observe(elapsed, endpoint, blueprint, request.method, str(response.status_code))
+        REQUEST_DB_COMMANDS.observe(state['db_commands'], endpoint, blueprint)
+        REQUEST_DB_TIME.observe(state['db_time'], endpoint, blueprint)
+
+        if slow_ms and elapsed * 1000 >= slow_ms:
+            app.logger.warning(
+                "Повільний запит %s %s: %.1f мс, команд БД: %d (%.1f мс): %s",
+                request.method, request.path, elapsed * 1000, state['db_commands'],
+                state['db_time'] * 1000,
+                ', '.join(f'{name} {collection} {ms}ms' for name, collection, ms in state['queries'])
+            )
+        return response
+
+    @app.teardown_request
+    def _clear_request(exc):
+        _request_state.set(None)
+
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_rendered, app)
+
+    def metrics():
+        from app.services.user_cache import user_cache
+        from app.services.live import live_feed
+        from app.services.audit import audit
+        stats = user_cache.stats()
+        live = live_feed.stats()
+        audit_stats = audit.stats()
+        extra = [
+            '# HELP user_cache_requests_total Звернення до кешу користувачів сесії',
+            '# TYPE user_cache_requests_total counter',
+            f'user_cache_requests_total{{result="hit"}} {stats["hits"]}',
+            f'user_cache_requests_total{{result="miss"}} {stats["misses"]}',
+            '# HELP live_subscribers Підключені клієнти потоку /live/events',
+            '# TYPE live_subscribers gauge',
+            f'live_subscribers {live["subscribers"]}',
+            '# HELP live_events_published_total Події змін, розіслані підписникам',
+            '# TYPE live_events_published_total counter',
+            f'live_events_published_total {live["events_published"]}',
+            '# HELP live_subscribers_dropped_total Підписники, відключені через переповнену чергу',
+            '# TYPE live_subscribers_dropped_total counter',
+            f'live_subscribers_dropped_total {live["subscribers_dropped"]}',
+            '# HELP audit_events_total Події журналу аудиту за способом запису',
+            '# TYPE audit_events_total counter',
+            f'audit_events_total{{result="batched"}} {audit_stats["written"]}',
+            f'audit_events_total{{result="sync"}} {audit_stats["sync_writes"]}',
+            f'audit_events_total{{result="failed"}} {audit_stats["failed"]}',
+            '# HELP audit_queue_size Події в черзі на запис',
+            '# TYPE audit_queue_size gauge',
+            f'audit_queue_size {audit_stats["queued"]}',
+        ]
+        extra.extend(_drift_lines())
+        return Response(render_metrics(extra), mimetype='text/plain; version=0.0.4')
+
+    app.add_url_rule('/metrics', 'metrics', metrics)
@@ -0,0 +1,258 @@
+from datetime import datetime, timezone
+from flask import current_app
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import OperationFailure
+from app import mongo
+from app.services.joins import HAS_FREE_SPACE, NOT_DELETED, to_object_id
+
+# Код помилки MongoDB, коли транзакції недоступні (standalone mongod без replica set)
+ILLEGAL_OPERATION = 20
+
+# Документ зі звітом про останню звірку заповненості (колекція maintenance)
+RECONCILIATION_REPORT_ID = 'occupancy_reconciliation'
+
+
+class ChamberFullError(Exception):
+    """Обрана камера переповнена (або не існує)"""
+
+
+class ObjectChangedError(Exception):
+    """Об'єкт паралельно перемістили в іншу камеру або видалили"""
+
+
+def reserve_slot(chamber_id, session=None, count=1):
+    """
+    Атомарно займає одне (або count) місце в камері за один запит.
+    Умова current_occupancy + count <= capacity перевіряється самим сервером,
+    тому паралельні запити не можуть переповнити камеру.
+    Повертає оновлений документ камери або None, якщо місця немає.
+    """
+    free_space = HAS_FREE_SPACE
+    if count != 1:
+        free_space = {"$expr": {"$lte": [{"$add": ["$current_occupancy", count]}, "$capacity"]}}
+    return mongo.db.chambers.find_one_and_update(
+        {"_id": to_object_id(chamber_id), **NOT_DELETED, **free_space},
+        {"$inc": {"current_occupancy": count}},
+        return_document=ReturnDocument.AFTER,
+        session=session
+    )
+
+
+def release_slot(chamber_id, session=None):
+    """Звільняє одне місце в камері (лічильник не опускається нижче нуля)"""
+    return mongo.db.chambers.find_one_and_update(
+        {"_id": to_object_id(chamber_id), "current_occupancy": {"$gt": 0}},
+        {"$inc": {"current_occupancy": -1}},
+        return_document=ReturnDocument.AFTER,
+        session=session
+    )
+
+
+def _move(object_id, expected_chamber_id, old_chamber_id, new_chamber_id, updated_data, session=None):
+    """
+    Кроки переміщення: спочатку резервуємо нове місце, лише потім звільняємо старе.
+    Об'єкт оновлюється лише якщо він досі в expected_chamber_id: інакше паралельна зміна
+    вже перенесла його, і повторне звільнення старого місця зменшило б заповненість двічі.
+    """
+    new_chamber = old_chamber = None
+    if new_chamber_id:
+        new_chamber = reserve_slot(new_chamber_id, session)
+        if not new_chamber:
+            raise ChamberFullError(new_chamber_id)
+    try:
+        result = mongo.db.objects.update_one(
+            {"_id": to_object_id(object_id), "chamber_id": to_object_id(expected_chamber_id), **NOT_DELETED},
+            {"$set": updated_data},
+            session=session
+        )
+        if result.matched_count == 0:
+            raise ObjectChangedError(object_id)
+    except Exception:
+        # Поза транзакцією повертаємо зайняте місце вручну (у транзакції зміни відкочуються)
+        if session is None and new_chamber_id:
+            release_slot(new_chamber_id)
+        raise
+    if old_chamber_id:
+        old_chamber = release_slot(old_chamber_id, session)
+    return new_chamber, old_chamber
+
+
+def move_object(object_id, old_chamber_id, new_chamber_id, updated_data):
+    """
+    Оновлює об'єкт і (за потреби) переносить його між камерами.
+    На replica set усі зміни виконуються в одній транзакції; на standalone
+    сервері - послідовно, з резервуванням нового місця перед звільненням старого.
+    old_chamber_id - камера, в якій об'єкт був під час читання: якщо його вже перемістили
+    чи видалили, зміна скасовується з ObjectChangedError.
+    Повертає документи нової та старої камер після зміни заповненості (або None).
+    """
+    expected_chamber_id = old_chamber_id
+    if old_chamber_id == new_chamber_id:
+        old_chamber_id = new_chamber_id = None
+
+    if current_app.config.get('MONGO_TRANSACTIONS'):
+        try:
+            with mongo.cx.start_session() as session:
+                return session.with_transaction(
+                    lambda s: _move(object_id, expected_chamber_id, old_chamber_id, new_chamber_id, updated_data, s)
+                )
+        except OperationFailure as e:
+            if e.code != ILLEGAL_OPERATION:
+                raise
+            current_app.logger.warning("Транзакції недоступні, переміщення виконується без транзакції")
+            current_app.config['MONGO_TRANSACTIONS'] = False
+
+    return _move(object_id, expected_chamber_id, old_chamber_id, new_chamber_id, updated_data)
+
+
+def update_chamber(chamber_id, updated_data):
+    """
+    Оновлює дані камери. Умова current_occupancy <= capacity перевіряється в тому ж запиті,
+    тому місткість не можна зменшити нижче фактичної заповненості навіть при паралельних змінах.
+    Повертає False, якщо нова місткість менша за поточну заповненість.
+    """
+    guard = {}
+    if 'capacity' in updated_data:
+        guard = {"current_occupancy": {"$lte": updated_data['capacity']}}
+    result = mongo.db.chambers.update_one(
+        {"_id": to_object_id(chamber_id), **NOT_DELETED, **guard},
+        {"$set": updated_data}
+    )
+    return result.matched_count == 1
+
+
+def mark_deleted(collection, doc_id):
+    """
+    Швидке (м'яке) видалення: документ лише позначається deleted_at і зникає з усіх запитів реєстру.
+    Повертає документ до позначки або None, якщо його не існує чи вже видалено.
+    """
+    return mongo.db[collection].find_one_and_update(
+        {"_id": to_object_id(doc_id), **NOT_DELETED},
+        {"$set": {"deleted_at": datetime.now(timezone.utc)}}
+    )
+
+
+def release_objects(chamber_id, batch_size=500):
+    """
+    Одна порція каскаду видалення камери: до batch_size її об'єктів отримують chamber_id = None
+    і статус "Awaiting Containment" (обидва поля одним update_many), а заповненість камери
+    зменшується на кількість звільнених. Повертає кількість знайдених об'єктів (0 - камера порожня).
+    """
+    oid = to_object_id(chamber_id)
+    ids = [doc['_id'] for doc in mongo.db.objects.find({"chamber_id": oid}, {"_id": 1}).limit(batch_size)]
+    if not ids:
+        return 0
+    result = mongo.db.objects.update_many(
+        {"_id": {"$in": ids}, "chamber_id": oid},
+        {"$set": {"chamber_id": None, "status": "Awaiting Containment"}}
+    )
+    if result.modified_count:
+        mongo.db.chambers.update_one(
+            {"_id": oid, "current_occupancy": {"$gte": result.modified_count}},
+            {"$inc": {"current_occupancy": -result.modified_count}}
+        )
+    return len(ids)
+
+
+def purge_chamber(chamber_id):
+    """Остаточно видаляє позначену камеру (після того, як release_objects звільнив усі об'єкти)"""
+    mongo.db.chambers.delete_one({"_id": to_object_id(chamber_id), "deleted_at": {"$ne": None}})
+
+
+def purge_object(object_id):
+    """
+    Остаточно видаляє позначений об'єкт. Спершу об'єкт відв'язується від камери (chamber_id = None),
+    і лише тоді звільняється місце - повторний запуск після збою не звільнить його вдруге.
+    Повертає документ камери після звільнення місця (або None).
+    """
+    oid = to_object_id(object_id)
+    doc = mongo.db.objects.find_one_and_update(
+        {"_id": oid, "deleted_at": {"$ne": None}, "chamber_id": {"$ne": None}},
+        {"$set": {"chamber_id": None}}
+    )
+    chamber = release_slot(doc['chamber_id']) if doc else None
+    mongo.db.objects.delete_one({"_id": oid, "deleted_at": {"$ne": None}})
+    return chamber
+
+
+def _occupancy_drift(chamber_filter, object_filter):
+    """Розбіжності лічильників: ({_id: кількість об'єктів}, перевірені камери, розбіжності)"""
+    # Лічильники читаються раніше за кількість об'єктів: місце, зарезервоване до вставки об'єкта,
+    # виглядає як розбіжність лише до повторної перевірки, а не навпаки
+    chambers = list(mongo.db.chambers.find(chamber_filter, {"current_occupancy": 1, "capacity": 1}))
+    actual = {
+        row['_id']: row['count']
+        for row in mongo.db.objects.aggregate([
+            {"$match": object_filter},
+            {"$group": {"_id": "$chamber_id", "count": {"$sum": 1}}}
+        ])
+    }
+    drifted = []
+    for doc in chambers:
+        recorded, count = doc.get('current_occupancy', 0), actual.get(doc['_id'], 0)
+        if recorded != count:
+            drifted.append({
+                'chamber_id': str(doc['_id']),
+                'recorded': recorded,
+                'actual': count,
+                'over_capacity': count > doc.get('capacity', 0)
+            })
+    return actual, {doc['_id'] for doc in chambers}, drifted
+
+
+def reconcile_occupancy(chamber_ids=None, dry_run=False):
+    """
+    Перераховує current_occupancy за фактичною кількістю об'єктів однією агрегацією ($group)
+    і виправляє розбіжності одним bulk_write. Повертає звіт про розбіжності (drift).
+    Виправляються лише розбіжності, що підтвердились повторною перевіркою, і лише якщо лічильник
+    не змінився з моменту перевірки: паралельні reserve_slot та переміщення не перезаписуються.
+    """
+    # Позначені видаленими камери звільняє фонове завдання, тут вони не перевіряються
+    chamber_filter = dict(NOT_DELETED)
+    # Позначені видаленими об'єкти рахуються: їхнє місце звільняє фонове завдання
+    object_filter = {"chamber_id": {"$ne": None}}
+    if chamber_ids is not None:
+        ids = [to_object_id(cid) for cid in chamber_ids]
+        chamber_filter["_id"] = {"$in": ids}
+        object_filter = {"chamber_id": {"$in": ids}}
+
+    actual, seen, drifted = _occupancy_drift(chamber_filter, object_filter)
+
+    corrected = 0
+    if drifted and not dry_run:
+        ids = [to_object_id(item['chamber_id']) for item in drifted]
+        _, _, confirmed = _occupancy_drift({**NOT_DELETED, "_id": {"$in": ids}}, {"chamber_id": {"$in": ids}})
+        first = {(item['chamber_id'], item['recorded'], item['actual']) for item in drifted}
+        stable = [item for item in confirmed if (item['chamber_id'], item['recorded'], item['actual']) in first]
+        if stable:
+            corrected = mongo.db.chambers.bulk_write([
+                UpdateOne({"_id": to_object_id(item['chamber_id']), "current_occupancy": item['recorded']},
+                          {"$set": {"current_occupancy": item['actual']}})
+                for item in stable
+            ], ordered=False).modified_count
+
+    # Об'єкти камер, позначених видаленими, ще звільняє фонове завдання - вони не "сироти"
+    unseen = [cid for cid in actual if cid not in seen]
+    pending = {doc['_id'] for doc in mongo.db.chambers.find({"_id": {"$in": unseen}}, {"_id": 1})} if unseen else set()
+
+    report = {
+        'checked_at': datetime.now(timezone.utc),
+        'dry_run': dry_run,
+        'chambers_checked': len(seen),
+        'chambers_drifted': len(drifted),
+        'chambers_corrected': corrected,
+        'total_drift': sum(abs(item['recorded'] - item['actual']) for item in drifted),
+        'max_drift': max((abs(item['recorded'] - item['actual']) for item in drifted), default=0),
+        # Об'єкти, що посилаються на неіснуючі камери
+        'orphaned_objects': sum(count for cid, count in actual.items() if cid not in seen and cid not in pending),
+        'drifted': drifted
+    }
+    # Повна звірка зберігає звіт, щоб метрики були доступні всім процесам
+    if chamber_ids is None:
+        mongo.db.maintenance.replace_one({"_id": RECONCILIATION_REPORT_ID}, report, upsert=True)
+    return report
+
+
+def last_reconciliation():
+    """Звіт останньої повної звірки (або None, якщо звірка ще не виконувалась)"""
+    return mongo.db.maintenance.find_one({"_id": RECONCILIATION_REPORT_ID}, {"_id": 0})
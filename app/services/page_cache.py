@@ -0,0 +1,148 @@
+import hashlib
+import threading
+import time
+from functools import wraps
+from flask import has_request_context, request, session, make_response
+from flask_login import current_user
+from markupsafe import Markup
+from app.services.reads import reads
+from app.services.user_cache import MemoryBackend
+
+
+class MemoryVersions:
+    """Лічильники версій колекцій у пам'яті процесу"""
+
+    def __init__(self):
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, names):
+        with self._lock:
+            return [self._versions.get(name, 0) for name in names]
+
+    def bump(self, names):
+        with self._lock:
+            for name in names:
+                self._versions[name] = self._versions.get(name, 0) + 1
+
+
+class RedisVersions:
+    """Лічильники версій у Redis - спільні для всіх воркерів gunicorn"""
+
+    prefix = 'version:'
+
+    def __init__(self, url):
+        import redis  # опціональна залежність, потрібна лише для цього бекенду
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, names):
+        return [int(value or 0) for value in self.client.mget([self.prefix + name for name in names])]
+
+    def bump(self, names):
+        pipe = self.client.pipeline()
+        for name in names:
+            pipe.incr(self.prefix + name)
+        pipe.execute()
+
+
+class PageCache:
+    """
+    Кеш відрендерених сторінок (з ETag / If-None-Match) та фрагментів.
+    Ключі містять версії колекцій, які збільшуються під час кожного запису в реєстр,
+    тому застарілі записи не інвалідуються явно, а просто перестають запитуватись
+    і з часом витісняються (LRU).
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.versions_store = MemoryVersions()
+        self.pages = None
+        self.fragments = None
+        self.max_staleness = 0
+
+    def init_app(self, app):
+        self.enabled = app.config.get('PAGE_CACHE_ENABLED', True)
+        ttl = app.config.get('PAGE_CACHE_TTL', 300)
+        if app.config.get('PAGE_CACHE_BACKEND') == 'redis':
+            self.versions_store = RedisVersions(app.config['PAGE_CACHE_REDIS_URL'])
+            self.max_staleness = 0
+        else:
+            self.versions_store = MemoryVersions()
+            # Інші воркери не бачать локальних лічильників, тому вік ключа обмежено
+            self.max_staleness = app.config.get('PAGE_CACHE_MAX_STALENESS', 30)
+        self.pages = MemoryBackend(ttl, app.config.get('PAGE_CACHE_MAXSIZE', 500))
+        self.fragments = MemoryBackend(ttl, app.config.get('FRAGMENT_CACHE_MAXSIZE', 20000))
+
+    def versions(self, *collections):
+        values = self.versions_store.get(collections)
+        if self.max_staleness:
+            values.append(int(time.time() // self.max_staleness))
+        # Маршрут читає з secondary: сторінка, заповнена після bump() з відсталого вузла, потрапила б
+        # у кеш під новою версією. Тому вік ключа обмежено maxStalenessSeconds маршруту
+        staleness = reads.max_staleness() if has_request_context() else None
+        if staleness and staleness > 0:
+            values.append(int(time.time() // staleness))
+        return values
+
+    @staticmethod
+    def _cacheable():
+        # Відставання secondary не обмежене (maxStalenessSeconds=-1) - вік ключа нічим обмежити
+        return not has_request_context() or reads.max_staleness() != -1
+
+    def bump(self, *collections):
+        """Викликається маршрутами, що змінюють реєстр (create_*, edit_*, delete_*)"""
+        self.versions_store.bump(collections)
+
+    @staticmethod
+    def _role():
+        return current_user.role if current_user.is_authenticated else 'anonymous'
+
+    def value(self, collections, key, compute):
+        """Повертає закешоване значення, обчислене з колекцій collections (спільне для всіх ролей)"""
+        if not self.enabled or not self._cacheable():
+            return compute()
+        cache_key = '|'.join([key, *map(str, self.versions(*collections))])
+        value = self.fragments.get(cache_key)
+        if value is None:
+            value = compute()
+            self.fragments.set(cache_key, value)
+        return value
+
+    def fragment(self, collections, key, render):
+        """Повертає закешований HTML-фрагмент (окремий варіант для кожної ролі)"""
+        return Markup(self.value(collections, f'{key}|{self._role()}', render))
+
+    def cached(self, *collections):
+        """Декоратор сторінки: 304 за збігом ETag або готове тіло відповіді без звернень до БД"""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                # Сторінки з flash-повідомленнями унікальні, їх не кешуємо
+                if not self.enabled or request.method != 'GET' or session.get('_flashes') or not self._cacheable():
+                    return view(*args, **kwargs)
+
+                # Навбар містить ім'я користувача, тому ключ сторінки - на рівні користувача
+                parts = [request.endpoint, request.full_path, current_user.get_id() or '', self._role()]
+                parts += map(str, self.versions(*collections))
+                etag = hashlib.sha1('|'.join(parts).encode()).hexdigest()
+
+                if request.if_none_match.contains(etag):
+                    response = make_response('', 304)
+                else:
+                    body = self.pages.get(etag)
+                    if body is None:
+                        response = make_response(view(*args, **kwargs))
+                        if response.status_code != 200 or response.is_streamed:
+                            return response
+                        self.pages.set(etag, response.get_data(as_text=True))
+                    else:
+                        response = make_response(body)
+
+                response.set_etag(etag)
+                response.headers['Cache-Control'] = 'private, no-cache'
+                return response
+            return wrapper
+        return decorator
+
+
+page_cache = PageCache()
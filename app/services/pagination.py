@@ -0,0 +1,56 @@
+from app.services.joins import to_object_id
+
+
+class Page:
+    """Сторінка результатів keyset-пагінації (курсор - _id першого/останнього документа)"""
+
+    def __init__(self, items, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def page_size_from(args, default, maximum):
+    """Розмір сторінки з параметра per_page (з обмеженням зверху)"""
+    try:
+        size = int(args.get('per_page', default))
+    except (TypeError, ValueError):
+        size = default
+    return max(1, min(size, maximum))
+
+
+def keyset_page(collection, query, after=None, before=None, page_size=50, projection=None):
+    """
+    Вибирає одну сторінку документів, відсортованих за _id.
+    Замість skip() використовується умова _id > after (або _id < before),
+    тому вартість запиту не залежить від номера сторінки.
+    """
+    query = dict(query)
+    after_oid, before_oid = to_object_id(after), to_object_id(before)
+    backwards = before_oid is not None and after_oid is None
+
+    if backwards:
+        query['_id'] = {"$lt": before_oid}
+    elif after_oid:
+        query['_id'] = {"$gt": after_oid}
+
+    cursor = collection.find(query, projection).sort('_id', -1 if backwards else 1).limit(page_size + 1)
+    docs = list(cursor)
+    has_more = len(docs) > page_size
+    docs = docs[:page_size]
+    if backwards:
+        docs.reverse()
+
+    if not docs:
+        return Page([])
+
+    first_id, last_id = str(docs[0]['_id']), str(docs[-1]['_id'])
+    if backwards:
+        return Page(docs, next_cursor=last_id, prev_cursor=first_id if has_more else None)
+    return Page(docs, next_cursor=last_id if has_more else None, prev_cursor=first_id if after_oid else None)
@@ -0,0 +1,241 @@
+import threading
+import time
+from bisect import bisect_left, insort
+from pymongo import UpdateOne
+from app import mongo
+from app.models import ContainmentChamber
+from app.services.joins import NOT_DELETED, to_object_id
+from app.services.occupancy import reserve_slot, reconcile_occupancy
+from app.services.audit import audit
+
+# Мінімальний рівень безпеки камери для класу об'єкта (невідомий клас - рівень 1)
+CLASS_SECURITY = {'Explained': 1, 'Neutralized': 1, 'Safe': 1, 'Euclid': 2, 'Keter': 4, 'Thaumiel': 5}
+MAX_SECURITY_LEVEL = 5
+AWAITING = 'Awaiting Containment'
+
+# Поля камери, які зберігає індекс (достатньо і для підбору, і для списку у формах)
+INDEX_FIELDS = ('location', 'chamber_type', 'security_level', 'capacity', 'current_occupancy', 'status')
+
+# Кошик "будь-яка локація / будь-який тип"
+ANY = '*'
+
+
+def _level(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _free(doc):
+    return (doc.get('capacity') or 0) - (doc.get('current_occupancy') or 0)
+
+
+def _placeable(doc):
+    """У кошики потрапляють лише активні камери з відомим рівнем безпеки та вільним місцем"""
+    return doc.get('status', 'Active') == 'Active' and _level(doc.get('security_level')) and _free(doc) > 0
+
+
+def _keys(doc):
+    level = _level(doc.get('security_level'))
+    location, chamber_type = doc.get('location'), doc.get('chamber_type')
+    return {(level, l, t) for l in (location, ANY) for t in (chamber_type, ANY)}
+
+
+class PlacementIndex:
+    """
+    Індекс вільних місць камер у пам'яті процесу. Камери розкладено по кошиках
+    (рівень безпеки, локація, тип), а також (рівень, *, тип), (рівень, локація, *) і (рівень, *, *);
+    кожен кошик - список (вільних місць, _id), відсортований bisect. Найкраща камера для класу -
+    найзаповненіша з найнижчим достатнім рівнем: перший елемент кошика, зміни - O(log n) пошуку.
+    Індекс лише підказує: місце все одно займається атомарно (reserve_slot), а зміни з інших
+    воркерів потрапляють в індекс під час перебудови раз на PLACEMENT_REBUILD_INTERVAL секунд.
+    """
+
+    def __init__(self):
+        self.rebuild_interval = 60
+        self.logger = None
+        self._lock = threading.RLock()
+        self._chambers = {}
+        self._buckets = {}
+        self._built_at = None
+
+    def init_app(self, app):
+        self.rebuild_interval = app.config.get('PLACEMENT_REBUILD_INTERVAL', 60)
+        self.logger = app.logger
+
+    # --- Побудова та синхронізація ---
+
+    def rebuild(self):
+        """Повна перебудова одним запитом з проєкцією (запис індексу замінюється цілком)"""
+        chambers, buckets = {}, {}
+        for doc in mongo.db.chambers.find(NOT_DELETED, ContainmentChamber.projection(INDEX_FIELDS)):
+            doc['_id'] = str(doc['_id'])
+            chambers[doc['_id']] = doc
+            if _placeable(doc):
+                for key in _keys(doc):
+                    buckets.setdefault(key, []).append((_free(doc), doc['_id']))
+        for bucket in buckets.values():
+            bucket.sort()
+        with self._lock:
+            self._chambers, self._buckets = chambers, buckets
+            self._built_at = time.monotonic()
+
+    def invalidate(self):
+        """Масові зміни (імпорт, розміщення пакетом): індекс перебудується під час наступного звернення"""
+        with self._lock:
+            self._built_at = None
+
+    def _ensure_fresh(self):
+        with self._lock:
+            stale = self._built_at is None or time.monotonic() - self._built_at > self.rebuild_interval
+        if stale:
+            self.rebuild()
+
+    def _add(self, doc):
+        self._chambers[doc['_id']] = doc
+        if _placeable(doc):
+            for key in _keys(doc):
+                insort(self._buckets.setdefault(key, []), (_free(doc), doc['_id']))
+
+    def _remove(self, chamber_id):
+        doc = self._chambers.pop(chamber_id, None)
+        if not doc or not _placeable(doc):
+            return
+        entry = (_free(doc), chamber_id)
+        for key in _keys(doc):
+            bucket = self._buckets.get(key, [])
+            i = bisect_left(bucket, entry)
+            if i < len(bucket) and bucket[i] == entry:
+                del bucket[i]
+
+    def chamber_changed(self, chamber):
+        """Камеру створено або змінено (chamber - документ після запису, напр. результат reserve_slot)"""
+        if not chamber:
+            return
+        doc = {name: chamber.get(name) for name in INDEX_FIELDS}
+        doc['_id'] = str(chamber['_id'])
+        with self._lock:
+            if self._built_at is None:
+                return
+            self._remove(doc['_id'])
+            self._add(doc)
+
+    def chamber_removed(self, chamber_id):
+        with self._lock:
+            self._remove(str(chamber_id))
+
+    # --- Підбір камери ---
+
+    def _best(self, object_class, location=None, chamber_type=None):
+        minimum = CLASS_SECURITY.get(object_class, 1)
+        for level in range(minimum, MAX_SECURITY_LEVEL + 1):
+            bucket = self._buckets.get((level, location or ANY, chamber_type or ANY))
+            if bucket:
+                return self._chambers[bucket[0][1]]
+        return None
+
+    def suggest(self, object_class, location=None, chamber_type=None):
+        """Найкраща камера для об'єкта класу object_class (документ індексу) або None"""
+        self._ensure_fresh()
+        with self._lock:
+            doc = self._best(object_class, location, chamber_type)
+            return dict(doc, free=_free(doc)) if doc else None
+
+    def available(self, include_id=None):
+        """
+        Камери з вільним місцем для списку у формах (без запиту до БД).
+        include_id - камера, яка має бути в списку навіть якщо заповнена.
+        """
+        self._ensure_fresh()
+        include_id = str(include_id) if include_id else None
+        with self._lock:
+            docs = [doc for doc in self._chambers.values() if _free(doc) > 0 or doc['_id'] == include_id]
+            missing = include_id and include_id not in self._chambers
+        if missing:
+            # Поточну камеру об'єкта створено або змінено в іншому воркері після перебудови індексу:
+            # без неї форма показала б "без камери" і збереження вийняло б об'єкт з камери
+            doc = mongo.db.chambers.find_one({'_id': to_object_id(include_id), **NOT_DELETED},
+                                             ContainmentChamber.projection(INDEX_FIELDS))
+            if doc:
+                self.chamber_changed(doc)
+                docs.append(dict(doc, _id=include_id))
+        docs.sort(key=lambda doc: (str(doc.get('location')), str(doc.get('chamber_type'))))
+        return ContainmentChamber.from_batch(docs, INDEX_FIELDS)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'chambers': len(self._chambers),
+                'buckets': len(self._buckets),
+                'age_seconds': round(time.monotonic() - self._built_at, 1) if self._built_at else None,
+            }
+
+    # --- Розміщення пакетом ---
+
+    def assign_awaiting(self, limit=None, dry_run=False):
+        """
+        Розміщує об'єкти "Awaiting Containment" без камери за один прохід: план складається
+        за індексом (спершу класи з найвищими вимогами), місця в кожній камері резервуються одним
+        атомарним $inc на всю кількість, а об'єкти оновлюються одним bulk_write.
+        """
+        self.rebuild()
+        cursor = mongo.db.objects.find(
+            {'status': AWAITING, 'chamber_id': None, **NOT_DELETED},
+            {'object_number': 1, 'object_class': 1}
+        )
+        if limit:
+            cursor = cursor.limit(limit)
+        objects = sorted(cursor, key=lambda doc: -CLASS_SECURITY.get(doc.get('object_class'), 1))
+
+        plan = {}
+        with self._lock:
+            for obj in objects:
+                doc = self._best(obj.get('object_class'))
+                if not doc:
+                    continue
+                plan.setdefault(doc['_id'], []).append(obj)
+                # Місце вважається зайнятим уже під час планування
+                self._remove(doc['_id'])
+                self._add(dict(doc, current_occupancy=(doc.get('current_occupancy') or 0) + 1))
+
+        result = {'awaiting': len(objects), 'placed': 0, 'chambers': len(plan), 'dry_run': dry_run}
+        if dry_run:
+            result['placed'] = sum(len(planned) for planned in plan.values())
+            self.invalidate()
+            return result
+
+        requests, placed = [], []
+        for chamber_id, planned in plan.items():
+            chamber = reserve_slot(chamber_id, count=len(planned))
+            if not chamber:
+                # Камеру заповнили паралельно (напр. інший воркер) - її об'єкти лишаються в черзі
+                self.invalidate()
+                continue
+            self.chamber_changed(chamber)
+            for obj in planned:
+                requests.append(UpdateOne(
+                    {'_id': obj['_id'], 'status': AWAITING, 'chamber_id': None, **NOT_DELETED},
+                    {'$set': {'chamber_id': chamber['_id'], 'status': 'Contained'}}
+                ))
+                placed.append((obj, chamber['_id']))
+
+        if requests:
+            written = mongo.db.objects.bulk_write(requests, ordered=False)
+            if written.modified_count < len(requests):
+                # Частину об'єктів змінили паралельно - зарезервовані для них місця повертаються звіркою
+                reconcile_occupancy(list({to_object_id(chamber_id) for _, chamber_id in placed}))
+                self.invalidate()
+                # В аудит - лише об'єкти, які справді розміщено цим проходом
+                current = {doc['_id']: doc.get('chamber_id') for doc in mongo.db.objects.find(
+                    {'_id': {'$in': [obj['_id'] for obj, _ in placed]}, 'status': 'Contained', **NOT_DELETED},
+                    {'chamber_id': 1}
+                )}
+                placed = [(obj, chamber_id) for obj, chamber_id in placed if current.get(obj['_id']) == chamber_id]
+            result['placed'] = written.modified_count
+            for obj, chamber_id in placed:
+                audit.record('object.place', obj, chamber_ids=[chamber_id])
+        return result
+
+
+placement = PlacementIndex()
@@ -0,0 +1,186 @@
+import threading
+import time
+from functools import wraps
+import bson
+from bson.timestamp import Timestamp
+from flask import g, has_request_context, request, session as flask_session
+from pymongo import monitoring
+from pymongo.read_concern import ReadConcern
+from pymongo.read_preferences import Primary, PrimaryPreferred, Secondary, SecondaryPreferred, Nearest
+from app import mongo
+
+# Режими читання (назви як у рядку підключення MongoDB)
+MODES = {
+    'primary': Primary,
+    'primaryPreferred': PrimaryPreferred,
+    'secondary': Secondary,
+    'secondaryPreferred': SecondaryPreferred,
+    'nearest': Nearest,
+}
+# Найменше допустиме maxStalenessSeconds (обмеження драйвера та сервера)
+SMALLEST_MAX_STALENESS = 90
+
+# Команди запису, час яких потрібен для read-your-own-writes
+WRITE_COMMANDS = {'insert', 'update', 'delete', 'findAndModify', 'commitTransaction'}
+# Методи колекції, що читають дані (виконуються в причинно-узгодженій сесії)
+READ_METHODS = {'find', 'find_one', 'aggregate', 'count_documents', 'distinct'}
+
+SESSION_KEY = '_mongo_write'
+
+# Причинна узгодженість гарантується лише для читань majority (і записів majority - типово з MongoDB 5.0)
+MAJORITY = ReadConcern('majority')
+
+
+def parse_routes(value, max_staleness=-1):
+    """
+    'endpoint=режим[:maxStalenessSeconds],...' -> {endpoint: ReadPreference}.
+    Без явного значення використовується max_staleness (-1 - без обмеження).
+    """
+    routes = {}
+    for item in filter(None, (part.strip() for part in (value or '').split(','))):
+        endpoint, _, mode = item.partition('=')
+        mode, _, staleness = mode.strip().partition(':')
+        if mode not in MODES:
+            raise ValueError(f"Невідомий режим читання для {endpoint}: {mode!r}")
+        staleness = int(staleness) if staleness else max_staleness
+        if mode == 'primary':
+            routes[endpoint.strip()] = Primary()
+            continue
+        if 0 <= staleness < SMALLEST_MAX_STALENESS:
+            raise ValueError(f"maxStalenessSeconds для {endpoint} має бути не менше {SMALLEST_MAX_STALENESS}")
+        routes[endpoint.strip()] = MODES[mode](max_staleness=staleness)
+    return routes
+
+
+class WriteTimeListener(monitoring.CommandListener):
+    """
+    Запам'ятовує в g час останнього запису поточного HTTP-запиту (operationTime і $clusterTime
+    відповіді сервера). Записи поза запитом (фонові потоки) не враховуються.
+    """
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        if event.command_name not in WRITE_COMMANDS or not has_request_context():
+            return
+        operation_time = event.reply.get('operationTime')
+        if operation_time is None:
+            # Standalone-сервер: часу операцій немає, усе читається з нього ж
+            return
+        latest = g.get('mongo_write')
+        if latest is None or operation_time > latest[0]:
+            g.mongo_write = (operation_time, event.reply.get('$clusterTime'))
+
+    def failed(self, event):
+        pass
+
+
+write_time_listener = WriteTimeListener()
+
+
+class RoutedCollection:
+    """
+    Колекція з режимом читання маршруту. Якщо користувач нещодавно записував дані, читання
+    виконуються в причинно-узгодженій сесії: secondary відповідає лише після того, як застосує ці записи.
+    """
+
+    def __init__(self, collection, router):
+        self._collection = collection
+        self._router = router
+
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+        if name not in READ_METHODS:
+            return attr
+
+        @wraps(attr)
+        def read(*args, **kwargs):
+            # Сесія береться в потоці, що виконує запит (ClientSession не потокобезпечна)
+            session = self._router.session()
+            if session is None:
+                return attr(*args, **kwargs)
+            kwargs.setdefault('session', session)
+            return getattr(self._collection.with_options(read_concern=MAJORITY), name)(*args, **kwargs)
+        return read
+
+
+class ReadRouter:
+    """
+    Шар доступу до колекцій для маршрутів: читання "важких" сторінок (MONGO_READ_ROUTES) ідуть
+    на secondary з обмеженим відставанням, решта - на primary, як і всі записи.
+    Час останнього запису користувача зберігається в його сесії Flask і передається
+    в наступні читання (afterClusterTime), тому власні зміни видно одразу після перенаправлення.
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.causal = True
+        self.causal_window = None
+
+    def init_app(self, app):
+        self.routes = parse_routes(app.config.get('MONGO_READ_ROUTES'), app.config.get('MONGO_MAX_STALENESS_SECONDS', -1))
+        self.causal = app.config.get('MONGO_CAUSAL_READS', True) and bool(self.routes)
+        # Після maxStalenessSeconds кожен придатний secondary уже містить запис - сесія не потрібна
+        staleness = [pref.max_staleness for pref in self.routes.values() if pref.mode]
+        self.causal_window = max(staleness) if staleness and min(staleness) > 0 else None
+        if self.causal:
+            app.after_request(self._remember_write)
+            app.teardown_request(self._end_sessions)
+
+    def preference(self, endpoint=None):
+        """Режим читання для endpoint (за замовчуванням - поточного запиту); None - primary"""
+        if endpoint is None:
+            endpoint = request.endpoint if has_request_context() else None
+        preference = self.routes.get(endpoint)
+        return preference if preference and preference.mode else None
+
+    def max_staleness(self, endpoint=None):
+        """Допустиме відставання даних маршруту, с: None - читання з primary, -1 - без обмеження"""
+        preference = self.preference(endpoint)
+        return preference.max_staleness if preference is not None else None
+
+    def collection(self, name):
+        """Колекція для читання в поточному маршруті"""
+        collection = mongo.db[name]
+        preference = self.preference()
+        if preference is None:
+            return collection
+        return RoutedCollection(collection.with_options(read_preference=preference), self)
+
+    def session(self):
+        """Причинно-узгоджена сесія поточного запиту для цього потоку (або None, якщо не потрібна)"""
+        if not self.causal or not has_request_context():
+            return None
+        stored = flask_session.get(SESSION_KEY)
+        if not stored:
+            return None
+        if self.causal_window and time.time() - stored['at'] > self.causal_window:
+            return None
+        sessions = g.setdefault('mongo_sessions', {})
+        key = threading.get_ident()
+        if key not in sessions:
+            session = mongo.cx.start_session(causal_consistency=True)
+            if stored.get('cluster'):
+                session.advance_cluster_time(bson.decode(stored['cluster']))
+            session.advance_operation_time(Timestamp(*stored['op']))
+            sessions[key] = session
+        return sessions[key]
+
+    def _remember_write(self, response):
+        write = g.pop('mongo_write', None)
+        if write:
+            operation_time, cluster_time = write
+            flask_session[SESSION_KEY] = {
+                'op': [operation_time.time, operation_time.inc],
+                'cluster': bson.encode(cluster_time) if cluster_time else None,
+                'at': time.time(),
+            }
+        return response
+
+    def _end_sessions(self, exc=None):
+        for session in g.pop('mongo_sessions', {}).values():
+            session.end_session()
+
+
+reads = ReadRouter()
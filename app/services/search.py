@@ -0,0 +1,117 @@
+from app.services.reads import reads
+from app.models import AnomalyObject, ContainmentChamber
+from app.services.joins import NOT_DELETED
+from app.services.page_cache import page_cache
+
+# Поля, які відображаються у результатах пошуку (текстовий індекс objects_text - див. indexes.py)
+RESULT_FIELDS = ('object_number', 'object_name', 'object_class', 'status', 'description', 'chamber_id')
+RESULT_PROJECTION = {
+    **AnomalyObject.projection(RESULT_FIELDS),
+    **{f'chamber.{name}': 1 for name in ContainmentChamber.SUMMARY_FIELDS},
+    'score': 1
+}
+
+
+# Камера документа: $lookup з let/$expr (працює і до MongoDB 5.0, рівність $_id використовує індекс)
+def _chamber_lookup(local_field, fields):
+    return {"$lookup": {
+        "from": "chambers",
+        "let": {"chamber_id": local_field},
+        "pipeline": [
+            {"$match": {"$expr": {"$eq": ["$_id", "$$chamber_id"]}, **NOT_DELETED}},
+            {"$project": ContainmentChamber.projection(fields)}
+        ],
+        "as": "chamber"
+    }}
+
+
+def _facet(field):
+    return [
+        {"$group": {"_id": field, "count": {"$sum": 1}}},
+        {"$sort": {"count": -1, "_id": 1}}
+    ]
+
+
+def _location_facet():
+    """Локації рахуються через групи за камерою: $lookup - по одному на камеру, а не на кожен об'єкт"""
+    return [
+        {"$group": {"_id": "$chamber_id", "count": {"$sum": 1}}},
+        _chamber_lookup("$_id", ('location',)),
+        {"$group": {"_id": {"$first": "$chamber.location"}, "count": {"$sum": "$count"}}},
+        {"$sort": {"count": -1, "_id": 1}}
+    ]
+
+
+def _facets():
+    return {
+        "total": [{"$count": "count"}],
+        "object_class": _facet("$object_class"),
+        "status": _facet("$status"),
+        "location": _location_facet(),
+    }
+
+
+def _counts(row):
+    """(загальна кількість, фасети) з результату $facet"""
+    total = row['total'][0]['count'] if row.get('total') else 0
+    counts = {
+        name: [(group['_id'], group['count']) for group in row.get(name, [])]
+        for name in ('object_class', 'status', 'location')
+    }
+    return total, counts
+
+
+def search_objects(text, filters=None, page=1, page_size=20):
+    """
+    Повнотекстовий пошук з фасетами за одну агрегацію:
+    $match ($text + фільтри) -> $facet (результати, класи, статуси, локації).
+    Камери приєднуються ($lookup) лише до сторінки результатів, уже після $sort/$skip/$limit.
+    Без запиту й фільтрів фасети охоплюють увесь реєстр, тому вони беруться з кешу (page_cache),
+    а агрегація вибирає лише сторінку результатів.
+    Повертає (список AnomalyObject з атрибутами score та chamber_info, загальна кількість, фасети).
+    """
+    match = {"$text": {"$search": text}} if text else {}
+    match.update(NOT_DELETED)
+    for field in ('object_class', 'status'):
+        if filters and filters.get(field):
+            match[field] = filters[field]
+    # Фільтр за локацією - через камери цієї локації (один запит), щоб не приєднувати камеру до кожного об'єкта
+    if filters and filters.get('location'):
+        chambers = reads.collection('chambers').find({"location": filters['location'], **NOT_DELETED}, {"_id": 1})
+        match["chamber_id"] = {"$in": [chamber['_id'] for chamber in chambers]}
+
+    pipeline = [{"$match": match}]
+    if text:
+        # Релевантність обчислюється одразу після $text і далі використовується як звичайне поле
+        pipeline.append({"$addFields": {"score": {"$meta": "textScore"}}})
+
+    sort = {"score": -1, "_id": 1} if text else {"_id": 1}
+    results_stages = [
+        {"$sort": sort},
+        {"$skip": (page - 1) * page_size},
+        {"$limit": page_size},
+        _chamber_lookup("$chamber_id", ContainmentChamber.SUMMARY_FIELDS),
+        {"$unwind": {"path": "$chamber", "preserveNullAndEmptyArrays": True}},
+        {"$project": RESULT_PROJECTION}
+    ]
+
+    objects = reads.collection('objects')
+    if match == NOT_DELETED:
+        docs = objects.aggregate(pipeline + results_stages)
+        total, counts = page_cache.value(
+            ('objects', 'chambers'), 'search-facets',
+            lambda: _counts(next(objects.aggregate([{"$match": NOT_DELETED}, {"$facet": _facets()}]), {}))
+        )
+    else:
+        pipeline.append({"$facet": {"results": results_stages, **_facets()}})
+        row = next(objects.aggregate(pipeline), {})
+        docs = row.get('results', [])
+        total, counts = _counts(row)
+
+    results = []
+    for doc in docs:
+        obj = AnomalyObject(doc, RESULT_FIELDS)
+        obj.score = doc.get('score')
+        obj.chamber_info = ContainmentChamber(doc['chamber'], ContainmentChamber.SUMMARY_FIELDS) if doc.get('chamber') else None
+        results.append(obj)
+    return results, total, counts
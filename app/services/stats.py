@@ -0,0 +1,260 @@
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.errors import PyMongoError
+from app import mongo
+from app.services.joins import NOT_DELETED
+
+# Групування підсумків: група -> (колекція, поле документа)
+OBJECT_GROUPS = {'object_class': 'object_class', 'object_status': 'status'}
+CHAMBER_GROUPS = {'location': 'location', 'security_level': 'security_level'}
+# Лічильники документа групи: кожен інкремент зачіпає всі, тож документ завжди має повний набір полів
+OBJECT_COUNTERS = ('count',)
+CHAMBER_COUNTERS = ('chambers', 'capacity', 'occupancy')
+
+META_ID = 'meta'
+NEAR_CAPACITY_ID = 'near_capacity'
+
+
+def _group_id(group, key):
+    # Складений _id: ключі групи можуть бути будь-якими рядками (з крапками тощо) або None
+    return {'group': group, 'key': key}
+
+
+def _object_deltas(doc, sign):
+    return {
+        (group, doc.get(field)): {'count': sign}
+        for group, field in OBJECT_GROUPS.items()
+    }
+
+
+def _chamber_deltas(doc, sign):
+    values = {
+        'chambers': sign,
+        'capacity': sign * int(doc.get('capacity') or 0),
+        'occupancy': sign * int(doc.get('current_occupancy') or 0),
+    }
+    return {(group, doc.get(field)): dict(values) for group, field in CHAMBER_GROUPS.items()}
+
+
+def _merge(target, deltas):
+    for key, values in deltas.items():
+        current = target.setdefault(key, {})
+        for name, value in values.items():
+            current[name] = current.get(name, 0) + value
+
+
+class StatsService:
+    """
+    Статистика дашборда адміністратора: попередньо обчислені підсумки в колекції stats.
+    Записи реєстру оновлюють підсумки інкрементально ($inc), а повний перерахунок
+    (агрегаціями) виконується за розкладом, командою `flask refresh-stats` та після масових змін.
+    """
+
+    def __init__(self):
+        self.near_capacity_ratio = 0.9
+        self.near_capacity_limit = 50
+        self.refresh_interval = 0
+        self.logger = None
+        self._scheduler = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.near_capacity_ratio = app.config.get('STATS_NEAR_CAPACITY_RATIO', 0.9)
+        self.near_capacity_limit = app.config.get('STATS_NEAR_CAPACITY_LIMIT', 50)
+        self.refresh_interval = app.config.get('STATS_REFRESH_INTERVAL', 0)
+        self.logger = app.logger
+        if self.refresh_interval:
+            app.before_request(self._ensure_scheduler)
+
+    # --- Повний перерахунок ---
+
+    def compute(self):
+        """Обчислює всі підсумки агрегаціями (повний прохід по objects та chambers)"""
+        objects = next(mongo.db.objects.aggregate([
+            {'$match': NOT_DELETED},
+            {'$facet': {
+                group: [{'$group': {'_id': f'${field}', 'count': {'$sum': 1}}}]
+                for group, field in OBJECT_GROUPS.items()
+            }}
+        ]))
+        facets = {
+            group: [{'$group': {
+                '_id': f'${field}',
+                'chambers': {'$sum': 1},
+                'capacity': {'$sum': '$capacity'},
+                'occupancy': {'$sum': '$current_occupancy'},
+            }}]
+            for group, field in CHAMBER_GROUPS.items()
+        }
+        facets[NEAR_CAPACITY_ID] = [
+            {'$match': {'capacity': {'$gt': 0}, '$expr': {
+                '$gte': ['$current_occupancy', {'$multiply': ['$capacity', self.near_capacity_ratio]}]
+            }}},
+            {'$project': {'location': 1, 'current_occupancy': 1, 'capacity': 1,
+                          'ratio': {'$divide': ['$current_occupancy', '$capacity']}}},
+            {'$sort': {'ratio': -1}},
+            {'$limit': self.near_capacity_limit},
+        ]
+        chambers = next(mongo.db.chambers.aggregate([{'$match': NOT_DELETED}, {'$facet': facets}]))
+
+        docs = []
+        for group in OBJECT_GROUPS:
+            docs += [{'_id': _group_id(group, row['_id']), 'count': row['count']} for row in objects[group]]
+        for group in CHAMBER_GROUPS:
+            docs += [
+                {'_id': _group_id(group, row.pop('_id')), **row}
+                for row in chambers[group]
+            ]
+        docs.append({'_id': NEAR_CAPACITY_ID, 'chambers': chambers[NEAR_CAPACITY_ID]})
+        return docs
+
+    def refresh(self):
+        """Повний перерахунок із заміною підсумків у колекції stats"""
+        started = time.perf_counter()
+        docs = self.compute()
+        docs.append({
+            '_id': META_ID,
+            'refreshed_at': datetime.now(timezone.utc),
+            'duration_ms': round((time.perf_counter() - started) * 1000, 1),
+        })
+        mongo.db.stats.bulk_write([ReplaceOne({'_id': doc['_id']}, doc, upsert=True) for doc in docs], ordered=False)
+        # Групи, яких більше немає (напр. видалена остання камера локації)
+        mongo.db.stats.delete_many({'_id': {'$nin': [doc['_id'] for doc in docs]}})
+        return docs[-1]
+
+    def refresh_safely(self):
+        """Перерахунок після масових змін: помилка статистики не повинна зривати саму операцію"""
+        try:
+            self.refresh()
+        except PyMongoError as e:
+            self.logger.warning("Не вдалося перерахувати статистику: %s", e)
+
+    # --- Інкрементальні оновлення ---
+
+    def object_changed(self, before=None, after=None):
+        """Створення (before=None), зміна або видалення (after=None) об'єкта"""
+        deltas = {}
+        if before:
+            _merge(deltas, _object_deltas(before, -1))
+        if after:
+            _merge(deltas, _object_deltas(after, 1))
+        self._apply(deltas)
+
+    def chamber_changed(self, before=None, after=None):
+        """Створення, зміна або видалення камери (after - стан камери після запису)"""
+        deltas = {}
+        if before:
+            _merge(deltas, _chamber_deltas(before, -1))
+        if after:
+            _merge(deltas, _chamber_deltas(after, 1))
+        self._apply(deltas)
+        self._track_near_capacity(after or before, removed=after is None)
+
+    def occupancy_changed(self, chamber, delta):
+        """Зайнято (delta=1) або звільнено (delta=-1) місце; chamber - документ камери після зміни"""
+        if not chamber:
+            return
+        self._apply({
+            (group, chamber.get(field)): {'occupancy': delta}
+            for group, field in CHAMBER_GROUPS.items()
+        })
+        self._track_near_capacity(chamber)
+
+    def _apply(self, deltas):
+        requests = []
+        for (group, key), values in deltas.items():
+            if not any(values.values()):
+                continue
+            counters = OBJECT_COUNTERS if group in OBJECT_GROUPS else CHAMBER_COUNTERS
+            # Нульові прирости теж передаються: новий документ групи отримує всі лічильники
+            changes = {name: values.get(name, 0) for name in counters}
+            requests.append(UpdateOne({'_id': _group_id(group, key)}, {'$inc': changes}, upsert=True))
+        if not requests:
+            return
+        try:
+            mongo.db.stats.bulk_write(requests, ordered=False)
+        except PyMongoError as e:
+            # Розбіжність буде виправлена наступним повним перерахунком
+            self.logger.warning("Не вдалося оновити статистику: %s", e)
+
+    def _track_near_capacity(self, chamber, removed=False):
+        capacity = int(chamber.get('capacity') or 0)
+        occupancy = int(chamber.get('current_occupancy') or 0)
+        try:
+            mongo.db.stats.update_one({'_id': NEAR_CAPACITY_ID}, {'$pull': {'chambers': {'_id': chamber['_id']}}})
+            if not removed and capacity > 0 and occupancy >= capacity * self.near_capacity_ratio:
+                entry = {'_id': chamber['_id'], 'location': chamber.get('location'),
+                         'current_occupancy': occupancy, 'capacity': capacity, 'ratio': occupancy / capacity}
+                mongo.db.stats.update_one({'_id': NEAR_CAPACITY_ID}, {'$push': {'chambers': {
+                    '$each': [entry], '$sort': {'ratio': -1}, '$slice': self.near_capacity_limit
+                }}}, upsert=True)
+        except PyMongoError as e:
+            self.logger.warning("Не вдалося оновити статистику: %s", e)
+
+    # --- Читання ---
+
+    def snapshot(self):
+        """Підсумки для дашборда одним запитом до невеликої колекції stats (без сканування реєстру)"""
+        docs = list(mongo.db.stats.find())
+        if not any(doc['_id'] == META_ID for doc in docs):
+            # Перший запуск: підсумків ще немає
+            self.refresh()
+            docs = list(mongo.db.stats.find())
+
+        result = {group: [] for group in (*OBJECT_GROUPS, *CHAMBER_GROUPS)}
+        result.update({NEAR_CAPACITY_ID: [], 'refreshed_at': None, 'duration_ms': None})
+        for doc in docs:
+            if doc['_id'] == META_ID:
+                result['refreshed_at'] = doc['refreshed_at']
+                result['duration_ms'] = doc.get('duration_ms')
+            elif doc['_id'] == NEAR_CAPACITY_ID:
+                result[NEAR_CAPACITY_ID] = [
+                    {**chamber, '_id': str(chamber['_id'])} for chamber in doc.get('chambers', [])
+                ]
+            else:
+                group = doc['_id']['group']
+                counters = OBJECT_COUNTERS if group in OBJECT_GROUPS else CHAMBER_COUNTERS
+                # Документи, створені до появи повного набору лічильників, можуть не мати частини полів
+                row = {name: doc.get(name, 0) for name in counters}
+                # Групи, що спорожніли після інкрементальних змін, не показуються
+                if any(row.values()):
+                    result[group].append({'key': doc['_id']['key'], **row})
+
+        for group in result:
+            if isinstance(result[group], list) and group != NEAR_CAPACITY_ID:
+                result[group].sort(key=lambda row: str(row['key']))
+        result['total_objects'] = sum(row['count'] for row in result['object_class'])
+        result['total_capacity'] = sum(row['capacity'] for row in result['location'])
+        result['total_occupancy'] = sum(row['occupancy'] for row in result['location'])
+        return result
+
+    # --- Розклад ---
+
+    def _ensure_scheduler(self):
+        with self._lock:
+            if self._pid == os.getpid() and self._scheduler and self._scheduler.is_alive():
+                return
+            self._pid = os.getpid()
+            self._scheduler = threading.Thread(target=self._run_schedule, name='stats-refresh', daemon=True)
+            self._scheduler.start()
+
+    def _run_schedule(self):
+        while True:
+            time.sleep(self.refresh_interval)
+            try:
+                # Кілька воркерів: якщо інший процес уже перерахував підсумки, пропускаємо
+                meta = mongo.db.stats.find_one({'_id': META_ID}, {'refreshed_at': 1})
+                if meta:
+                    refreshed_at = meta['refreshed_at'].replace(tzinfo=timezone.utc)
+                    if (datetime.now(timezone.utc) - refreshed_at).total_seconds() < self.refresh_interval / 2:
+                        continue
+                self.refresh()
+            except PyMongoError as e:
+                self.logger.warning("Не вдалося перерахувати статистику: %s", e)
+
+
+stats = StatsService()
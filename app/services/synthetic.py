@@ -0,0 +1,124 @@
+import random
+from datetime import date, timedelta
+from bson.objectid import ObjectId
+from pymongo.errors import BulkWriteError
+from app import mongo
+from app.services.bulk import batches
+from app.services.occupancy import reconcile_occupancy
+
+# Словники для правдоподібних значень (ті самі варіанти, що пропонують форми)
+OBJECT_CLASSES = ('Safe', 'Euclid', 'Keter', 'Thaumiel', 'Neutralized', 'Explained')
+CLASS_WEIGHTS = (40, 35, 15, 2, 5, 3)
+FREE_STATUSES = ('Discovered', 'Under Study', 'Awaiting Containment')
+CHAMBER_TYPES = ('Standard', 'Humanoid', 'Bio-Hazard', 'Reinforced', 'Aquatic', 'Cryogenic')
+CHAMBER_STATUSES = ('Active', 'Active', 'Active', 'Under Maintenance', 'Compromised')
+MATERIALS = ('Залізобетон', 'Титан', 'Свинець', 'Армоване скло', 'Сталь')
+CONTROLS = ('Герметизація', 'Фільтрація повітря', 'Контроль температури', 'Контроль вологості')
+EQUIPMENT = ('Камери відеоспостереження', 'Датчики руху', 'Сейсмодатчики', 'Лічильник Гейгера')
+WORDS = (
+    'аномалія', 'об\'єкт', 'персонал', 'контакт', 'ефект', 'поверхня', 'випромінювання', 'зразок',
+    'спостереження', 'реакція', 'сектор', 'протокол', 'інцидент', 'структура', 'сигнал', 'дослідження'
+)
+
+
+def _text(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def _insert(collection, docs):
+    """insert_many(ordered=False); повертає кількість вставлених документів (дублікати пропускаються)"""
+    try:
+        return len(mongo.db[collection].insert_many(docs, ordered=False).inserted_ids)
+    except BulkWriteError as e:
+        return e.details['nInserted']
+
+
+def generate_users(count, password_hash, batch_size=1000):
+    """Дослідники (кожен 20-й - адміністратор) зі спільним хешем пароля"""
+    start = mongo.db.users.estimated_document_count()
+    users = (
+        {
+            'username': f'researcher{n:06d}',
+            'password_hash': password_hash,
+            'role': 'admin' if n % 20 == 0 else 'researcher',
+        }
+        for n in range(start, start + count)
+    )
+    return sum(_insert('users', batch) for batch in batches(users, batch_size))
+
+
+def make_chambers(count, sites=40, rng=random):
+    """Документи камер з _id, згенерованими на клієнті (заповненість рахується під час генерації об'єктів)"""
+    chambers = []
+    for n in range(count):
+        capacity = rng.choice((1, 1, 2, 3, 5, 10, 25))
+        chambers.append({
+            '_id': ObjectId(),
+            'chamber_type': rng.choice(CHAMBER_TYPES),
+            'size_dimensions': f'{rng.randint(2, 30)}x{rng.randint(2, 30)}x{rng.randint(2, 10)}m',
+            'security_level': str(rng.randint(1, 5)),
+            'environmental_controls': ', '.join(rng.sample(CONTROLS, 2)),
+            'monitoring_equipment': ', '.join(rng.sample(EQUIPMENT, 2)),
+            'construction_materials': ', '.join(rng.sample(MATERIALS, 2)),
+            'location': f'Зона-{n % sites + 1:02d}, Сектор-{chr(ord("А") + n % 6)}',
+            'capacity': capacity,
+            'current_occupancy': 0,
+            'status': rng.choice(CHAMBER_STATUSES),
+        })
+    return chambers
+
+
+def generate_objects(count, chambers, contained_ratio=0.8, batch_size=1000, rng=random):
+    """
+    Об'єкти з унікальними номерами. Частка contained_ratio розміщується в камерах
+    без перевищення місткості; current_occupancy камер збільшується відповідно.
+    """
+    start = mongo.db.objects.estimated_document_count()
+    # Індекси камер з вільними місцями: вибір випадкової камери та видалення заповненої - O(1)
+    free = [i for i, chamber in enumerate(chambers) if chamber['current_occupancy'] < chamber['capacity']]
+    discovered = date(2024, 1, 1)
+
+    def objects():
+        for n in range(start, start + count):
+            chamber = None
+            if free and rng.random() < contained_ratio:
+                index = rng.randrange(len(free))
+                chamber = chambers[free[index]]
+                chamber['current_occupancy'] += 1
+                if chamber['current_occupancy'] >= chamber['capacity']:
+                    free[index] = free[-1]
+                    free.pop()
+            yield {
+                'object_number': f'SCP-{n + 1:06d}',
+                'object_name': _text(rng, 2).rstrip('.'),
+                'object_class': rng.choices(OBJECT_CLASSES, CLASS_WEIGHTS)[0],
+                'description': _text(rng, rng.randint(30, 120)),
+                'special_contaiment_procedures': _text(rng, rng.randint(40, 160)),
+                'status': 'Contained' if chamber else rng.choice(FREE_STATUSES),
+                'discovery_date': (discovered - timedelta(days=rng.randint(0, 20000))).isoformat(),
+                'assigned_researchers': [f'researcher{rng.randint(0, 999):06d}' for _ in range(rng.randint(0, 3))],
+                'chamber_id': chamber['_id'] if chamber else None,
+            }
+
+    return sum(_insert('objects', batch) for batch in batches(objects(), batch_size))
+
+
+def generate(users=0, chambers=0, objects=0, password_hash=None, contained_ratio=0.8,
+             batch_size=1000, seed=None):
+    """
+    Генерує синтетичний реєстр. Камери вставляються після об'єктів, уже з підсумковою
+    заповненістю, тому current_occupancy відповідає фактичній кількості об'єктів.
+    """
+    rng = random.Random(seed)
+    result = {'users': 0, 'chambers': 0, 'objects': 0}
+    if users:
+        result['users'] = generate_users(users, password_hash, batch_size)
+    chamber_docs = make_chambers(chambers, rng=rng)
+    if objects:
+        result['objects'] = generate_objects(objects, chamber_docs, contained_ratio, batch_size, rng)
+    for batch in batches(chamber_docs, batch_size):
+        result['chambers'] += _insert('chambers', batch)
+    # Частину об'єктів пропущено (номер уже існує) - заповненість нових камер уточнюється за фактом
+    if result['objects'] < objects and chamber_docs:
+        reconcile_occupancy([chamber['_id'] for chamber in chamber_docs])
+    return result
@@ -0,0 +1,120 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+# Поля документа користувача, які зберігаються в кеші (хеш пароля туди не потрапляє)
+CACHED_FIELDS = ('username', 'role')
+
+
+class MemoryBackend:
+    """Кеш у пам'яті процесу з TTL та витісненням найдавніше використаних записів (LRU)"""
+
+    def __init__(self, ttl, maxsize):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class RedisBackend:
+    """Спільний для всіх воркерів gunicorn кеш у Redis (LRU забезпечує maxmemory-policy сервера)"""
+
+    prefix = 'user:'
+
+    def __init__(self, url, ttl):
+        import redis  # опціональна залежність, потрібна лише для цього бекенду
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw else None
+
+    def set(self, key, value):
+        self.client.setex(self.prefix + key, self.ttl, json.dumps(value))
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def clear(self):
+        keys = list(self.client.scan_iter(self.prefix + '*'))
+        if keys:
+            self.client.delete(*keys)
+
+
+class UserCache:
+    """Кеш документів користувачів для load_user з лічильниками влучань/промахів"""
+
+    def __init__(self):
+        self.backend = None
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        kind = app.config.get('USER_CACHE_BACKEND', 'memory')
+        ttl = app.config.get('USER_CACHE_TTL', 60)
+        if kind == 'redis':
+            self.backend = RedisBackend(app.config['USER_CACHE_REDIS_URL'], ttl)
+        elif kind == 'memory':
+            self.backend = MemoryBackend(ttl, app.config.get('USER_CACHE_MAXSIZE', 10000))
+        else:
+            self.backend = None
+
+    def get(self, user_id):
+        value = self.backend.get(user_id) if self.backend else None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, user_id, user_doc):
+        if self.backend:
+            value = {field: user_doc.get(field) for field in CACHED_FIELDS}
+            value['_id'] = str(user_doc['_id'])
+            self.backend.set(user_id, value)
+
+    def invalidate(self, user_id):
+        """Обов'язково викликати після зміни ролі або видалення користувача"""
+        if self.backend:
+            self.backend.delete(str(user_id))
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'backend': type(self.backend).__name__ if self.backend else None,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / total, 4) if total else 0.0
+        }
+
+
+user_cache = UserCache()
@@ -0,0 +1,40 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from jinja2 import FileSystemBytecodeCache
+from pymongo.errors import PyMongoError
+from app import mongo
+
+
+def enable_bytecode_cache(app, directory):
+    """
+    Зберігає скомпільовані шаблони Jinja у directory. Шаблон із кешем не розбирається
+    і не компілюється заново - завантажується готовий байткод (джерело звіряється за контрольною сумою).
+    """
+    os.makedirs(directory, exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory)
+
+
+def compile_templates(app):
+    """Завантажує всі шаблони застосунку в кеш Jinja (і в bytecode cache, якщо його ввімкнено)"""
+    names = app.jinja_env.list_templates()
+    for name in names:
+        app.jinja_env.get_template(name)
+    return names
+
+
+def warm_up_mongo(app, connections=1):
+    """
+    Встановлює connections з'єднань пулу до першого запиту: одночасні ping
+    займають різні з'єднання, тому в пулі залишається стільки ж готових сокетів.
+    """
+    def ping(_):
+        mongo.cx.admin.command('ping')
+
+    try:
+        if connections <= 1:
+            ping(0)
+        else:
+            with ThreadPoolExecutor(max_workers=connections) as executor:
+                list(executor.map(ping, range(connections)))
+    except PyMongoError as e:
+        app.logger.warning("БД недоступна під час запуску: %s", e)
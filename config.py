@@ -5,4 +5,115 @@ load_dotenv()
 
 class Config:
     SECRET_KEY = os.environ.get("SECRET_KEY", "secret_key_123")
-    MONGO_URI = os.environ.get("MONGO_URI")
\ No newline at end of file
+    MONGO_URI = os.environ.get("MONGO_URI")
+    # Пагінація реєстрів (/objects, /chambers)
+    PAGE_SIZE = int(os.environ.get("PAGE_SIZE", 30))
+    MAX_PAGE_SIZE = int(os.environ.get("MAX_PAGE_SIZE", 200))
+    # Найдальша сторінка результатів пошуку ($skip росте зі сторінкою; глибше - уточнювати запит)
+    SEARCH_MAX_PAGES = int(os.environ.get("SEARCH_MAX_PAGES", 50))
+    # Звернення до поля моделі, не вибраного проєкцією: 0 - попередження в журналі і додатковий запит,
+    # 1 - помилка UnloadedFieldError (для розробки та тестів)
+    MODELS_STRICT_PROJECTIONS = os.environ.get("MODELS_STRICT_PROJECTIONS", "0") == "1"
+
+    # Створення індексів під час запуску застосунку (див. також `flask create-indexes`)
+    ENSURE_INDEXES_ON_STARTUP = os.environ.get("ENSURE_INDEXES_ON_STARTUP", "1") == "1"
+
+    # Багатодокументні транзакції (потребують replica set; вимикаються автоматично, якщо недоступні)
+    MONGO_TRANSACTIONS = os.environ.get("MONGO_TRANSACTIONS", "1") == "1"
+
+    # Кеш користувачів сесії (memory | redis | none)
+    USER_CACHE_BACKEND = os.environ.get("USER_CACHE_BACKEND", "memory")
+    USER_CACHE_TTL = int(os.environ.get("USER_CACHE_TTL", 60))
+    USER_CACHE_MAXSIZE = int(os.environ.get("USER_CACHE_MAXSIZE", 10000))
+    USER_CACHE_REDIS_URL = os.environ.get("USER_CACHE_REDIS_URL", "redis://localhost:6379/0")
+
+    # Пул з'єднань PyMongo (один MongoClient на процес-воркер)
+    MONGO_MAX_POOL_SIZE = int(os.environ.get("MONGO_MAX_POOL_SIZE", 100))
+    MONGO_MIN_POOL_SIZE = int(os.environ.get("MONGO_MIN_POOL_SIZE", 0))
+    # Перевірка з'єднання з БД під час запуску (прогрів пулу до першого запиту)
+    MONGO_WARMUP = os.environ.get("MONGO_WARMUP", "1") == "1"
+    # Скільки з'єднань пулу встановити під час прогріву (напр. за кількістю потоків воркера)
+    MONGO_WARMUP_CONNECTIONS = int(os.environ.get("MONGO_WARMUP_CONNECTIONS", 1))
+
+    # Читання з secondary (replica set) для сторінок реєстру й пошуку. Формат:
+    # "endpoint=режим[:maxStalenessSeconds],..." (режими - як readPreference у рядку підключення);
+    # маршрути поза списком і всі записи - на primary. Порожній рядок - усе читається з primary
+    MONGO_READ_ROUTES = os.environ.get(
+        "MONGO_READ_ROUTES",
+        "inventory.objects_list=secondaryPreferred,inventory.chambers_list=secondaryPreferred,"
+        "inventory.view_chamber=secondaryPreferred,inventory.search=secondaryPreferred"
+    )
+    # Допустиме відставання secondary за замовчуванням, с (не менше 90; -1 - без обмеження)
+    MONGO_MAX_STALENESS_SECONDS = int(os.environ.get("MONGO_MAX_STALENESS_SECONDS", 90))
+    # Read-your-own-writes: після запису користувача його читання з secondary виконуються
+    # в причинно-узгодженій сесії (час запису зберігається в сесії Flask)
+    MONGO_CAUSAL_READS = os.environ.get("MONGO_CAUSAL_READS", "1") == "1"
+
+    # Швидкий холодний старт: каталог кешу скомпільованих шаблонів Jinja (порожньо - без кешу)
+    # та компіляція всіх шаблонів під час запуску воркера, до першого запиту
+    JINJA_BYTECODE_CACHE_DIR = os.environ.get("JINJA_BYTECODE_CACHE_DIR", "")
+    TEMPLATES_WARMUP = os.environ.get("TEMPLATES_WARMUP", "0") == "1"
+
+    # Метрики продуктивності (/metrics у форматі Prometheus) та журнал повільних запитів
+    METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") == "1"
+    SLOW_REQUEST_MS = int(os.environ.get("SLOW_REQUEST_MS", 500))
+
+    # Хешування паролів: алгоритм і вартість у форматі werkzeug (напр. "scrypt:32768:8:1",
+    # "pbkdf2:sha256:600000"); старі хеші автоматично оновлюються під час входу
+    PASSWORD_HASH_METHOD = os.environ.get("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+    PASSWORD_SALT_LENGTH = int(os.environ.get("PASSWORD_SALT_LENGTH", 16))
+    # Розмір пулу процесів для хешування (0 - обчислення в потоці запиту)
+    PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", 2))
+    PASSWORD_HASH_TIMEOUT = int(os.environ.get("PASSWORD_HASH_TIMEOUT", 10))
+
+    # Кеш сторінок і фрагментів реєстру (ETag / If-None-Match). Лічильники версій колекцій:
+    # memory - у межах процесу (застарівання обмежене PAGE_CACHE_MAX_STALENESS секундами),
+    # redis - спільні для всіх воркерів. Сторінки маршрутів з MONGO_READ_ROUTES додатково
+    # кешуються не довше за їхній maxStalenessSeconds (без обмеження відставання - не кешуються)
+    PAGE_CACHE_ENABLED = os.environ.get("PAGE_CACHE_ENABLED", "1") == "1"
+    PAGE_CACHE_BACKEND = os.environ.get("PAGE_CACHE_BACKEND", "memory")
+    PAGE_CACHE_REDIS_URL = os.environ.get("PAGE_CACHE_REDIS_URL", "redis://localhost:6379/0")
+    PAGE_CACHE_MAX_STALENESS = int(os.environ.get("PAGE_CACHE_MAX_STALENESS", 30))
+    PAGE_CACHE_TTL = int(os.environ.get("PAGE_CACHE_TTL", 300))
+    PAGE_CACHE_MAXSIZE = int(os.environ.get("PAGE_CACHE_MAXSIZE", 500))
+    FRAGMENT_CACHE_MAXSIZE = int(os.environ.get("FRAGMENT_CACHE_MAXSIZE", 20000))
+
+    # Оновлення дашбордів у реальному часі (SSE + change streams, потребує replica set).
+    # Вимкнено за замовчуванням: кожне підключення займає потік воркера gthread до закриття вкладки,
+    # тому вмикати лише разом з GUNICORN_WORKER_CLASS=gevent (pip install gevent)
+    LIVE_UPDATES_ENABLED = os.environ.get("LIVE_UPDATES_ENABLED", "0") == "1"
+    LIVE_HEARTBEAT_SECONDS = int(os.environ.get("LIVE_HEARTBEAT_SECONDS", 15))
+    LIVE_QUEUE_SIZE = int(os.environ.get("LIVE_QUEUE_SIZE", 100))
+    LIVE_MAX_SUBSCRIBERS = int(os.environ.get("LIVE_MAX_SUBSCRIBERS", 5000))
+
+    # Статистика дашборда адміністратора (підсумки в колекції stats).
+    # STATS_REFRESH_INTERVAL - період повного перерахунку у воркері, с (0 - лише `flask refresh-stats`)
+    STATS_REFRESH_INTERVAL = int(os.environ.get("STATS_REFRESH_INTERVAL", 900))
+    STATS_NEAR_CAPACITY_RATIO = float(os.environ.get("STATS_NEAR_CAPACITY_RATIO", 0.9))
+    STATS_NEAR_CAPACITY_LIMIT = int(os.environ.get("STATS_NEAR_CAPACITY_LIMIT", 50))
+
+    # Журнал аудиту змін утримання (місячні колекції audit_YYYY_MM).
+    # AUDIT_ASYNC=0 - синхронний запис у потоці запиту (для порівняння та суворих вимог)
+    AUDIT_ENABLED = os.environ.get("AUDIT_ENABLED", "1") == "1"
+    AUDIT_ASYNC = os.environ.get("AUDIT_ASYNC", "1") == "1"
+    AUDIT_QUEUE_SIZE = int(os.environ.get("AUDIT_QUEUE_SIZE", 10000))
+    AUDIT_BATCH_SIZE = int(os.environ.get("AUDIT_BATCH_SIZE", 500))
+    AUDIT_FLUSH_INTERVAL = float(os.environ.get("AUDIT_FLUSH_INTERVAL", 1.0))
+    # Скільки запит чекає на місце в заповненій черзі, перш ніж записати подію сам, с
+    AUDIT_ENQUEUE_TIMEOUT = float(os.environ.get("AUDIT_ENQUEUE_TIMEOUT", 0.05))
+
+    # Індекс вільних місць камер у пам'яті воркера (підбір камери для об'єкта).
+    # Період повної перебудови, с: так в індекс потрапляють зміни, зроблені іншими воркерами
+    PLACEMENT_REBUILD_INTERVAL = int(os.environ.get("PLACEMENT_REBUILD_INTERVAL", 60))
+
+    # Фонові завдання (каскадне видалення камер та об'єктів). JOBS_ENABLED=0 - потік у веб-воркерах
+    # не запускається, завдання виконує окремий процес `flask run-jobs --watch`
+    JOBS_ENABLED = os.environ.get("JOBS_ENABLED", "1") == "1"
+    JOBS_BATCH_SIZE = int(os.environ.get("JOBS_BATCH_SIZE", 500))
+    # Оренда завдання, с: якщо воркер упав, після її закінчення завдання продовжує інший процес
+    JOBS_LEASE_SECONDS = int(os.environ.get("JOBS_LEASE_SECONDS", 60))
+    JOBS_POLL_INTERVAL = int(os.environ.get("JOBS_POLL_INTERVAL", 5))
+    JOBS_MAX_ATTEMPTS = int(os.environ.get("JOBS_MAX_ATTEMPTS", 5))
+    # Затримка повтору після помилки БД, с: подвоюється з кожною спробою, але не більше максимуму
+    JOBS_RETRY_DELAY = int(os.environ.get("JOBS_RETRY_DELAY", 5))
+    JOBS_RETRY_MAX_DELAY = int(os.environ.get("JOBS_RETRY_MAX_DELAY", 300))
@@ -0,0 +1,34 @@
+# Конфігурація gunicorn для продакшн-режиму: gunicorn -c gunicorn.conf.py run:app
+import multiprocessing
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+
+# Тип воркерів: sync | gthread | gevent (gevent потребує `pip install gevent`).
+# Потоки /live/events тримають з'єднання відкритим: у gthread кожен клієнт займає один із
+# GUNICORN_THREADS потоків воркера до закриття сторінки. Тому LIVE_UPDATES_ENABLED=1 вмикати
+# лише разом з GUNICORN_WORKER_CLASS=gevent (за замовчуванням оновлення в реальному часі вимкнені)
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+
+# Кількість процесів за замовчуванням - 2 * ядра + 1
+workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+
+# Потоки на воркер (лише для gthread) та одночасні з'єднання (лише для gevent)
+threads = int(os.environ.get("GUNICORN_THREADS", 4 if worker_class == "gthread" else 1))
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", 1000))
+
+# MongoClient не можна успадковувати через fork, тому застосунок (і пул з'єднань)
+# створюється окремо в кожному воркері, а не в master-процесі
+preload_app = False
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+
+# Періодичний перезапуск воркерів захищає від поступового зростання пам'яті
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 100))
+
+accesslog = os.environ.get("GUNICORN_ACCESSLOG", "-")
+errorlog = "-"
+loglevel = os.environ.get("GUNICORN_LOGLEVEL", "info")
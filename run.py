@@ -1,5 +1,18 @@
+import sys
+import time
+import click
 from app import create_app, mongo
-from werkzeug.security import generate_password_hash
+from app.services.indexes import ensure_indexes, verify_query_plans
+from app.services.bulk import FORMATS, MODELS, read_records, import_records, export_records
+from app.services.occupancy import reconcile_occupancy
+from app.services.page_cache import page_cache
+from app.services.credentials import credentials
+from app.services.stats import stats
+from app.services.synthetic import generate
+from app.services.audit import audit
+from app.services.placement import placement
+from app.services.jobs import jobs
+from app.services.warmup import compile_templates
 
 app = create_app()
 
@@ -14,7 +27,7 @@ def create_admin_command():
         print(f"Користувач '{username}' вже існує.")
         return
 
-    hashed_password = generate_password_hash(password)
+    hashed_password = credentials.hash_password(password)
     admin_data = {
         'username': username,
         'password_hash': hashed_password,
@@ -23,5 +36,135 @@ def create_admin_command():
     mongo.db.users.insert_one(admin_data)
     print(f"Адміністратор '{username}' успішно створений.")
 
+# CLI Command for index creation
+@app.cli.command("create-indexes")
+def create_indexes_command():
+    created, failed = ensure_indexes(mongo.db)
+    for collection, names in created.items():
+        print(f"{collection}: {', '.join(names)}")
+    for collection, error in failed.items():
+        print(f"ПОМИЛКА {collection}: {error}")
+    if failed:
+        sys.exit(1)
+
+# CLI Command for query plan verification
+@app.cli.command("check-indexes")
+def check_indexes_command():
+    failures = verify_query_plans(mongo.db)
+    for collection, query in failures:
+        print(f"COLLSCAN: {collection}.find({query})")
+    if failures:
+        sys.exit(1)
+    print("Усі зареєстровані запити використовують індекси.")
+
+# CLI Command for bulk import (камери варто імпортувати раніше за об'єкти)
+@app.cli.command("import-inventory")
+@click.argument("collection", type=click.Choice(list(MODELS)))
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "fmt", type=click.Choice(FORMATS), default=None)
+@click.option("--batch-size", default=1000, show_default=True)
+def import_inventory_command(collection, path, fmt, batch_size):
+    fmt = fmt or path.rsplit('.', 1)[-1].lower()
+    with open(path, encoding='utf-8-sig', newline='') as stream:
+        result = import_records(collection, read_records(stream, fmt), batch_size)
+    stats.refresh()
+    page_cache.bump('objects', 'chambers')
+    print(f"Імпортовано: {result['inserted']}, помилок: {len(result['errors'])}")
+    for number, message in result['errors']:
+        print(f"  запис {number}: {message}")
+
+# CLI Command for bulk export
+@app.cli.command("export-inventory")
+@click.argument("collection", type=click.Choice(list(MODELS)))
+@click.argument("path", type=click.Path(dir_okay=False, writable=True))
+@click.option("--format", "fmt", type=click.Choice(FORMATS), default="jsonl", show_default=True)
+def export_inventory_command(collection, path, fmt):
+    with open(path, 'w', encoding='utf-8', newline='') as out:
+        for chunk in export_records(collection, fmt):
+            out.write(chunk)
+    print(f"Експорт {collection} завершено: {path}")
+
+# CLI Command for occupancy reconciliation (можна запускати за розкладом, напр. з cron)
+@app.cli.command("reconcile-occupancy")
+@click.option("--dry-run", is_flag=True, help="Лише показати розбіжності, без виправлення")
+def reconcile_occupancy_command(dry_run):
+    report = reconcile_occupancy(dry_run=dry_run)
+    if report['chambers_corrected']:
+        stats.refresh()
+        page_cache.bump('chambers')
+    print(f"Перевірено камер: {report['chambers_checked']}, з розбіжностями: {report['chambers_drifted']}, "
+          f"сумарне відхилення: {report['total_drift']}, об'єктів без камери: {report['orphaned_objects']}")
+    if not dry_run:
+        # Розбіжності, що зникли під час повторної перевірки (паралельні зміни), не виправляються
+        print(f"Виправлено камер: {report['chambers_corrected']}")
+    for item in report['drifted']:
+        print(f"  {item['chamber_id']}: записано {item['recorded']}, фактично {item['actual']}"
+              + (" (понад місткість)" if item['over_capacity'] else ""))
+
+# CLI Command for dashboard statistics (повний перерахунок, напр. з cron)
+@app.cli.command("refresh-stats")
+def refresh_stats_command():
+    meta = stats.refresh()
+    print(f"Статистику перераховано за {meta['duration_ms']} мс")
+
+# CLI Command for synthetic data (навантажувальне тестування на локальній БД)
+@app.cli.command("generate-data")
+@click.option("--users", default=0, show_default=True)
+@click.option("--chambers", default=0, show_default=True)
+@click.option("--objects", default=0, show_default=True)
+@click.option("--contained-ratio", default=0.8, show_default=True, help="Частка об'єктів, розміщених у камерах")
+@click.option("--password", default="password", show_default=True, help="Спільний пароль згенерованих користувачів")
+@click.option("--batch-size", default=1000, show_default=True)
+@click.option("--seed", type=int, default=None, help="Зерно генератора для відтворюваних даних")
+def generate_data_command(users, chambers, objects, contained_ratio, password, batch_size, seed):
+    # Пароль хешується один раз: хешування для кожного користувача зайняло б години
+    password_hash = credentials.hash_password(password) if users else None
+    result = generate(users, chambers, objects, password_hash, contained_ratio, batch_size, seed)
+    stats.refresh()
+    page_cache.bump('objects', 'chambers')
+    print(f"Створено користувачів: {result['users']}, камер: {result['chambers']}, об'єктів: {result['objects']}")
+
+# CLI Command for audit log retention (місячні розділи, старші за --keep-months, видаляються)
+@app.cli.command("prune-audit")
+@click.option("--keep-months", default=24, show_default=True)
+def prune_audit_command(keep_months):
+    dropped = audit.prune(keep_months)
+    print(f"Видалено розділів журналу: {len(dropped)}" + (f" ({', '.join(dropped)})" if dropped else ""))
+
+# CLI Command for bulk placement ("Awaiting Containment" -> найкраща вільна камера)
+@app.cli.command("assign-chambers")
+@click.option("--limit", default=0, show_default=True, help="Максимум об'єктів за запуск (0 - усі)")
+@click.option("--dry-run", is_flag=True, help="Лише скласти план, без змін у БД")
+def assign_chambers_command(limit, dry_run):
+    result = placement.assign_awaiting(limit=limit or None, dry_run=dry_run)
+    if result['placed'] and not dry_run:
+        stats.refresh()
+        page_cache.bump('objects', 'chambers')
+    print(f"Очікують розміщення: {result['awaiting']}, "
+          f"{'можна розмістити' if dry_run else 'розміщено'}: {result['placed']}, камер: {result['chambers']}")
+
+# CLI Command for background jobs (окремий процес-обробник, напр. при JOBS_ENABLED=0)
+@app.cli.command("run-jobs")
+@click.option("--watch", is_flag=True, help="Не завершуватись, а чекати на нові завдання")
+def run_jobs_command(watch):
+    while True:
+        count = jobs.run_pending()
+        if count or not watch:
+            print(f"Виконано завдань: {count}")
+        if not watch:
+            break
+        time.sleep(jobs.poll_interval)
+
+# CLI Command for template precompilation (під час збирання образу, див. Dockerfile)
+@app.cli.command("precompile-templates")
+def precompile_templates_command():
+    cache_dir = app.config.get('JINJA_BYTECODE_CACHE_DIR')
+    if not cache_dir:
+        print("JINJA_BYTECODE_CACHE_DIR не задано: скомпільовані шаблони нікуди зберегти.")
+        sys.exit(1)
+    started = time.perf_counter()
+    names = compile_templates(app)
+    print(f"Скомпільовано шаблонів: {len(names)} за {(time.perf_counter() - started) * 1000:.0f} мс ({cache_dir})")
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0')
\ No newline at end of file
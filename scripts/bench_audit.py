@@ -0,0 +1,103 @@
+"""
+Бенчмарк шляхів запису з журналом аудиту і без нього.
+
+    MONGO_URI=mongodb://localhost:27017/foundation_bench \
+        python scripts/bench_audit.py --username admin --password secret --iterations 500
+
+Режими: off (AUDIT_ENABLED=0), async (черга + пакетний запис), sync (insert_one у запиті).
+Для кожного режиму вимірюються переміщення об'єкта між камерами (edit_object),
+створення (create_object) та видалення (delete_object). Скрипт створює і видаляє власні камери.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, mongo  # noqa: E402
+from app.services.audit import audit  # noqa: E402
+from config import Config  # noqa: E402
+
+MODES = {
+    'off': {'AUDIT_ENABLED': False},
+    'async': {'AUDIT_ENABLED': True, 'AUDIT_ASYNC': True},
+    'sync': {'AUDIT_ENABLED': True, 'AUDIT_ASYNC': False},
+}
+
+
+def make_app(overrides):
+    class BenchConfig(Config):
+        TESTING = True
+        PAGE_CACHE_ENABLED = False
+        LIVE_UPDATES_ENABLED = False
+        STATS_REFRESH_INTERVAL = 0
+    for name, value in overrides.items():
+        setattr(BenchConfig, name, value)
+    return create_app(BenchConfig)
+
+
+def summary(samples):
+    samples = sorted(samples)
+    return statistics.median(samples), samples[min(len(samples) - 1, int(0.95 * len(samples)))]
+
+
+def run_mode(mode, args):
+    app = make_app(MODES[mode])
+    client = app.test_client()
+    response = client.post('/login', data={'username': args.username, 'password': args.password})
+    if response.status_code != 302:
+        sys.exit(f"Не вдалося увійти як {args.username}: HTTP {response.status_code}")
+
+    chambers = [
+        mongo.db.chambers.insert_one({'location': f'bench-{mode}-{n}', 'capacity': args.iterations + 1,
+                                      'current_occupancy': 0, 'status': 'Active'}).inserted_id
+        for n in range(2)
+    ]
+    timings = {'create_object': [], 'edit_object': [], 'delete_object': []}
+
+    def timed(name, method, url, data=None):
+        started = time.perf_counter()
+        client.open(url, method=method, data=data)
+        timings[name].append((time.perf_counter() - started) * 1000)
+
+    try:
+        for n in range(args.iterations):
+            number = f'BENCH-{mode}-{n}'
+            form = {'object_number': number, 'object_name': 'bench', 'object_class': 'Safe'}
+            timed('create_object', 'POST', '/objects/new', dict(form, chamber_id=str(chambers[0])))
+            object_id = mongo.db.objects.find_one({'object_number': number}, {'_id': 1})['_id']
+            timed('edit_object', 'POST', f'/objects/edit/{object_id}', dict(form, chamber_id=str(chambers[1])))
+            timed('delete_object', 'GET', f'/objects/delete/{object_id}')
+        # Час дозапису черги не входить у затримку запитів, але показується окремо
+        started = time.perf_counter()
+        audit.flush()
+        flushed_ms = (time.perf_counter() - started) * 1000
+    finally:
+        mongo.db.objects.delete_many({'object_number': {'$regex': f'^BENCH-{mode}-'}})
+        mongo.db.chambers.delete_many({'_id': {'$in': chambers}})
+
+    for name, samples in timings.items():
+        median, p95 = summary(samples)
+        print(f"{mode:<6} {name:<14} медіана {median:>8.2f} мс   p95 {p95:>8.2f} мс")
+    if mode != 'off':
+        print(f"{mode:<6} {'':<14} {audit.stats()}; дозапис черги {flushed_ms:.1f} мс")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--username', required=True)
+    parser.add_argument('--password', required=True)
+    parser.add_argument('--iterations', type=int, default=300)
+    parser.add_argument('--modes', default=','.join(MODES))
+    args = parser.parse_args()
+
+    for mode in args.modes.split(','):
+        if mode not in MODES:
+            parser.error(f'невідомий режим: {mode}')
+        run_mode(mode, args)
+
+
+if __name__ == '__main__':
+    main()
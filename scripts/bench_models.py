@@ -0,0 +1,98 @@
+"""
+Бенчмарк створення моделей: пам'ять і пропускна здатність на 100k документів.
+
+    python scripts/bench_models.py [--count 100000]
+
+Порівнюються: стара модель на __dict__ (before), AnomalyObject(doc) на __slots__,
+AnomalyObject.from_batch(docs) та from_batch з проєкцією LIST_FIELDS.
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+from bson.objectid import ObjectId
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models import AnomalyObject  # noqa: E402
+
+
+class LegacyAnomalyObject:
+    """Модель у попередньому вигляді (атрибути в __dict__) - для порівняння"""
+
+    def __init__(self, data):
+        self._id = str(data.get('_id')) if data.get('_id') else None
+        self.object_number = data.get('object_number')
+        self.object_name = data.get('object_name')
+        self.object_class = data.get('object_class')
+        self.description = data.get('description')
+        self.special_contaiment_procedures = data.get('special_contaiment_procedures')
+        self.status = data.get('status', 'Under Study')
+        self.discovery_date = data.get('discovery_date')
+        self.assigned_researchers = data.get('assigned_researchers', [])
+        self.chamber_id = str(data.get('chamber_id')) if data.get('chamber_id') else None
+
+
+def make_docs(count, fields=None):
+    chamber_id = ObjectId()
+    docs = []
+    for i in range(count):
+        doc = {
+            '_id': ObjectId(),
+            'object_number': f'SCP-{i:05d}',
+            'object_name': f'Object {i}',
+            'object_class': 'Euclid',
+            'description': 'x' * 400,
+            'special_contaiment_procedures': 'y' * 600,
+            'status': 'Contained',
+            'discovery_date': '2024-01-01',
+            'assigned_researchers': ['alpha', 'beta'],
+            'chamber_id': chamber_id,
+        }
+        if fields is not None:
+            doc = {key: value for key, value in doc.items() if key == '_id' or key in fields}
+        docs.append(doc)
+    return docs
+
+
+def measure(label, build, docs):
+    # Збирач сміття вимкнено: інакше час залежить від того, коли він спрацює на 100k нових об'єктах
+    gc.collect()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        models = build(docs)
+        elapsed = time.perf_counter() - started
+        del models
+
+        # Пам'ять - окремим проходом, оскільки tracemalloc сповільнює виділення
+        tracemalloc.start()
+        models = build(docs)
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del models
+    finally:
+        gc.enable()
+    print(f"{label:<32} {len(docs) / elapsed:>12,.0f} моделей/с {current / 1024 / 1024:>8.1f} МіБ")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=100_000)
+    args = parser.parse_args()
+
+    full_docs = make_docs(args.count)
+    list_docs = make_docs(args.count, AnomalyObject.LIST_FIELDS)
+
+    measure('before: __dict__ model', lambda docs: [LegacyAnomalyObject(d) for d in docs], full_docs)
+    measure('after: AnomalyObject(doc)', lambda docs: [AnomalyObject(d) for d in docs], full_docs)
+    measure('after: from_batch', AnomalyObject.from_batch, full_docs)
+    measure('after: from_batch(LIST_FIELDS)',
+            lambda docs: AnomalyObject.from_batch(docs, AnomalyObject.LIST_FIELDS), list_docs)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""
+Кількість звернень до БД на сторінках реєстру не має залежати від кількості об'єктів.
+
+    MONGO_URI=mongodb://localhost:27017/foundation_bench python scripts/bench_roundtrips.py --sizes 10,100,1000
+
+Для кожного N створюються N об'єктів (по 5 на камеру, тобто N/5 різних камер) і одна камера
+з N об'єктами; рахуються команди MongoDB для /objects та сторінки камери. Команди getMore
+(дочитування того ж курсора порціями) рахуються окремо. Якщо кількість команд росте
+разом з N (N+1 запитів), скрипт завершується з кодом 1.
+
+УВАГА: колекції objects та chambers вказаної бази даних очищуються.
+"""
+import argparse
+import os
+import sys
+import threading
+
+from pymongo import monitoring
+from werkzeug.security import generate_password_hash
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Рахує команди MongoDB, окремо - getMore (реєструється глобально до створення MongoClient)"""
+
+    def __init__(self):
+        self.commands = 0
+        self.get_more = 0
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        with self._lock:
+            if event.command_name == 'getMore':
+                self.get_more += 1
+            else:
+                self.commands += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    def reset(self):
+        with self._lock:
+            self.commands = self.get_more = 0
+
+
+counter = CommandCounter()
+monitoring.register(counter)
+
+from app import create_app, mongo  # noqa: E402
+from config import Config  # noqa: E402
+
+USERNAME = 'bench-roundtrips'
+PASSWORD = 'bench-roundtrips'
+OBJECTS_PER_CHAMBER = 5
+
+
+class BenchConfig(Config):
+    TESTING = True
+    ENSURE_INDEXES_ON_STARTUP = False
+    STATS_REFRESH_INTERVAL = 0
+    LIVE_UPDATES_ENABLED = False
+    AUDIT_ENABLED = False
+    # Кеш сторінок сховав би самі запити
+    PAGE_CACHE_ENABLED = False
+
+
+def seed(db, size):
+    """N об'єктів у N/5 камерах і окрема камера з N об'єктами -> _id великої камери"""
+    db.objects.delete_many({})
+    db.chambers.delete_many({})
+    chambers = max(1, size // OBJECTS_PER_CHAMBER)
+    chamber_ids = db.chambers.insert_many([
+        {'location': f'Site-{n}', 'chamber_type': 'Standard', 'security_level': '2',
+         'capacity': OBJECTS_PER_CHAMBER, 'current_occupancy': OBJECTS_PER_CHAMBER, 'status': 'Active'}
+        for n in range(chambers)
+    ]).inserted_ids
+    big = db.chambers.insert_one({'location': 'Site-big', 'chamber_type': 'Standard', 'security_level': '2',
+                                  'capacity': size, 'current_occupancy': size, 'status': 'Active'}).inserted_id
+    docs = []
+    for n in range(size):
+        docs.append({'object_number': f'SCP-{n:06d}', 'object_name': f'Object {n}', 'object_class': 'Euclid',
+                     'status': 'Contained', 'chamber_id': chamber_ids[n // OBJECTS_PER_CHAMBER % chambers]})
+        docs.append({'object_number': f'SCP-B{n:06d}', 'object_name': f'Object B{n}', 'object_class': 'Safe',
+                     'status': 'Contained', 'chamber_id': big})
+    db.objects.insert_many(docs)
+    return big
+
+
+def count(client, url):
+    client.get(url)  # прогрів: кеш користувача, підбір камер тощо
+    counter.reset()
+    status = client.get(url).status_code
+    return status, counter.commands, counter.get_more
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='10,100,1000', help='кількості об\'єктів через кому')
+    parser.add_argument('--per-page', type=int, default=50)
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    app = create_app(BenchConfig)
+    mongo.db.users.delete_many({'username': USERNAME})
+    mongo.db.users.insert_one({'username': USERNAME, 'password_hash': generate_password_hash(PASSWORD),
+                               'role': 'admin'})
+    results = {}
+    try:
+        client = app.test_client()
+        if client.post('/login', data={'username': USERNAME, 'password': PASSWORD}).status_code != 302:
+            sys.exit("Не вдалося увійти")
+        for size in sizes:
+            big = seed(mongo.db, size)
+            for name, url in (('/objects', f'/objects?per_page={args.per_page}'), ('view_chamber', f'/chambers/{big}')):
+                status, commands, get_more = count(client, url)
+                results.setdefault(name, []).append(commands)
+                print(f"N={size:<7} {name:<14} HTTP {status}  команд {commands:>3}  (getMore {get_more})")
+    finally:
+        mongo.db.users.delete_many({'username': USERNAME})
+
+    growing = [name for name, commands in results.items() if len(set(commands)) > 1]
+    if growing:
+        sys.exit(f"Кількість команд залежить від N: {', '.join(growing)}")
+    print("OK: кількість команд не залежить від кількості об'єктів")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,225 @@
+"""
+Бенчмарк маршрутів inventory_bp, auth_bp та main_bp через тестовий клієнт Flask.
+
+Для кожного маршруту вимірюються затримка (медіана, p95), кількість команд MongoDB
+на запит і пікове виділення пам'яті (tracemalloc). Результати порівнюються зі
+збереженим базовим рівнем; за регресії скрипт завершується з кодом 1.
+
+    flask --app run generate-data --users 100 --chambers 2000 --objects 100000 --seed 1
+    python scripts/bench_routes.py --save-baseline      # зафіксувати базовий рівень
+    python scripts/bench_routes.py                      # порівняти з ним
+
+Працює з БД з MONGO_URI (локальний mongod); маршрути видалення виконуються над
+тимчасовими документами, створеними скриптом.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+
+from pymongo import monitoring
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BLUEPRINTS = ('inventory', 'auth', 'main')
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_routes_baseline.json')
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Рахує команди MongoDB (реєструється глобально до створення MongoClient)"""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        with self._lock:
+            self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+counter = CommandCounter()
+monitoring.register(counter)
+
+from app import create_app, mongo  # noqa: E402
+from config import Config  # noqa: E402
+
+
+def make_config(no_cache):
+    class BenchConfig(Config):
+        TESTING = True
+        ENSURE_INDEXES_ON_STARTUP = False
+        STATS_REFRESH_INTERVAL = 0
+        LIVE_UPDATES_ENABLED = False
+        # Без кешу сторінок вимірюється робота самого маршруту, а не читання з кешу
+        PAGE_CACHE_ENABLED = not no_cache
+    return BenchConfig
+
+
+def login(client, args):
+    response = client.post('/login', data={'username': args.username, 'password': args.password})
+    if response.status_code != 302:
+        sys.exit(f"Не вдалося увійти як {args.username}: HTTP {response.status_code}")
+
+
+def disposable(collection):
+    """Тимчасовий документ для маршрутів видалення"""
+    if collection == 'chambers':
+        doc = {'location': 'bench', 'capacity': 1, 'current_occupancy': 0, 'status': 'Active'}
+    else:
+        doc = {'object_number': f'BENCH-{time.time_ns()}', 'object_name': 'bench', 'chamber_id': None,
+               'status': 'Discovered'}
+    return str(mongo.db[collection].insert_one(doc).inserted_id)
+
+
+def build_cases(app):
+    """Маршрут -> функція, що повертає (метод, URL, дані форми) для одного запиту"""
+    chamber = mongo.db.chambers.find_one({}, {'_id': 1})
+    obj = mongo.db.objects.find_one({}, {'_id': 1})
+    samples = {
+        'chamber_id': str(chamber['_id']) if chamber else None,
+        'object_id': str(obj['_id']) if obj else None,
+        'collection': 'objects',
+    }
+
+    cases = {}
+    for rule in app.url_map.iter_rules():
+        if rule.endpoint.split('.')[0] not in BLUEPRINTS or 'GET' not in rule.methods:
+            continue
+        if rule.endpoint in ('inventory.delete_chamber', 'inventory.delete_object'):
+            collection = 'chambers' if 'chamber' in rule.endpoint else 'objects'
+            argument = next(iter(rule.arguments))
+            cases[rule.endpoint] = (
+                lambda rule=rule, argument=argument, collection=collection:
+                ('GET', rule.rule.replace(f'<{argument}>', disposable(collection)), None)
+            )
+            continue
+        url = rule.rule
+        for argument in rule.arguments:
+            if samples.get(argument) is None:
+                url = None
+                break
+            url = url.replace(f'<{argument}>', samples[argument])
+        if url:
+            cases[rule.endpoint] = lambda url=url: ('GET', url, None)
+    return cases
+
+
+def run_case(client, make_request, endpoint, args):
+    method, url, data = make_request()
+    if endpoint == 'auth.login[POST]':
+        # Кожен вхід - з новою сесією, інакше вже авторизованого користувача буде перенаправлено
+        client = client.application.test_client()
+    elif endpoint == 'auth.logout':
+        login(client, args)
+    counter.count = 0
+    started = time.perf_counter()
+    response = client.open(url, method=method, data=data)
+    response.get_data()
+    elapsed = time.perf_counter() - started
+    return elapsed, counter.count, response.status_code
+
+
+def measure(client, endpoint, make_request, args):
+    latencies, commands = [], []
+    status = None
+    for _ in range(args.repeat):
+        elapsed, count, status = run_case(client, make_request, endpoint, args)
+        latencies.append(elapsed * 1000)
+        commands.append(count)
+
+    # Пам'ять - окремим запитом, щоб tracemalloc не спотворював затримку
+    tracemalloc.start()
+    run_case(client, make_request, endpoint, args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        'status': status,
+        'p50_ms': round(statistics.median(latencies), 3),
+        'p95_ms': round(latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))], 3),
+        'db_commands': int(statistics.median(commands)),
+        'peak_kib': round(peak / 1024, 1),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Регресії: затримка чи пам'ять більші за базові понад tolerance, або більше команд БД"""
+    regressions = []
+    for endpoint, current in results.items():
+        base = baseline.get(endpoint)
+        if not base:
+            continue
+        if current['p50_ms'] > base['p50_ms'] * (1 + tolerance):
+            regressions.append(f"{endpoint}: p50 {base['p50_ms']} -> {current['p50_ms']} мс")
+        if current['db_commands'] > base['db_commands']:
+            regressions.append(f"{endpoint}: команд БД {base['db_commands']} -> {current['db_commands']}")
+        if current['peak_kib'] > base['peak_kib'] * (1 + tolerance):
+            regressions.append(f"{endpoint}: пам'ять {base['peak_kib']} -> {current['peak_kib']} КіБ")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--username', default='researcher000000', help='адміністратор (за замовчуванням - з generate-data)')
+    parser.add_argument('--password', default='password')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='допустиме погіршення затримки та пам\'яті')
+    parser.add_argument('--no-cache', action='store_true', help='вимкнути кеш сторінок')
+    parser.add_argument('--only', default='', help='перелік endpoint через кому')
+    args = parser.parse_args()
+
+    app = create_app(make_config(args.no_cache))
+    results = {}
+    # Запити виконуються без зовнішнього app context: інакше g (і поточний користувач
+    # Flask-Login) були б спільними для всіх запитів і клієнтів
+    cases = build_cases(app)
+    if args.only:
+        cases = {name: case for name, case in cases.items() if name in args.only.split(',')}
+    client = app.test_client()
+    login(client, args)
+    for endpoint in sorted(cases):
+        # Вхід вимірюється окремим клієнтом без сесії (інакше - перенаправлення)
+        bench_client = app.test_client() if endpoint.startswith('auth.') else client
+        results[endpoint] = measure(bench_client, endpoint, cases[endpoint], args)
+        row = results[endpoint]
+        print(f"{endpoint:<32} HTTP {row['status']}  p50 {row['p50_ms']:>8.2f} мс  p95 {row['p95_ms']:>8.2f} мс  "
+              f"БД {row['db_commands']:>3}  пам'ять {row['peak_kib']:>8.1f} КіБ")
+
+    # Вхід (POST) - окремий сценарій: перевірка пароля домінує в його вартості
+    login_case = lambda: ('POST', '/login', {'username': args.username, 'password': args.password})  # noqa: E731
+    results['auth.login[POST]'] = measure(app.test_client(), 'auth.login[POST]', login_case, args)
+    print(f"{'auth.login[POST]':<32} p50 {results['auth.login[POST]']['p50_ms']:>8.2f} мс")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as out:
+            json.dump(results, out, indent=2, sort_keys=True)
+        print(f"Базовий рівень збережено: {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("Базовий рівень відсутній - запустіть з --save-baseline")
+        return
+    with open(args.baseline, encoding='utf-8') as stream:
+        regressions = compare(results, json.load(stream), args.tolerance)
+    for line in regressions:
+        print(f"РЕГРЕСІЯ {line}")
+    if regressions:
+        sys.exit(1)
+    print("Регресій відносно базового рівня немає.")
+
+
+if __name__ == '__main__':
+    main()
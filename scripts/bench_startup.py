@@ -0,0 +1,171 @@
+"""
+Бенчмарк холодного старту: час імпорту (-X importtime) і час до першої відповіді.
+
+    python scripts/bench_startup.py --runs 10
+    python scripts/bench_startup.py --gunicorn --runs 5     # через HTTP, gunicorn з одним воркером
+
+Кожен запуск - новий процес Python. Варіанти:
+  cold      - без кешу шаблонів і без прогріву (перший запит компілює шаблони);
+  bytecode  - кеш байткоду Jinja, заповнений `flask precompile-templates`;
+  warmup    - кеш байткоду + TEMPLATES_WARMUP (шаблони завантажуються до першого запиту).
+За замовчуванням БД не потрібна (MONGO_WARMUP=0, сторінки без запитів до БД);
+--mongo-warmup вмикає прогрів пулу з'єднань (потрібен доступний MONGO_URI).
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Вимірювання в дочірньому процесі: імпорт і створення застосунку, перший та другий запит
+CHILD = r"""
+import json, sys, time
+started = time.perf_counter()
+sys.path.insert(0, {root!r})
+import run
+imported = time.perf_counter()
+client = run.app.test_client()
+result = {{'import_and_create_ms': (imported - started) * 1000}}
+for path in {paths!r}:
+    t0 = time.perf_counter()
+    status = client.get(path).status_code
+    t1 = time.perf_counter()
+    client.get(path)
+    t2 = time.perf_counter()
+    result[path] = {{'status': status, 'first_ms': (t1 - t0) * 1000, 'second_ms': (t2 - t1) * 1000}}
+result['total_ms'] = (time.perf_counter() - started) * 1000
+print(json.dumps(result))
+"""
+
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|\s*(\S+)$')
+
+
+def base_env(args):
+    env = dict(os.environ)
+    env.setdefault('MONGO_URI', 'mongodb://localhost:27017/foundation_bench')
+    env.update({
+        'ENSURE_INDEXES_ON_STARTUP': '0',
+        'MONGO_WARMUP': '1' if args.mongo_warmup else '0',
+        'MONGO_WARMUP_CONNECTIONS': str(args.mongo_connections),
+        'STATS_REFRESH_INTERVAL': '0',
+        'JINJA_BYTECODE_CACHE_DIR': '',
+        'TEMPLATES_WARMUP': '0',
+    })
+    return env
+
+
+def variants(args, cache_dir):
+    env = base_env(args)
+    return {
+        'cold': env,
+        'bytecode': dict(env, JINJA_BYTECODE_CACHE_DIR=cache_dir),
+        'warmup': dict(env, JINJA_BYTECODE_CACHE_DIR=cache_dir, TEMPLATES_WARMUP='1'),
+    }
+
+
+def import_profile(env, top):
+    """Розбір -X importtime: власний час модулів, згрупований за пакетами верхнього рівня"""
+    output = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import run'],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    ).stderr
+    packages = {}
+    for line in output.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            package = match[3].split('.')[0]
+            packages[package] = packages.get(package, 0) + int(match[1])
+    # Власний час модуля run містить і виконання create_app()
+    create_app = packages.pop('run', 0)
+    print(f"Імпорт `run`: {sum(packages.values()) / 1000:.1f} мс, create_app: {create_app / 1000:.1f} мс")
+    for name, micros in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {name:<24} {micros / 1000:>8.1f} мс")
+    print(f"  {'(власні: app, config)':<24} {(packages.get('app', 0) + packages.get('config', 0)) / 1000:>8.1f} мс")
+
+
+def run_child(env, paths):
+    code = CHILD.format(root=ROOT, paths=paths)
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def run_gunicorn(env, path, timeout=60):
+    """Час від запуску gunicorn (один воркер) до першої успішної відповіді на path"""
+    port = free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-w', '1', '-b', f'127.0.0.1:{port}', 'run:app'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f'gunicorn завершився з кодом {process.returncode} (чи встановлено gunicorn?)')
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}{path}', timeout=5) as response:
+                    response.read()
+                return {'total_ms': (time.perf_counter() - started) * 1000}
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.005)
+        raise RuntimeError('gunicorn не відповів вчасно')
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--paths', default='/,/login', help='сторінки для першого запиту, через кому')
+    parser.add_argument('--top', type=int, default=10, help='скільки найдорожчих імпортів показати')
+    parser.add_argument('--gunicorn', action='store_true', help='вимірювати через HTTP з gunicorn')
+    parser.add_argument('--mongo-warmup', action='store_true', help='прогрів пулу з\'єднань (потрібна БД)')
+    parser.add_argument('--mongo-connections', type=int, default=4)
+    args = parser.parse_args()
+    paths = [path for path in args.paths.split(',') if path]
+
+    cache_dir = tempfile.mkdtemp(prefix='jinja_cache_')
+    try:
+        env = base_env(args)
+        import_profile(env, args.top)
+        subprocess.run([sys.executable, '-m', 'flask', '--app', 'run', 'precompile-templates'], cwd=ROOT,
+                       env=dict(env, JINJA_BYTECODE_CACHE_DIR=cache_dir), check=True, stdout=subprocess.DEVNULL)
+
+        print()
+        for name, variant_env in variants(args, cache_dir).items():
+            if args.gunicorn:
+                samples = [run_gunicorn(variant_env, paths[0]) for _ in range(args.runs)]
+                print(f"{name:<9} gunicorn: запуск -> перша відповідь {paths[0]}: "
+                      f"медіана {statistics.median(s['total_ms'] for s in samples):.1f} мс")
+                continue
+            samples = [run_child(variant_env, paths) for _ in range(args.runs)]
+            line = f"{name:<9} імпорт+create_app {statistics.median(s['import_and_create_ms'] for s in samples):>7.1f} мс"
+            for path in paths:
+                first = statistics.median(s[path]['first_ms'] for s in samples)
+                second = statistics.median(s[path]['second_ms'] for s in samples)
+                line += f" | {path} перший {first:>6.1f} / наступний {second:>5.1f} мс"
+            line += f" | до першої відповіді {statistics.median(s['total_ms'] for s in samples):>7.1f} мс"
+            print(line)
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Бенчмарк статистики дашборда: обчислення "наживо" агрегаціями проти читання підсумків stats.
+
+    MONGO_URI=mongodb://localhost:27017/foundation_bench \
+        python scripts/bench_stats.py --objects 500000 --chambers 5000
+
+УВАГА: колекції objects, chambers та stats вказаної бази даних очищуються.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, mongo  # noqa: E402
+from app.services.stats import stats  # noqa: E402
+
+CLASSES = ('Safe', 'Euclid', 'Keter', 'Thaumiel', 'Neutralized')
+STATUSES = ('Contained', 'Under Study', 'Awaiting Containment', 'Discovered')
+CHAMBER_STATUSES = ('Active', 'Under Maintenance', 'Compromised')
+
+
+def seed(db, objects, chambers, batch_size=10000):
+    db.objects.drop()
+    db.chambers.drop()
+    db.stats.drop()
+
+    chamber_docs = []
+    for i in range(chambers):
+        capacity = random.randint(1, 50)
+        chamber_docs.append({
+            'location': f'Site-{i % 40:02d}',
+            'chamber_type': random.choice(('Standard', 'Humanoid', 'Biological')),
+            'security_level': str(random.randint(1, 5)),
+            'capacity': capacity,
+            'current_occupancy': random.randint(0, capacity),
+            'status': random.choice(CHAMBER_STATUSES),
+        })
+    db.chambers.insert_many(chamber_docs)
+    chamber_ids = [doc['_id'] for doc in chamber_docs]
+
+    for start in range(0, objects, batch_size):
+        db.objects.insert_many([{
+            'object_number': f'SCP-{n:07d}',
+            'object_name': f'Object {n}',
+            'object_class': random.choice(CLASSES),
+            'description': 'x' * 300,
+            'special_contaiment_procedures': 'y' * 500,
+            'status': random.choice(STATUSES),
+            'chamber_id': random.choice(chamber_ids),
+        } for n in range(start, min(start + batch_size, objects))], ordered=False)
+
+
+def timed(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--objects', type=int, default=200_000)
+    parser.add_argument('--chambers', type=int, default=2_000)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--skip-seed', action='store_true', help='використати вже наявні дані')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if not args.skip_seed:
+            started = time.perf_counter()
+            seed(mongo.db, args.objects, args.chambers)
+            print(f"Згенеровано {args.objects} об'єктів і {args.chambers} камер за {time.perf_counter() - started:.1f} с")
+        stats.refresh()
+
+        for label, func in (('live (агрегації)', stats.compute), ('rollup (stats.snapshot)', stats.snapshot)):
+            median, worst = timed(func, args.repeat)
+            print(f"{label:<26} медіана {median:>9.2f} мс   максимум {worst:>9.2f} мс")
+
+
+if __name__ == '__main__':
+    main()
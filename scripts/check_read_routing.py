@@ -0,0 +1,143 @@
+"""
+Перевірка маршрутизації читань на replica set (див. docker-compose.replica.yaml).
+
+    python scripts/check_read_routing.py --rounds 50
+    MONGO_CAUSAL_READS=0 python scripts/check_read_routing.py   # без read-your-own-writes
+
+1. Сторінки з MONGO_READ_ROUTES мають читати з secondary, форма редагування - з primary.
+2. Read-your-own-writes: камера створюється через форму, і одразу після цього її сторінка
+   (маршрут на secondary) відкривається тим самим клієнтом. З причинно-узгодженими сесіями
+   кожне таке читання містить afterClusterTime і бачить щойно створену камеру.
+Створені камери видаляються через звичайний маршрут видалення.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+from pymongo import monitoring
+from pymongo.errors import PyMongoError
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class CommandRecorder(monitoring.CommandListener):
+    """Запам'ятовує читання: (команда, колекція, адреса сервера, чи є afterClusterTime)"""
+
+    def __init__(self):
+        self.commands = []
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        if event.command_name not in ('find', 'aggregate', 'count'):
+            return
+        read_concern = event.command.get('readConcern', {})
+        with self._lock:
+            self.commands.append((event.command_name, event.command.get(event.command_name),
+                                  event.connection_id, 'afterClusterTime' in read_concern))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    def take(self):
+        with self._lock:
+            commands, self.commands = self.commands, []
+        return commands
+
+
+recorder = CommandRecorder()
+monitoring.register(recorder)
+
+from app import create_app, mongo  # noqa: E402
+from config import Config  # noqa: E402
+
+
+class CheckConfig(Config):
+    TESTING = True
+    ENSURE_INDEXES_ON_STARTUP = False
+    MONGO_WARMUP = False
+    STATS_REFRESH_INTERVAL = 0
+    LIVE_UPDATES_ENABLED = False
+    # Кеш сторінок приховав би, звідки читаються дані
+    PAGE_CACHE_ENABLED = False
+
+
+def login(client, args):
+    response = client.post('/login', data={'username': args.username, 'password': args.password})
+    if response.status_code != 302:
+        sys.exit(f"Не вдалося увійти як {args.username}: HTTP {response.status_code}")
+
+
+def check_routes(client, primary):
+    """Адреси серверів, з яких сторінки читають камери та об'єкти"""
+    from app.services.reads import reads
+    chamber_id = mongo.db.chambers.find_one({'deleted_at': None}, {'_id': 1})['_id']
+    failures = 0
+    for endpoint, url in (('inventory.objects_list', '/objects'), ('inventory.chambers_list', '/chambers'),
+                          ('inventory.view_chamber', f'/chambers/{chamber_id}'),
+                          ('inventory.edit_chamber', f'/chambers/edit/{chamber_id}')):
+        recorder.take()
+        status = client.get(url).status_code
+        servers = {address for _, collection, address, _ in recorder.take() if collection in ('objects', 'chambers')}
+        expected = 'secondary' if reads.preference(endpoint) else 'primary'
+        ok = bool(servers) and ((primary in servers) == (expected == 'primary'))
+        failures += not ok
+        print(f"{'OK ' if ok else 'ERR'} {url:<40} HTTP {status}  очікується {expected:<9} сервери: "
+              f"{', '.join(f'{host}:{port}' for host, port in sorted(servers)) or '-'}")
+    return failures
+
+
+def check_own_writes(client, rounds):
+    """Створення камери і негайне читання її сторінки; повертає кількість невдалих читань"""
+    stale, causal = 0, 0
+    created = []
+    try:
+        for n in range(rounds):
+            location = f'rs-check-{time.time_ns()}-{n}'
+            client.post('/chambers/new', data={'location': location, 'chamber_type': 'check',
+                                               'security_level': '1', 'capacity': '1'})
+            chamber = mongo.db.chambers.find_one({'location': location}, {'_id': 1})
+            created.append(str(chamber['_id']))
+            recorder.take()
+            response = client.get(f"/chambers/{chamber['_id']}")
+            causal += any(after for _, _, _, after in recorder.take())
+            stale += response.status_code != 200 or location not in response.get_data(as_text=True)
+    finally:
+        for chamber_id in created:
+            client.get(f'/chambers/delete/{chamber_id}')
+    print(f"Read-your-own-writes: {rounds - stale}/{rounds} читань бачать щойно створену камеру "
+          f"(з afterClusterTime: {causal})")
+    return stale
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--username', default='researcher000000', help='адміністратор (за замовчуванням - з generate-data)')
+    parser.add_argument('--password', default='password')
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_app(CheckConfig)
+    try:
+        # Очікування, доки драйвер знайде primary
+        mongo.cx.admin.command('ping')
+    except PyMongoError as e:
+        sys.exit(f"БД недоступна: {e}")
+    primary, secondaries = mongo.cx.primary, mongo.cx.secondaries
+    if not primary or not secondaries:
+        sys.exit("Потрібен replica set з primary та хоча б одним secondary (див. docker-compose.replica.yaml)")
+    print(f"primary {primary[0]}:{primary[1]}, secondary: {', '.join(f'{h}:{p}' for h, p in sorted(secondaries))}")
+
+    client = app.test_client()
+    login(client, args)
+    failures = check_routes(client, primary)
+    failures += check_own_writes(client, args.rounds)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+Навантажувальне тестування реєстру (лише стандартна бібліотека).
+
+Приклад:
+    gunicorn -c gunicorn.conf.py run:app
+    python scripts/loadtest.py --base-url http://localhost:5000 \
+        --username admin --password secret --concurrency 32 --duration 30
+
+Сценарії: objects (/objects), chambers (/chambers), login (POST /login),
+api-objects (/api/v1/objects), api-chambers (/api/v1/chambers).
+Для кожного сценарію виводяться p50/p95/p99 затримки та кількість запитів за секунду.
+"""
+import argparse
+import http.cookiejar
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+# Сценарій -> шлях GET-запиту (login - окремий сценарій з POST)
+PATHS = {
+    'objects': '/objects',
+    'chambers': '/chambers',
+    'api-objects': '/api/v1/objects',
+    'api-chambers': '/api/v1/chambers',
+}
+SCENARIOS = tuple(PATHS) + ('login',)
+
+
+def make_opener():
+    # Редиректи не виконуються: вимірюємо лише сам запит
+    class NoRedirect(urllib.request.HTTPRedirectHandler):
+        def redirect_request(self, *args, **kwargs):
+            return None
+
+    jar = http.cookiejar.CookieJar()
+    return urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar), NoRedirect)
+
+
+def request(opener, url, data=None):
+    """Виконує запит і повертає (затримка в секундах, HTTP-статус)"""
+    body = urllib.parse.urlencode(data).encode() if data else None
+    started = time.perf_counter()
+    try:
+        with opener.open(url, data=body, timeout=30) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except OSError:
+        status = 0
+    return time.perf_counter() - started, status
+
+
+def login(opener, args):
+    return request(opener, args.base_url + '/login', {'username': args.username, 'password': args.password})
+
+
+def worker(scenario, args, deadline, results, lock):
+    opener = make_opener()
+    if scenario != 'login':
+        login(opener, args)
+    samples = []
+    while time.perf_counter() < deadline:
+        if scenario == 'login':
+            # Кожен вхід - з новою сесією, щоб не спрацьовувало перенаправлення вже авторизованого
+            samples.append(login(make_opener(), args))
+        else:
+            samples.append(request(opener, args.base_url + PATHS[scenario]))
+    with lock:
+        results.extend(samples)
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_scenario(scenario, args):
+    results, lock = [], threading.Lock()
+    deadline = time.perf_counter() + args.duration
+    threads = [
+        threading.Thread(target=worker, args=(scenario, args, deadline, results, lock))
+        for _ in range(args.concurrency)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for latency, _ in results)
+    errors = sum(1 for _, status in results if status == 0 or status >= 500)
+    print(
+        f"{scenario:<13} requests={len(results):<7} rps={len(results) / elapsed:>8.1f} "
+        f"p50={percentile(latencies, 50) * 1000:>7.1f}ms "
+        f"p95={percentile(latencies, 95) * 1000:>7.1f}ms "
+        f"p99={percentile(latencies, 99) * 1000:>7.1f}ms errors={errors}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://localhost:5000')
+    parser.add_argument('--username', required=True)
+    parser.add_argument('--password', required=True)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=20.0, help='тривалість кожного сценарію, с')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS))
+    args = parser.parse_args()
+    args.base_url = args.base_url.rstrip('/')
+
+    for scenario in args.scenarios.split(','):
+        if scenario not in SCENARIOS:
+            parser.error(f'невідомий сценарій: {scenario}')
+        run_scenario(scenario, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+"""
+Стрес-перевірка лічильників заповненості: паралельні створення, переміщення і видалення
+об'єктів через сервіс occupancy. За замовчуванням усі потоки навантажують одну камеру
+(--chambers > 1 - ще й переміщення між камерами). Під час прогону окремий потік постійно
+читає лічильники камер, а кожен документ після reserve_slot перевіряється одразу: current_occupancy
+ні на мить не має перевищити місткість. Наприкінці лічильник кожної камери має дорівнювати
+фактичній кількості її об'єктів.
+
+    MONGO_URI=mongodb://localhost:27017/foundation_bench python scripts/stress_occupancy.py --threads 16 --ops 200
+
+На replica set переміщення виконуються в транзакціях, на standalone - без них.
+Скрипт створює власні камери та об'єкти (location/номер з префіксом stress-) і видаляє їх після перевірки.
+Завершується з кодом 1, якщо знайдено розбіжності.
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo.errors import DuplicateKeyError  # noqa: E402
+from app import create_app, mongo  # noqa: E402
+from app.services.occupancy import (  # noqa: E402
+    ChamberFullError, ObjectChangedError, reserve_slot, release_slot, move_object,
+    mark_deleted, purge_object, reconcile_occupancy
+)
+from config import Config  # noqa: E402
+
+PREFIX = 'stress-'
+
+
+class StressConfig(Config):
+    TESTING = True
+    ENSURE_INDEXES_ON_STARTUP = False
+    MONGO_WARMUP = False
+    STATS_REFRESH_INTERVAL = 0
+    LIVE_UPDATES_ENABLED = False
+    AUDIT_ENABLED = False
+    JOBS_ENABLED = False
+
+
+class CapacityExceeded(AssertionError):
+    """Лічильник камери вийшов за межі 0..capacity"""
+
+
+def check_capacity(doc):
+    if doc and not 0 <= doc['current_occupancy'] <= doc['capacity']:
+        raise CapacityExceeded(f"камера {doc['_id']}: {doc['current_occupancy']} з {doc['capacity']}")
+
+
+def create(chamber_ids, run_id):
+    chamber_id = random.choice(chamber_ids)
+    chamber = reserve_slot(chamber_id)
+    if not chamber:
+        return 'full'
+    check_capacity(chamber)
+    try:
+        mongo.db.objects.insert_one({'object_number': f'{PREFIX}{run_id}-{time.time_ns()}-{threading.get_ident()}',
+                                     'chamber_id': chamber_id, 'status': 'Contained', 'deleted_at': None})
+    except DuplicateKeyError:
+        release_slot(chamber_id)
+        raise
+    return 'created'
+
+
+def pick_object(chamber_ids):
+    docs = list(mongo.db.objects.aggregate([
+        {'$match': {'chamber_id': {'$in': chamber_ids}, 'deleted_at': None}},
+        {'$sample': {'size': 1}}
+    ]))
+    return docs[0] if docs else None
+
+
+def move(chamber_ids, run_id):
+    doc = pick_object(chamber_ids)
+    if not doc:
+        return 'empty'
+    target = random.choice(chamber_ids)
+    try:
+        move_object(doc['_id'], str(doc['chamber_id']), str(target), {'chamber_id': target})
+    except ChamberFullError:
+        return 'full'
+    except ObjectChangedError:
+        return 'conflict'
+    return 'moved'
+
+
+def delete(chamber_ids, run_id):
+    doc = pick_object(chamber_ids)
+    if not doc or not mark_deleted('objects', doc['_id']):
+        return 'conflict'
+    # Те саме, що виконує фонове завдання object.delete
+    purge_object(doc['_id'])
+    return 'deleted'
+
+
+OPERATIONS = (create, create, move, move, move, delete)
+
+
+def monitor(chamber_ids, stop, violations, samples):
+    """Читає лічильники камер, доки працюють потоки, і запам'ятовує кожен вихід за межі"""
+    while not stop.is_set():
+        for doc in mongo.db.chambers.find({'_id': {'$in': chamber_ids}}, {'current_occupancy': 1, 'capacity': 1}):
+            try:
+                check_capacity(doc)
+            except CapacityExceeded as e:
+                violations.append(str(e))
+        samples[0] += 1
+
+
+def worker(app, chamber_ids, run_id, ops, outcomes, errors, lock):
+    with app.app_context():
+        for _ in range(ops):
+            operation = random.choice(OPERATIONS)
+            try:
+                outcome = operation(chamber_ids, run_id)
+            except Exception as e:  # noqa: BLE001 - будь-яка помилка - провал перевірки
+                errors.append(f'{operation.__name__}: {e!r}')
+                continue
+            with lock:
+                outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--ops', type=int, default=200, help='операцій на потік')
+    parser.add_argument('--chambers', type=int, default=1)
+    parser.add_argument('--capacity', type=int, default=10)
+    args = parser.parse_args()
+
+    app = create_app(StressConfig)
+    run_id = time.time_ns()
+    chamber_ids = mongo.db.chambers.insert_many([
+        {'location': f'{PREFIX}{run_id}', 'capacity': args.capacity, 'current_occupancy': 0,
+         'status': 'Active', 'security_level': '1', 'deleted_at': None}
+        for _ in range(args.chambers)
+    ]).inserted_ids
+
+    outcomes, errors, lock = {}, [], threading.Lock()
+    threads = [threading.Thread(target=worker, args=(app, chamber_ids, run_id, args.ops, outcomes, errors, lock))
+               for _ in range(args.threads)]
+    stop, violations, samples = threading.Event(), [], [0]
+    sampler = threading.Thread(target=monitor, args=(chamber_ids, stop, violations, samples), daemon=True)
+    started = time.perf_counter()
+    try:
+        sampler.start()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        with app.app_context():
+            report = reconcile_occupancy(chamber_ids, dry_run=True)
+        over = [item for item in report['drifted'] if item['over_capacity']]
+        for doc in mongo.db.chambers.find({'_id': {'$in': chamber_ids}}):
+            if doc['current_occupancy'] > doc['capacity'] or doc['current_occupancy'] < 0:
+                over.append({'chamber_id': str(doc['_id']), 'recorded': doc['current_occupancy']})
+    finally:
+        stop.set()
+        sampler.join()
+        mongo.db.objects.delete_many({'chamber_id': {'$in': chamber_ids}})
+        mongo.db.objects.delete_many({'object_number': {'$regex': f'^{PREFIX}{run_id}-'}})
+        mongo.db.chambers.delete_many({'_id': {'$in': chamber_ids}})
+
+    print(f"{args.threads} потоків x {args.ops} операцій за {elapsed:.1f} с: "
+          + ', '.join(f'{name} {count}' for name, count in sorted(outcomes.items()))
+          + f"; лічильники прочитано {samples[0]} разів")
+    for error in errors[:10]:
+        print(f"ПОМИЛКА {error}")
+    for violation in violations[:10]:
+        print(f"ПЕРЕПОВНЕННЯ під час прогону: {violation}")
+    for item in report['drifted']:
+        print(f"РОЗБІЖНІСТЬ камера {item['chamber_id']}: записано {item['recorded']}, фактично {item['actual']}")
+    if errors or violations or report['drifted'] or over:
+        sys.exit(1)
+    print("OK: місткість не перевищувалась, заповненість кожної камери дорівнює кількості її об'єктів")
+
+
+if __name__ == '__main__':
+    main()